@@ -1,17 +1,200 @@
+import numpy as np
 import pandas as pd
 import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log, ler_log_em_blocos, tamanho_bloco_streaming
+
+# Colunas lidas no modo em blocos
+COLUNAS_EVENTOS = ['Tipo Mensagem', 'Event Code', 'Motion Status', 'Tipo Dispositivo', 'Sequência', 'Data/Hora Evento']
+
+# O número de sequência é um contador de 16 bits: o conjunto de valores já vistos
+# no modo em blocos nunca passa de 65536 posições
+VALORES_SEQUENCIA = 65536
+
+MAPA_EVENT_CODE = {
+    '20': 'GTIGF',
+    '21': 'GTIGN',
+    '30': 'GTERI',
+    '27': 'GTERI'
+}
+
+# Regras de classificação por tipo de dispositivo ('Tipo Dispositivo' do log).
+# Cada regra: (evento, coluna, prefixo do valor, classificação) - a mensagem com
+# aquele evento cujo valor na coluna começa com o prefixo recebe a classificação.
+# Para um novo modelo (ex.: TM-08 = '385349', TM-07 = '83') basta incluir a entrada.
+REGRAS_DISPOSITIVO = {
+    # TM-10: GTERI separadas pelo primeiro dígito do Motion Status (1 = ignição desligada)
+    '802003': [
+        ('GTERI', 'Motion Status', '1', 'Modo Econômico'),
+        ('GTERI', 'Motion Status', '2', 'Posicionamento por tempo em movimento'),
+    ],
+}
+
+
+# Função para classificar o evento
+def get_evento(df):
+    tipo = df['Tipo Mensagem'].astype(str).str.strip().str.upper()
+    if 'Event Code' in df.columns:
+        codigo = df['Event Code'].astype(str).str.strip()
+    else:
+        codigo = pd.Series('', index=df.index)
+    evento = tipo.where(~tipo.str.contains('MODO ECONÔMICO', regex=False), 'MODOECO')
+    return evento.where(tipo != '', codigo.map(MAPA_EVENT_CODE).fillna(''))
+
+
+# Função para identificar o tipo de dispositivo (primeiro valor preenchido do log:
+# nem toda mensagem traz o 'Tipo Dispositivo')
+def tipo_dispositivo(df):
+    tipo_dispositivo = ''
+    if 'Tipo Dispositivo' in df.columns:
+        valores = df['Tipo Dispositivo'].dropna()
+        if not valores.empty:
+            valor = valores.iloc[0]
+            try:
+                tipo_dispositivo = str(int(float(valor)))
+            except ValueError:
+                tipo_dispositivo = str(valor).strip()
+    return tipo_dispositivo
+
+
+def _tipo_dispositivo_em_blocos(caminho_arquivo, tamanho_bloco):
+    """tipo_dispositivo do log inteiro, lendo só a coluna até o primeiro valor preenchido."""
+    for bloco in ler_log_em_blocos(caminho_arquivo, ['Tipo Dispositivo'], tamanho_bloco):
+        dispositivo = tipo_dispositivo(bloco)
+        if dispositivo:
+            return dispositivo
+    return ''
+
+
+def classificar_eventos(df, dispositivo):
+    """
+    Classifica cada mensagem aplicando as regras do tipo de dispositivo
+    (REGRAS_DISPOSITIVO) com máscaras sobre as colunas inteiras
+    Returns:
+        Series com o 'Evento Classificado' de cada linha
+    """
+    evento = get_evento(df)
+    regras = [regra for regra in REGRAS_DISPOSITIVO.get(dispositivo, []) if regra[1] in df.columns]
+    if not regras:
+        return evento
+    # Cada coluna usada pelas regras é convertida para texto uma única vez
+    textos = {coluna: df[coluna].astype('string') for _, coluna, _, _ in regras}
+    condicoes = [
+        ((evento == tipo) & textos[coluna].str.startswith(prefixo)).fillna(False).to_numpy(dtype=bool)
+        for tipo, coluna, prefixo, _ in regras
+    ]
+    classificacoes = [classificacao for *_, classificacao in regras]
+    return pd.Series(np.select(condicoes, classificacoes, default=evento.to_numpy(dtype=object)), index=df.index)
+
+
+def contagens_parciais(df):
+    """
+    Contagens de um trecho do log já classificado
+    Returns:
+        tupla (quantidade por evento, quantidade por (Dia, evento))
+    """
+    total = df['Evento Classificado'].value_counts(sort=False)
+    if 'Data/Hora Evento' not in df.columns:
+        return total, None
+    datas = pd.to_datetime(df['Data/Hora Evento'], errors='coerce')
+    com_data = df[datas.notna()]
+    por_dia = com_data.groupby(
+        [datas[datas.notna()].dt.strftime('%d/%m/%Y').rename('Dia'), 'Evento Classificado']
+    )['Sequência'].count()
+    return total, por_dia
+
+
+def somar_contagens(acumulado, parcial):
+    """Soma contagens parciais de blocos diferentes."""
+    if acumulado is None:
+        return parcial
+    if parcial is None:
+        return acumulado
+    return acumulado.add(parcial, fill_value=0).astype(int)
+
+
+def salvar_contagens(total, por_dia, caminho_saida):
+    contagem = total.sort_values(ascending=False).reset_index()
+    contagem.columns = ['Tipo mensagem', 'Quantidade']
+
+    contagem.to_csv(caminho_saida, index=False, encoding='utf-8-sig')
+    print(f"✅ Arquivo salvo em: {caminho_saida}")
+
+    # --- NOVO: Contagem de eventos por dia (tabela pivô) ---
+    if por_dia is not None:
+        tabela_pivo = por_dia.unstack('Evento Classificado', fill_value=0).sort_index(axis=0).sort_index(axis=1)
+        tabela_pivo = tabela_pivo.astype(int).reset_index()
+        tabela_pivo.columns.name = 'Evento Classificado'
+
+        caminho_saida_dia = caminho_saida.replace('.csv', '_por_dia.csv')
+        tabela_pivo.to_csv(caminho_saida_dia, index=False, encoding='utf-8-sig')
+        print(f'✅ Arquivo de eventos por dia salvo em: {caminho_saida_dia}')
+    else:
+        print('⚠️ Coluna "Data/Hora Evento" não encontrada para análise por dia.')
+
+
+def _eventos_em_blocos(caminho_arquivo, caminho_saida, tamanho_bloco):
+    """
+    Modo em blocos: cada bloco é deduplicado pela 'Sequência' (mantendo a primeira
+    ocorrência no arquivo) e classificado; só as contagens ficam em memória
+    Entre linhas com a mesma 'Sequência' o modo em memória fica com a que a ordenação
+    deixar primeiro, não necessariamente a primeira do arquivo: as contagens dos dois
+    modos podem diferir quando o log tem sequências repetidas com eventos diferentes.
+    """
+    visto = np.zeros(VALORES_SEQUENCIA, dtype=bool)
+    visto_fora_faixa = set()
+    viu_sem_sequencia = False
+    dispositivo = _tipo_dispositivo_em_blocos(caminho_arquivo, tamanho_bloco)
+    total = por_dia = None
+
+    for bloco in ler_log_em_blocos(caminho_arquivo, COLUNAS_EVENTOS, tamanho_bloco):
+        if 'Tipo Mensagem' not in bloco.columns:
+            print("❌ A coluna 'Tipo Mensagem' não foi encontrada no arquivo.")
+            return
+
+        # Deduplicação pela Sequência, com estado entre os blocos
+        seq = bloco['Sequência']
+        manter = ~seq.duplicated(keep='first').to_numpy()
+        valores = seq.to_numpy(dtype=float, na_value=np.nan)
+        sem_sequencia = np.isnan(valores)
+        na_faixa = ~sem_sequencia & (valores >= 0) & (valores < VALORES_SEQUENCIA)
+        posicoes = valores[na_faixa].astype(np.int64)
+        manter[na_faixa] &= ~visto[posicoes]
+        visto[posicoes] = True
+        if viu_sem_sequencia:
+            manter[sem_sequencia] = False
+        viu_sem_sequencia = viu_sem_sequencia or sem_sequencia.any()
+        fora_faixa = np.flatnonzero(~sem_sequencia & ~na_faixa)
+        for i in fora_faixa:
+            if valores[i] in visto_fora_faixa:
+                manter[i] = False
+            visto_fora_faixa.add(valores[i])
+
+        bloco = bloco[manter].copy()
+        bloco['Evento Classificado'] = classificar_eventos(bloco, dispositivo)
+        total_bloco, por_dia_bloco = contagens_parciais(bloco)
+        total = somar_contagens(total, total_bloco)
+        por_dia = somar_contagens(por_dia, por_dia_bloco)
+
+    if total is None:
+        print("❌ Não foi possível ler o arquivo.")
+        return
+    salvar_contagens(total, por_dia, caminho_saida)
+
 
 # Função principal para análise de eventos
-def eventos(caminho_arquivo, caminho_saida='Analise de eventos/quantidade_tipos_mensagem.csv'):
+def eventos(caminho_arquivo, caminho_saida='Analise de eventos/quantidade_tipos_mensagem.csv', tamanho_bloco=None):
     try:
-        df = None
-        # Tenta ler o arquivo com diferentes codificações
-        for enc in ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']:
-            try:
-                df = pd.read_csv(caminho_arquivo, encoding=enc, low_memory=False)
-                break
-            except Exception:
-                continue
+        # Logs muito grandes são processados em blocos, sem carregar o arquivo inteiro
+        tamanho_bloco = tamanho_bloco_streaming(caminho_arquivo, tamanho_bloco)
+        if tamanho_bloco:
+            return _eventos_em_blocos(caminho_arquivo, caminho_saida, tamanho_bloco)
+
+        # Aceita o caminho do CSV ou o DataFrame já carregado
+        df = carregar_log(caminho_arquivo)
         if df is None:
             print("❌ Não foi possível ler o arquivo.")
             return
@@ -20,131 +203,14 @@ def eventos(caminho_arquivo, caminho_saida='Analise de eventos/quantidade_tipos_
             print("❌ A coluna 'Tipo Mensagem' não foi encontrada no arquivo.")
             return
 
-        # Função para classificar o evento
-        def get_evento(row):
-            tipo = str(row.get('Tipo Mensagem', '')).strip().upper()
-            codigo = str(row.get('Event Code', '')).strip()
-
-            if tipo:
-                if 'MODO ECONÔMICO' in tipo:
-                    return 'MODOECO'
-                return tipo
-            elif codigo:
-                mapa = {
-                    '20': 'GTIGF',
-                    '21': 'GTIGN',
-                    '30': 'GTERI',
-                    '27': 'GTERI'
-                }
-                return mapa.get(codigo, '')
-            return ''
-
-        # Função para identificar o tipo de dispositivo
-        def tipo_dispositivo(df):
-            tipo_dispositivo = ''
-            if 'Tipo Dispositivo' in df.columns and not df['Tipo Dispositivo'].empty:
-                valor = df['Tipo Dispositivo'].iloc[0]
-                if pd.notna(valor):
-                    try:
-                        tipo_dispositivo = str(int(float(valor)))
-                    except ValueError:
-                        tipo_dispositivo = str(valor).strip()
-            return tipo_dispositivo
-
         dispositivo = tipo_dispositivo(df)
         df = df.sort_values('Sequência', ascending=True)
         df = df.drop_duplicates(subset='Sequência', keep='first')
 
-        df['Evento Classificado'] = ''
-
-        # Inicialização das variáveis de controle
-        modo_eco_ativo = False
-        periodicas = False
-        ign_on = 0
-        ign_off = 0
-        eco = 0
-        peri = 0
-
-        for idx, row in df.iterrows():
-            evento = get_evento(row)
-            # Garante que motion seja string simples e nunca NDFrame
-            motion = row.get('Motion Status', '')
-            if isinstance(motion, (float, int)):
-                if pd.notna(motion):
-                    motion_str = str(int(motion))
-                else:
-                    motion_str = ''
-            elif isinstance(motion, (str, bytes)):
-                motion_str = str(motion)
-            else:
-                motion_str = ''
-            motion_prefix = motion_str[0] if len(motion_str) > 0 else None
-            codigo = str(row.get('Event Code', '')).strip()
-
-            report_type_raw = row.get('Position Report Type', '')
-            report_type = ''
-            try:
-                if report_type_raw is not None and str(report_type_raw).strip():
-                    report_type = str(int(float(str(report_type_raw))))
-            except (ValueError, TypeError):
-                pass
-
-            final = evento  # valor padrão
-
-            # Lógica para dispositivos específicos
-            if dispositivo in ['802003']:
-                if evento == 'GTIGN':
-                    ign_on += 1
-                    modo_eco_ativo = False
-                    periodicas = True
-                elif evento == 'GTIGF':
-                    ign_off += 1
-                    modo_eco_ativo = True
-                    periodicas = False
-                elif evento == 'GTERI':
-                    if motion_prefix == '1':
-                        eco += 1
-                        final = 'Modo Econômico'
-                    elif motion_prefix == '2':
-                        peri += 1
-                        final = 'Posicionamento por tempo em movimento'
-                    elif (motion_prefix == '2' and report_type == '10') or codigo == '30':
-                        peri += 1
-                    # Se quiser manter outros casos, pode adicionar aqui
-                elif evento == 'MODOECO':
-                    eco += 1
-
-
-
-            df.at[idx, 'Evento Classificado'] = final
-
-        df['Evento Classificado'] = df['Evento Classificado'].fillna(df['Tipo Mensagem'])
-
-        contagem = df['Evento Classificado'].value_counts().reset_index()
-        contagem.columns = ['Tipo mensagem', 'Quantidade']
-
-        contagem.to_csv(caminho_saida, index=False, encoding='utf-8-sig')
-        print(f"✅ Arquivo salvo em: {caminho_saida}")
-
-        # --- NOVO: Contagem de eventos por dia (tabela pivô) ---
-        if 'Data/Hora Evento' in df.columns:
-            df['Data/Hora Evento'] = pd.to_datetime(df['Data/Hora Evento'], errors='coerce')
-            df = df.dropna(subset=['Data/Hora Evento'])
-            df['Dia'] = df['Data/Hora Evento'].dt.strftime('%d/%m/%Y')
-
-            tabela_pivo = df.pivot_table(
-                index='Dia',
-                columns='Evento Classificado',
-                values='Sequência',  # Pode ser qualquer coluna, pois vamos contar
-                aggfunc='count',
-                fill_value=0
-            ).reset_index()
-
-            caminho_saida_dia = caminho_saida.replace('.csv', '_por_dia.csv')
-            tabela_pivo.to_csv(caminho_saida_dia, index=False, encoding='utf-8-sig')
-            print(f'✅ Arquivo de eventos por dia salvo em: {caminho_saida_dia}')
-        else:
-            print('⚠️ Coluna "Data/Hora Evento" não encontrada para análise por dia.')
+        df['Evento Classificado'] = classificar_eventos(df, dispositivo)
+
+        total, por_dia = contagens_parciais(df)
+        salvar_contagens(total, por_dia, caminho_saida)
 
     except Exception as e:
         print(f"❌ Erro inesperado: {str(e)}")
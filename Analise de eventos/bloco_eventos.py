@@ -1,17 +1,46 @@
 import pandas as pd
-import json
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from blocos_html import criar_bloco, salvar_bloco
+from paleta_cores import PALETA_EVENTOS, cores_ciclicas
+
+
+def opcoes_grafico(titulo_y, titulo_x, modo_interacao, legenda):
+    """Opções do Chart.js comuns aos gráficos do bloco (zoom/pan e títulos dos eixos)."""
+    def titulo_eixo(texto):
+        return {
+            'display': True,
+            'text': texto,
+            'font': {'size': 14, 'weight': 'bold', 'family': 'Arial'},
+            'color': '#000000'
+        }
+    return {
+        'responsive': True,
+        'maintainAspectRatio': False,
+        'interaction': {'mode': modo_interacao, 'intersect': False},
+        'plugins': {
+            'legend': legenda,
+            'zoom': {
+                'pan': {'enabled': True, 'mode': 'xy'},
+                'zoom': {'wheel': {'enabled': True}, 'pinch': {'enabled': True}, 'drag': {'enabled': True}, 'mode': 'xy'}
+            }
+        },
+        'scales': {
+            'y': {'beginAtZero': True, 'title': titulo_eixo(titulo_y)},
+            'x': {'title': titulo_eixo(titulo_x)}
+        }
+    }
+
+
 def gerar_bloco_eventos(
     csv_totais='Analise de eventos/quantidade_tipos_mensagem.csv',
     csv_diario='Analise de eventos/quantidade_tipos_mensagem_por_dia.csv',
-    filename='bloco_eventos_diarios.html'
+    filename='bloco_eventos_diarios.html',
+    pasta_saida=None,
+    salvar=True
 ):
-    # Diretório de saída
-    base_dir = Path(__file__).parent.parent / 'temp_blocos'
-    base_dir.mkdir(parents=True, exist_ok=True)
-    output_path = base_dir / filename
-
     # --- Lê os dados ---
     df_totais = pd.read_csv(csv_totais)
     df_diario = pd.read_csv(csv_diario)
@@ -23,38 +52,59 @@ def gerar_bloco_eventos(
     labels_barras = [label_map.get(lbl, lbl) for lbl in df_totais['Tipo mensagem'].tolist()]
     valores_barras = df_totais['Quantidade'].tolist()
 
-    # Defina as cores para cada evento 
-    cores_eventos = [
-        "#0e0561", "#3ae8ff", "#3b08b3", "#4ff9ff", "#3c04d6",
-        "#00bfff", "#2519CC", "#48d8f1", "#9370db", "#000000"
-    ]
-    # Repete as cores se tiver mais eventos
-    background_colors = [cores_eventos[i % len(cores_eventos)] for i in range(len(labels_barras))]
+    # Uma cor por evento (repete a paleta se tiver mais eventos)
+    background_colors = cores_ciclicas(PALETA_EVENTOS, len(labels_barras))
 
     # --- Gráfico de linha (por dia) ---
     df_diario['Dia'] = pd.to_datetime(df_diario['Dia'], format='%d/%m/%Y')
     df_diario = df_diario.sort_values('Dia')
     labels_linha = df_diario['Dia'].dt.strftime('%d/%m/%Y').tolist()
     datasets_linha = []
+    cores_linhas = cores_ciclicas(PALETA_EVENTOS, len(df_diario.columns) - 1)
     for idx, col in enumerate(df_diario.columns[1:]):
         label = label_map.get(col, col)
         datasets_linha.append({
             "label": label,
             "data": df_diario[col].tolist(),
-            "borderColor": cores_eventos[idx % len(cores_eventos)],
-            "backgroundColor": cores_eventos[idx % len(cores_eventos)],
+            "borderColor": cores_linhas[idx],
+            "backgroundColor": cores_linhas[idx],
             "fill": False,
             "tension": 0.3,
             "pointRadius": 4,
             "pointHoverRadius": 6,
-            "pointBackgroundColor": cores_eventos[idx % len(cores_eventos)],
-            "pointBorderColor": cores_eventos[idx % len(cores_eventos)],
+            "pointBackgroundColor": cores_linhas[idx],
+            "pointBorderColor": cores_linhas[idx],
             "hidden": False
         })
 
-    # --- HTML/CSS/JS do bloco ---
+    # --- Gráficos (configurações do Chart.js, criados pelo dashboard) ---
+    graficos = {
+        'barrasTotais': {
+            'type': 'bar',
+            'data': {
+                'labels': labels_barras,
+                'datasets': [{
+                    'label': 'Total por categoria',
+                    'data': valores_barras,
+                    'backgroundColor': background_colors,
+                    'borderColor': background_colors,
+                    'borderWidth': 1
+                }]
+            },
+            'options': opcoes_grafico('TOTAL', 'CATEGORIA', 'nearest', {'display': False})
+        },
+        'linhaEventos': {
+            'type': 'line',
+            'data': {
+                'labels': labels_linha,
+                'datasets': datasets_linha
+            },
+            'options': opcoes_grafico('QUANTIDADE', 'DIAS', 'index', {'position': 'top'})
+        },
+    }
+
+    # --- HTML/CSS do bloco ---
     css_local = """
-    <style>
     .btn-maximizar { position: absolute; top: 15px; right: 15px; padding: 8px 15px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; border: none; border-radius: 20px; cursor: pointer; font-size: 12px; font-weight: 500; z-index: 10; transition: all 0.3s ease; }
     .btn-maximizar:hover { transform: scale(1.05); }
     .grafico-container { width: 100%; max-width: 900px; background: white; padding: 25px; border-radius: 20px; box-shadow: 0 8px 25px rgba(0,0,0,0.1); position: relative; text-align: center; border: 1px solid #e9ecef; transition: transform 0.3s ease; margin: 0 auto 40px auto;}
@@ -89,10 +139,9 @@ def gerar_bloco_eventos(
         border-radius: 0;
         box-shadow: none;
     }
-    </style>
     """
 
-    html = f"""{css_local}
+    html = """
     <!-- BLOCO DE GRÁFICO - INÍCIO -->
     <div class='dashboard-bloco-analise'>
         <span class='dashboard-title-analise'>Análise de eventos</span>
@@ -127,131 +176,14 @@ def gerar_bloco_eventos(
             </div>
         </div>
     </div>
-    <script>
-    document.addEventListener('DOMContentLoaded', function() {{
-        setTimeout(function() {{
-            if (typeof window.charts === 'undefined') {{
-                window.charts = {{}};
-            }}
-            if (typeof Chart !== 'undefined' && Chart.register && typeof ChartZoom !== 'undefined') {{
-                Chart.register(ChartZoom);
-            }}
-            // Barras
-            const barrasCanvas = document.getElementById('barrasTotais');
-            if (barrasCanvas && !window.charts['barrasTotais']) {{
-                window.charts['barrasTotais'] = new Chart(barrasCanvas.getContext('2d'), {{
-                    type: 'bar',
-                    data: {{
-                        labels: {json.dumps(labels_barras)},
-                        datasets: [{{
-                            label: 'Total por categoria',
-                            data: {json.dumps(valores_barras)},
-                            backgroundColor: {json.dumps(background_colors)},
-                            borderColor: {json.dumps(background_colors)},
-                            borderWidth: 1
-                        }}]
-                    }},
-                    options: {{
-                        responsive: true,
-                        maintainAspectRatio: false,
-                        interaction: {{
-                            mode: 'nearest',
-                            intersect: false
-                        }},
-                        plugins: {{
-                            legend: {{ display: false }},
-                            zoom: {{
-                                pan: {{ enabled: true, mode: 'xy' }},
-                                zoom: {{ wheel: {{ enabled: true }}, pinch: {{ enabled: true }}, drag: {{ enabled: true }}, mode: 'xy' }}
-                            }}
-                        }},
-                        scales: {{
-                            y: {{
-                                beginAtZero: true,
-                                title: {{
-                                    display: true,
-                                    text: 'TOTAL',
-                                    font: {{ size: 14, weight: 'bold', family: 'Arial' }},
-                                    color: '#000000'
-                                }}
-                            }},
-                            x: {{
-                                title: {{
-                                    display: true,
-                                    text: 'CATEGORIA',
-                                    font: {{ size: 14, weight: 'bold', family: 'Arial' }},
-                                    color: '#000000'
-                                }}
-                            }}
-                        }}
-                    }}
-                }});
-                barrasCanvas.addEventListener('dblclick', function() {{
-                    if(window.charts['barrasTotais']) {{
-                        window.charts['barrasTotais'].resetZoom();
-                    }}
-                }});
-            }}
-            // Linha
-            const linhaCanvas = document.getElementById('linhaEventos');
-            if (linhaCanvas && !window.charts['linhaEventos']) {{
-                window.charts['linhaEventos'] = new Chart(linhaCanvas.getContext('2d'), {{
-                    type: 'line',
-                    data: {{
-                        labels: {json.dumps(labels_linha)},
-                        datasets: {json.dumps(datasets_linha)}
-                    }},
-                    options: {{
-                        responsive: true,
-                        maintainAspectRatio: false,
-                        interaction: {{
-                            mode: 'index',
-                            intersect: false
-                        }},
-                        plugins: {{
-                            legend: {{ position: 'top' }},
-                            zoom: {{
-                                pan: {{ enabled: true, mode: 'xy' }},
-                                zoom: {{ wheel: {{ enabled: true }}, pinch: {{ enabled: true }}, drag: {{ enabled: true }}, mode: 'xy' }}
-                            }}
-                        }},
-                        scales: {{
-                            y: {{
-                                beginAtZero: true,
-                                title: {{
-                                    display: true,
-                                    text: 'QUANTIDADE',
-                                    font: {{ size: 14, weight: 'bold', family: 'Arial' }},
-                                    color: '#000000'
-                                }}
-                            }},
-                            x: {{
-                                title: {{
-                                    display: true,
-                                    text: 'DIAS',
-                                    font: {{ size: 14, weight: 'bold', family: 'Arial' }},
-                                    color: '#000000'
-                                }}
-                            }}
-                        }}
-                    }}
-                }});
-                linhaCanvas.addEventListener('dblclick', function() {{
-                    if(window.charts['linhaEventos']) {{
-                        window.charts['linhaEventos'].resetZoom();
-                    }}
-                }});
-            }}
-        }}, 100);
-    }});
-    </script>
     <!-- BLOCO DE GRÁFICO - FIM -->
     """
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
-
-    print(f"✅ Bloco de eventos salvo em: {output_path.resolve()}")
+    bloco = criar_bloco(filename, html, css=[css_local], graficos=graficos)
+    if salvar:
+        output_path = salvar_bloco(bloco, pasta_saida)
+        print(f"✅ Bloco de eventos salvo em: {output_path.resolve()}")
+    return bloco
 
 if __name__ == "__main__":
     gerar_bloco_eventos()
@@ -1,46 +1,128 @@
+import os
+import shutil
 import pandas as pd
+import sys
+from pathlib import Path
 
-def logs(caminho_arquivo, caminho_saida='Log/logs.csv'):
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log, ler_log_em_blocos, tamanho_bloco_streaming
+
+COLUNAS = ['Linha', 'Tipo Mensagem', 'Data/Hora Inclusão', 'Data/Hora Evento', 'Delay', 'Log',
+           'Percentual_Logs_Total', 'Media_Delay_Logs', 'Mensagem_Maior_Delay', 'Maior_Delay_Encontrado', 'Linha_Maior_Delay']
+
+# Atraso (s) entre evento e inclusão a partir do qual a mensagem é considerada log
+LIMITE_LOG = 60
+
+
+def marcar_logs(df):
+    """Calcula o Delay de cada mensagem e devolve apenas as que têm as duas datas."""
+    # Adicionar índice da linha original (considerando cabeçalho)
+    df['Linha'] = df.index + 2  # +2 porque index começa em 0 e tem o cabeçalho
+
+    df['Data/Hora Evento'] = pd.to_datetime(df['Data/Hora Evento'], errors='coerce')
+    df['Data/Hora Inclusão'] = pd.to_datetime(df['Data/Hora Inclusão'], errors='coerce')
+
+    df_filtrado = df.dropna(subset=['Data/Hora Evento', 'Data/Hora Inclusão']).copy()
+
+    df_filtrado['Delay'] = (df_filtrado['Data/Hora Inclusão'] - df_filtrado['Data/Hora Evento']).dt.total_seconds().astype(float)
+
+    # se é log ou nao
+    df_filtrado['Log'] = df_filtrado['Delay'].gt(LIMITE_LOG).map({True: 'Sim', False: 'Não'})
+    return df_filtrado
+
+
+def resultado_logs(df_logs):
+    """Linhas de saída das mensagens que são logs (colunas de estatística vazias)."""
+    df_resultado = df_logs[COLUNAS[:6]].copy()
+    # Datas como objetos: cada uma é gravada no próprio formato, em qualquer bloco
+    for col in ['Data/Hora Inclusão', 'Data/Hora Evento']:
+        df_resultado[col] = df_resultado[col].astype(object)
+    for col in COLUNAS[6:]:
+        df_resultado[col] = ''
+    return df_resultado[COLUNAS]  # garantir ordem
+
+
+def linha_estatisticas(total_mensagens, total_logs, soma_delay, mensagem_maior_delay, maior_delay, linha_maior_delay):
+    """Primeira linha do CSV, apenas com as estatísticas."""
+    percentual_logs = (total_logs / total_mensagens * 100) if total_mensagens > 0 else 0
+    media_delay = soma_delay / total_logs if total_logs > 0 else 0
+    return pd.DataFrame({
+        'Linha': [''],
+        'Tipo Mensagem': [''],
+        'Data/Hora Inclusão': [''],
+        'Data/Hora Evento': [''],
+        'Delay': [''],
+        'Log': [''],
+        'Percentual_Logs_Total': [f"{percentual_logs:.2f}%"],
+        'Media_Delay_Logs': [f"{media_delay:.2f}s"],
+        'Mensagem_Maior_Delay': [mensagem_maior_delay],
+        'Maior_Delay_Encontrado': [f"{maior_delay:.2f}s"],
+        'Linha_Maior_Delay': [linha_maior_delay]
+    })[COLUNAS]
+
+
+def _logs_em_blocos(caminho_arquivo, caminho_saida, tamanho_bloco):
+    """
+    Modo em blocos: as linhas de log vão direto para um arquivo parcial e só os
+    totais e o maior delay ficam em memória; no fim a linha de estatísticas é
+    gravada e o parcial é copiado logo abaixo dela
+    """
+    colunas = ['Tipo Mensagem', 'Data/Hora Inclusão', 'Data/Hora Evento']
+    caminho_parcial = caminho_saida + '.parcial'
+    total_mensagens = total_logs = 0
+    soma_delay = 0.0
+    maior = None
+
+    try:
+        with open(caminho_parcial, 'w', encoding='utf-8', newline='') as parcial:
+            for bloco in ler_log_em_blocos(caminho_arquivo, colunas, tamanho_bloco):
+                df_filtrado = marcar_logs(bloco)
+                df_logs = df_filtrado[df_filtrado['Log'] == 'Sim']
+                total_mensagens += len(df_filtrado)
+                total_logs += len(df_logs)
+                soma_delay += df_logs['Delay'].sum()
+                # Mantém a primeira ocorrência do maior delay, como idxmax
+                if len(df_logs) > 0:
+                    idx = df_logs['Delay'].idxmax()
+                    if maior is None or df_logs.at[idx, 'Delay'] > maior['Delay']:
+                        maior = df_logs.loc[idx, ['Tipo Mensagem', 'Delay', 'Linha']]
+                resultado_logs(df_logs).to_csv(parcial, index=False, header=False)
+
+        if maior is not None:
+            estatisticas = linha_estatisticas(total_mensagens, total_logs, soma_delay,
+                                              maior['Tipo Mensagem'], maior['Delay'], maior['Linha'])
+        else:
+            estatisticas = linha_estatisticas(total_mensagens, total_logs, soma_delay, "", "", "")
+
+        with open(caminho_saida, 'w', encoding='utf-8', newline='') as saida:
+            estatisticas.to_csv(saida, index=False)
+            with open(caminho_parcial, 'r', encoding='utf-8', newline='') as parcial:
+                shutil.copyfileobj(parcial, saida)
+    finally:
+        if os.path.exists(caminho_parcial):
+            os.remove(caminho_parcial)
+
+
+def logs(caminho_arquivo, caminho_saida='Log/logs.csv', tamanho_bloco=None):
     try:
-        df = None
-        for enc in ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']:
-            try:
-                df = pd.read_csv(caminho_arquivo, encoding=enc, low_memory=False)
-                break
-            except Exception:
-                continue
+        # Logs muito grandes são processados em blocos, sem carregar o arquivo inteiro
+        tamanho_bloco = tamanho_bloco_streaming(caminho_arquivo, tamanho_bloco)
+        if tamanho_bloco:
+            return _logs_em_blocos(caminho_arquivo, caminho_saida, tamanho_bloco)
+
+        df = carregar_log(caminho_arquivo)
         if df is None:
             print("❌ Não foi possível ler o arquivo.")
             return
-        
-        # Adicionar índice da linha original (considerando cabeçalho)
-        df['Linha'] = df.index + 2  # +2 porque index começa em 0 e tem o cabeçalho
-        
-        df['Data/Hora Evento'] = pd.to_datetime(df['Data/Hora Evento'], errors='coerce')
-        df['Data/Hora Inclusão'] = pd.to_datetime(df['Data/Hora Inclusão'], errors='coerce')
-
-        df_filtrado = df.dropna(subset=['Data/Hora Evento', 'Data/Hora Inclusão']).copy()
-
-        df_filtrado['Delay'] = (df_filtrado['Data/Hora Inclusão'] - df_filtrado['Data/Hora Evento']).dt.total_seconds().astype(float)
 
-        # se é log ou nao 
-        df_filtrado['Log'] = df_filtrado['Delay'].apply(lambda x: 'Sim' if x > 60 else 'Não')
+        df_filtrado = marcar_logs(df)
 
         # Filtrar apenas mensagens que são logs
         df_logs = df_filtrado[df_filtrado['Log'] == 'Sim'].copy()
-        if not isinstance(df_logs, pd.DataFrame):
-            df_logs = pd.DataFrame(df_logs)
-        
-        # Calcular estatísticas
-        total_mensagens = len(df_filtrado)
-        total_logs = len(df_logs)
-        percentual_logs = (total_logs / total_mensagens * 100) if total_mensagens > 0 else 0
-        media_delay = df_logs['Delay'].mean() if len(df_logs) > 0 else 0
-        
+
         # Encontrar mensagem com maior delay
         if len(df_logs) > 0:
-            delay_series = pd.Series(df_logs['Delay'].values, index=df_logs.index)
-            max_delay_idx = delay_series.idxmax()
+            max_delay_idx = df_logs['Delay'].idxmax()
             mensagem_maior_delay = df_logs.loc[max_delay_idx, 'Tipo Mensagem']
             maior_delay = df_logs.loc[max_delay_idx, 'Delay']
             linha_maior_delay = df_logs.loc[max_delay_idx, 'Linha']
@@ -49,42 +131,18 @@ def logs(caminho_arquivo, caminho_saida='Log/logs.csv'):
             maior_delay = ""
             linha_maior_delay = ""
 
-        # Criar DataFrame de resultado apenas com logs
-        colunas = ['Linha', 'Tipo Mensagem', 'Data/Hora Inclusão', 'Data/Hora Evento', 'Delay', 'Log',
-                   'Percentual_Logs_Total', 'Media_Delay_Logs', 'Mensagem_Maior_Delay', 'Maior_Delay_Encontrado', 'Linha_Maior_Delay']
-        df_resultado = df_logs[['Linha', 'Tipo Mensagem', 'Data/Hora Inclusão', 'Data/Hora Evento', 'Delay', 'Log']].copy()
-        for col in colunas[6:]:
-            df_resultado[col] = ''
-        df_resultado = df_resultado[colunas]  # garantir ordem
-        if not isinstance(df_resultado, pd.DataFrame):
-            df_resultado = pd.DataFrame(df_resultado)
-
         # Adicionar linha com estatísticas na primeira linha, apenas valores
-        linha_estatisticas = pd.DataFrame({
-            'Linha': [''],
-            'Tipo Mensagem': [''],
-            'Data/Hora Inclusão': [''],
-            'Data/Hora Evento': [''],
-            'Delay': [''],
-            'Log': [''],
-            'Percentual_Logs_Total': [f"{percentual_logs:.2f}%"],
-            'Media_Delay_Logs': [f"{media_delay:.2f}s"],
-            'Mensagem_Maior_Delay': [mensagem_maior_delay],
-            'Maior_Delay_Encontrado': [f"{maior_delay:.2f}s"],
-            'Linha_Maior_Delay': [linha_maior_delay]
-        })[colunas]
-        if not isinstance(linha_estatisticas, pd.DataFrame):
-            linha_estatisticas = pd.DataFrame(linha_estatisticas)
-        
+        estatisticas = linha_estatisticas(len(df_filtrado), len(df_logs), df_logs['Delay'].sum(),
+                                          mensagem_maior_delay, maior_delay, linha_maior_delay)
+
         # Concatenar estatísticas antes dos logs
-        df_final = pd.concat([linha_estatisticas, df_resultado], ignore_index=True)
+        df_final = pd.concat([estatisticas, resultado_logs(df_logs)], ignore_index=True)
 
         # Exibir resultado
-        print("OK ")
         df_final.to_csv(caminho_saida, index=False)
 
     except Exception as e:
         print(f"❌ Erro inesperado: {e}")
 
 if __name__ == "__main__":
-    logs('logs/analise_par09.csv') 
\ No newline at end of file
+    logs('logs/analise_par09.csv')
@@ -1,15 +1,15 @@
 import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log
 
 def reboot(df_path, caminho_saida='Reboot/reboot_eventos.csv'):
     try:
-        # Tenta múltiplas codificações para abrir o CSV
-        for enc in ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']:
-            try:
-                df = pd.read_csv(df_path, encoding=enc, low_memory=False)
-                break
-            except Exception:
-                continue
-        else:
+        # Lê o log uma única vez (aceita caminho ou DataFrame já carregado)
+        df = carregar_log(df_path)
+        if df is None:
             print("❌ Erro: Não foi possível abrir o arquivo.")
             return
 
@@ -1,13 +1,32 @@
 import pandas as pd
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from servidor_dados import gravar_tabela, script_tabela_sob_demanda
+from tabelas_html import renderizar_linhas
+from blocos_html import criar_bloco, salvar_bloco
+
+# Linhas embutidas no HTML no modo sob demanda; as demais vêm do servidor
+LINHAS_INICIAIS = 50
+
+# Linha da tabela: linha do CSV, data, hora, motivo
+TEMPLATE_LINHA = """
+        <tr>
+            <td><a href=\"#\" class=\"Linha-link\" onclick=\"mostrarModal({0}); return false;\">{0}</a></td>
+            <td>{1}</td>
+            <td>{2}</td>
+            <td>{3}</td>
+        </tr>
+        """
+
 def gerar_bloco_reboot(
     csv_path='Reboot/reboot_eventos.csv',
-    filename='bloco_reboot.html'
+    filename='bloco_reboot.html',
+    pasta_saida=None,
+    dados_externos=None,
+    salvar=True
 ):
-    base_dir = Path(__file__).parent.parent / 'temp_blocos'
-    base_dir.mkdir(parents=True, exist_ok=True)
-    output_path = base_dir / filename
 
     # Lê o CSV de reboots
     df = pd.read_csv(csv_path, encoding='iso-8859-1')
@@ -18,9 +37,14 @@ def gerar_bloco_reboot(
     df['Data'] = df['Data/Hora Evento'].dt.strftime('%d/%m')
     df['Hora'] = df['Data/Hora Evento'].dt.strftime('%H:%M:%S')
 
+    if dados_externos:
+        colunas = ['linha', 'Data', 'Hora', 'Descrição Motivo Power On']
+        gravar_tabela(dados_externos, 'reboot', df[colunas].fillna(''))
+        df = df.iloc[:LINHAS_INICIAIS]
+    carregadas = f' id="tabela-reboot" data-carregadas="{len(df)}"' if dados_externos else ''
+
     # CSS isolado
     css = """
-    <style>
     .bloco-reboot {
         background: #fff;
         border-radius: 30px;
@@ -116,14 +140,30 @@ def gerar_bloco_reboot(
         padding: 10px 25px;
         background: #f8f9fa;
         border-radius: 20px;
-        display: inline-block;  
+        display: inline-block;
+    }
+    .bloco-reboot .ver-todos-btn {
+        margin-bottom: 10px;
+        background: linear-gradient(90deg,#764ba2,#667eea);
+        color: #fff;
+        border: none;
+        border-radius: 12px;
+        padding: 8px 22px;
+        font-size: 1em;
+        font-family: 'Saira', Arial, Helvetica, sans-serif;
+        font-weight: 700;
+        cursor: pointer;
+        box-shadow: 0 2px 8px rgba(102,51,153,0.07);
+        transition: background 0.2s, color 0.2s;
+    }
+    .bloco-reboot .ver-todos-btn:hover {
+        background: linear-gradient(90deg,#667eea,#764ba2);
+        color: #fff;
     }
-    </style>
     """
 
     # Monta tabela HTML
     html = f"""
-    {css}
     <div class="bloco-reboot">
         <span class="dashboard-title-reboot">Reboots do Equipamento</span>
         <div class="tabela-reboot-container">
@@ -133,7 +173,7 @@ def gerar_bloco_reboot(
             <div class="grafico-titulo-container">
                 <h3 class="grafico-titulo">Histórico de Reboots</h3>
             </div>
-            <table class="tabela-reboot">
+            <table class="tabela-reboot"{carregadas}>
                 <thead>
                     <tr>
                         <th>Linha</th>
@@ -145,28 +185,29 @@ def gerar_bloco_reboot(
                 <tbody>
     """
 
-    for _, row in df.iterrows():
-        linha_idx = row['linha']
-        html += f"""
-        <tr>
-            <td><a href=\"#\" class=\"Linha-link\" onclick=\"mostrarModal({linha_idx}); return false;\">{row['linha']}</a></td>
-            <td>{row['Data']}</td>
-            <td>{row['Hora']}</td>
-            <td>{row['Descrição Motivo Power On']}</td>
-        </tr>
-        """
+    html += renderizar_linhas(TEMPLATE_LINHA, df['linha'], df['Data'], df['Hora'], df['Descrição Motivo Power On'])
 
     html += """
                 </tbody>
             </table>
+    """
+    if dados_externos and total_reboots > len(df):
+        html += f"""
+            <div style='text-align:center; margin-top: 12px;'>
+                <button class='ver-todos-btn' onclick="carregarMaisLinhas('reboot', 'tabela-reboot')" id="btn-tabela-reboot">Carregar mais ({len(df)} de {total_reboots})</button>
+            </div>
+        """
+    html += """
         </div>
     </div>
     """
+    js = [script_tabela_sob_demanda()] if dados_externos else []
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
-
-    print(f"✅ Bloco de reboot salvo em: {output_path.resolve()}")
+    bloco = criar_bloco(filename, html, css=[css], js=js)
+    if salvar:
+        output_path = salvar_bloco(bloco, pasta_saida)
+        print(f"✅ Bloco de reboot salvo em: {output_path.resolve()}")
+    return bloco
 
 if __name__ == "__main__":
     gerar_bloco_reboot()
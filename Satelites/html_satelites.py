@@ -1,14 +1,17 @@
 import pandas as pd
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from blocos_html import criar_bloco, salvar_bloco
+
 def gerar_bloco_satelites(
     csv_todos='Satelites/estatisticas_gps_todos.csv',
     csv_validos='Satelites/estatisticas_gps_validos.csv',
     csv_resumo='Satelites/estatisticas_gps_resumo.csv',
-    filename='bloco_satelites.html'):
-    base_dir = Path(__file__).parent.parent / 'temp_blocos'
-    base_dir.mkdir(parents=True, exist_ok=True)
-    output_path = base_dir / filename
+    filename='bloco_satelites.html',
+    pasta_saida=None,
+    salvar=True):
 
     # Lê os CSVs
     df_todos = pd.read_csv(csv_todos)
@@ -18,7 +21,6 @@ def gerar_bloco_satelites(
 
     # CSS isolado
     css = """
-    <style>
     .bloco-satelites {
         background: #fff;
         border-radius: 30px;
@@ -132,7 +134,6 @@ def gerar_bloco_satelites(
         padding: 10px;
         margin-top: 8px;
     }
-    </style>
     """
 
     # Resumo
@@ -202,7 +203,6 @@ def gerar_bloco_satelites(
         '''
 
     html = f'''
-    {css}
     <div class="bloco-satelites">
         <span class="dashboard-title-analise">Análise de Satélites</span>
         {resumo_html(df_resumo)}
@@ -211,10 +211,11 @@ def gerar_bloco_satelites(
     </div>
     '''
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
-
-    print(f"✅ Bloco de satélites salvo em: {output_path.resolve()}")
+    bloco = criar_bloco(filename, html, css=[css])
+    if salvar:
+        output_path = salvar_bloco(bloco, pasta_saida)
+        print(f"✅ Bloco de satélites salvo em: {output_path.resolve()}")
+    return bloco
 
 if __name__ == "__main__":
     gerar_bloco_satelites()
\ No newline at end of file
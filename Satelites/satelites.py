@@ -1,73 +1,170 @@
 import os
+import numpy as np
 import pandas as pd
 from scipy import stats
 import matplotlib.pyplot as plt
 import seaborn as sns
+import sys
+from pathlib import Path
 
-def analise_medias(caminho_arquivo):
-    codificacoes = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-    for encoding in codificacoes:
-        try:
-            df = pd.read_csv(caminho_arquivo, encoding=encoding, low_memory=False)
-            break
-        except UnicodeDecodeError:
-            continue
-    else:
-        print("Erro: Não foi possível ler o arquivo com as codificações testadas.")
-        return None
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log, ler_log_em_blocos, tamanho_bloco_streaming
+
+COLUNAS_SATELITES = ['Data/Hora Evento', 'Satélites', 'Precisão GNSS']
 
+
+def filtrar_registros(df):
     df['Data/Hora Evento'] = pd.to_datetime(df['Data/Hora Evento'], errors='coerce')
     df['Satélites'] = pd.to_numeric(df['Satélites'], errors='coerce')
     df['Precisão GNSS'] = pd.to_numeric(df['Precisão GNSS'], errors='coerce')
+    return df.dropna(subset=['Data/Hora Evento', 'Satélites', 'Precisão GNSS'])
 
-    df_filtrado = df.dropna(subset=['Data/Hora Evento', 'Satélites', 'Precisão GNSS'])
 
-    coluna_dia = df_filtrado['Data/Hora Evento']
-    satelites = df_filtrado['Satélites']
-    hdop = df_filtrado['Precisão GNSS']
+def stats_serie(serie):
+    return {
+        'Média': f"{serie.mean():.2f}",
+        'Moda': f"{stats.mode(serie, keepdims=True).mode[0] if not serie.empty else '-'}",
+        'Desvio Padrão': f"{serie.std():.2f}",
+        'Valor máximo': f"{serie.max():.2f}",
+        'Valor mínimo': f"{serie.min():.2f}"
+    }
 
-    # Calcular totais e válidos/invalidos separadamente para Satélites e HDOP
-    total_registros = len(df_filtrado)
-    satelites_invalidos = (satelites == 0).sum()
-    hdop_invalidos = (hdop == 0).sum()
-    registros_validos = ((satelites > 0) & (hdop > 0)).sum()
-    registros_invalidos = total_registros - registros_validos
-    perc_invalidos = (registros_invalidos / total_registros * 100) if total_registros > 0 else 0
 
-    # === TABELA 1: TODOS OS DADOS ===
-    def stats_serie(serie):
-        return {
-            'Média': f"{serie.mean():.2f}",
-            'Moda': f"{stats.mode(serie, keepdims=True).mode[0] if not serie.empty else '-'}",
-            'Desvio Padrão': f"{serie.std():.2f}",
-            'Valor máximo': f"{serie.max():.2f}",
-            'Valor mínimo': f"{serie.min():.2f}"
-        }
+def acumulador_parcial(serie):
+    """Agregado parcial de uma série: contagem, média, soma dos quadrados dos desvios e frequências."""
+    return {
+        'n': len(serie),
+        'media': serie.mean() if len(serie) else 0.0,
+        'm2': ((serie - serie.mean()) ** 2).sum() if len(serie) else 0.0,
+        'frequencias': serie.value_counts(),
+    }
+
+
+def combinar_acumuladores(a, b):
+    """Combina dois agregados parciais (média e variância pelo método de Chan)."""
+    if a is None:
+        return b
+    n = a['n'] + b['n']
+    if n == 0:
+        return a
+    delta = b['media'] - a['media']
+    return {
+        'n': n,
+        'media': a['media'] + delta * b['n'] / n,
+        'm2': a['m2'] + b['m2'] + delta ** 2 * a['n'] * b['n'] / n,
+        'frequencias': a['frequencias'].add(b['frequencias'], fill_value=0),
+    }
+
+
+def stats_acumulador(acc):
+    """Mesmas estatísticas de stats_serie, calculadas a partir do agregado."""
+    n = acc['n']
+    frequencias = acc['frequencias']
+    if n == 0:
+        moda = '-'
+    else:
+        # Como scipy.stats.mode: em caso de empate, o menor valor
+        moda = frequencias[frequencias == frequencias.max()].index.min()
+    return {
+        'Média': f"{acc['media'] if n else np.nan:.2f}",
+        'Moda': f"{moda}",
+        'Desvio Padrão': f"{np.sqrt(acc['m2'] / (n - 1)) if n > 1 else np.nan:.2f}",
+        'Valor máximo': f"{frequencias.index.max() if n else np.nan:.2f}",
+        'Valor mínimo': f"{frequencias.index.min() if n else np.nan:.2f}"
+    }
 
+
+def salvar_tabelas(pasta_saida, todos, validos, total_registros, registros_validos):
+    # === TABELA 1: TODOS OS DADOS ===
     tabela_todos = pd.DataFrame([
-        {'Dado': 'Satélites', **stats_serie(satelites)},
-        {'Dado': 'Hdop', **stats_serie(hdop)}
+        {'Dado': 'Satélites', **todos[0]},
+        {'Dado': 'Hdop', **todos[1]}
     ])
-    tabela_todos.to_csv('Satelites/estatisticas_gps_todos.csv', index=False, encoding='utf-8-sig')
+    tabela_todos.to_csv(os.path.join(pasta_saida, 'estatisticas_gps_todos.csv'), index=False, encoding='utf-8-sig')
 
     # === TABELA 2: APENAS VÁLIDOS ===
-    satelites_validos = satelites[satelites > 0]
-    hdop_validos = hdop[hdop > 0]
     tabela_validos = pd.DataFrame([
-        {'Dado': 'Satélites', **stats_serie(satelites_validos)},
-        {'Dado': 'Hdop', **stats_serie(hdop_validos)}
+        {'Dado': 'Satélites', **validos[0]},
+        {'Dado': 'Hdop', **validos[1]}
     ])
-    tabela_validos.to_csv('Satelites/estatisticas_gps_validos.csv', index=False, encoding='utf-8-sig')
+    tabela_validos.to_csv(os.path.join(pasta_saida, 'estatisticas_gps_validos.csv'), index=False, encoding='utf-8-sig')
 
     # === RESUMO ===
+    registros_invalidos = total_registros - registros_validos
+    perc_invalidos = (registros_invalidos / total_registros * 100) if total_registros > 0 else 0
     resumo = pd.DataFrame([
         {'Métrica': 'Total de registros', 'Valor': total_registros},
         {'Métrica': 'Registros válidos', 'Valor': registros_validos},
         {'Métrica': '% Inválidos', 'Valor': f"{perc_invalidos:.1f}%"}
     ])
-    resumo.to_csv('Satelites/estatisticas_gps_resumo.csv', index=False, encoding='utf-8-sig')
+    resumo.to_csv(os.path.join(pasta_saida, 'estatisticas_gps_resumo.csv'), index=False, encoding='utf-8-sig')
 
     print("✅ Arquivos de estatísticas gerados com sucesso.")
 
+
+def _analise_em_blocos(caminho_arquivo, pasta_saida, tamanho_bloco):
+    """
+    Modo em blocos: guarda por série só contagem, média, soma dos quadrados dos
+    desvios e a tabela de frequências (poucos valores distintos em Satélites/HDOP)
+    """
+    acumuladores = {'sat': None, 'hdop': None, 'sat_validos': None, 'hdop_validos': None}
+    total_registros = registros_validos = 0
+
+    for bloco in ler_log_em_blocos(caminho_arquivo, COLUNAS_SATELITES, tamanho_bloco):
+        df_filtrado = filtrar_registros(bloco)
+        satelites = df_filtrado['Satélites']
+        hdop = df_filtrado['Precisão GNSS']
+        total_registros += len(df_filtrado)
+        registros_validos += int(((satelites > 0) & (hdop > 0)).sum())
+        series = {
+            'sat': satelites, 'hdop': hdop,
+            'sat_validos': satelites[satelites > 0], 'hdop_validos': hdop[hdop > 0],
+        }
+        for nome, serie in series.items():
+            acumuladores[nome] = combinar_acumuladores(acumuladores[nome], acumulador_parcial(serie))
+
+    if acumuladores['sat'] is None:
+        print("Erro: Não foi possível ler o arquivo com as codificações testadas.")
+        return None
+
+    salvar_tabelas(
+        pasta_saida,
+        [stats_acumulador(acumuladores['sat']), stats_acumulador(acumuladores['hdop'])],
+        [stats_acumulador(acumuladores['sat_validos']), stats_acumulador(acumuladores['hdop_validos'])],
+        total_registros,
+        registros_validos
+    )
+
+
+def analise_medias(caminho_arquivo, pasta_saida='Satelites', tamanho_bloco=None):
+    # Logs muito grandes são processados em blocos, sem carregar o arquivo inteiro
+    tamanho_bloco = tamanho_bloco_streaming(caminho_arquivo, tamanho_bloco)
+    if tamanho_bloco:
+        return _analise_em_blocos(caminho_arquivo, pasta_saida, tamanho_bloco)
+
+    df = carregar_log(caminho_arquivo)
+    if df is None:
+        print("Erro: Não foi possível ler o arquivo com as codificações testadas.")
+        return None
+
+    df_filtrado = filtrar_registros(df)
+
+    satelites = df_filtrado['Satélites']
+    hdop = df_filtrado['Precisão GNSS']
+
+    # Calcular totais e válidos/invalidos separadamente para Satélites e HDOP
+    total_registros = len(df_filtrado)
+    registros_validos = ((satelites > 0) & (hdop > 0)).sum()
+
+    satelites_validos = satelites[satelites > 0]
+    hdop_validos = hdop[hdop > 0]
+    salvar_tabelas(
+        pasta_saida,
+        [stats_serie(satelites), stats_serie(hdop)],
+        [stats_serie(satelites_validos), stats_serie(hdop_validos)],
+        total_registros,
+        registros_validos
+    )
+
 if __name__ == "__main__":
     analise_medias('logs/analise_par09.csv')
@@ -1,16 +1,34 @@
+import numpy as np
 import pandas as pd
 from typing import Optional
 from datetime import datetime
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log
+
+def _intervalos_gteri(datas: pd.Series, marcador: pd.Series, eh_gteri: pd.Series) -> pd.Series:
+    """
+    Intervalo (s) de cada GTERI até o GTERI anterior do mesmo trecho
+    Args:
+        datas: Data/Hora Evento, já ordenada
+        marcador: True nas mensagens que abrem um trecho (GTIGN ou GTIGF)
+        eh_gteri: True nos GTERI considerados
+    Returns:
+        Série alinhada a datas; o primeiro GTERI do trecho conta a partir do marcador
+        e as demais linhas ficam NaN
+    """
+    trecho = marcador.cumsum()
+    inicio_trecho = datas.where(marcador).groupby(trecho).transform('first')
+    anterior = datas[eh_gteri].groupby(trecho[eh_gteri]).shift()
+    anterior = anterior.fillna(inicio_trecho[eh_gteri])
+    return (datas[eh_gteri] - anterior).dt.total_seconds().reindex(datas.index)
 
 def temporizadas_entre_si_com_ign(df_path: str, caminho_saida: str = 'Tempo de posicoes/temporizadas_final.csv') -> None:
     try:
-        for enc in ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']:
-            try:
-                df = pd.read_csv(df_path, encoding=enc, low_memory=False)
-                break
-            except Exception:
-                continue
-        else:
+        df = carregar_log(df_path)
+        if df is None:
             print("❌ Erro: Não foi possível abrir o arquivo.")
             return
 
@@ -18,96 +36,36 @@ def temporizadas_entre_si_com_ign(df_path: str, caminho_saida: str = 'Tempo de p
         df['Data/Hora Evento'] = pd.to_datetime(df['Data/Hora Evento'], errors='coerce')
         df['Tipo Mensagem'] = df['Tipo Mensagem'].astype(str).str.strip().str.upper()
 
-        df['Position Report Type'] = df['Position Report Type'].apply(
-            lambda x: str(int(float(x))) if pd.notna(x) and str(x).strip() != '' else ''
-        )
         df['Motion Status'] = df['Motion Status'].astype(str).str.strip()
 
         df = df.dropna(subset=['Data/Hora Evento']).copy()
         df.sort_values(by='Data/Hora Evento', inplace=True)
 
-        # Variáveis de controle
-        last_ign = None
-        last_igf = None
-        last_gteri_ign = None
-        last_gteri_igf = None
-
-        resultado = []
-
-        for idx, row in df.iterrows():
-            # Garante que idx_int seja sempre inteiro
-            try:
-                if isinstance(idx, (int, float)):
-                    idx_int = int(idx)
-                elif isinstance(idx, str) and idx.isdigit():
-                    idx_int = int(idx)
-                else:
-                    idx_int = 0
-            except Exception:
-                idx_int = 0
-            tipo = row['Tipo Mensagem']
-            report_type = row['Position Report Type']
-            motion_status = row['Motion Status']
-            data = row['Data/Hora Evento']
-
-            diffON = None
-            diffOFF = None
-
-            motion_prefix = motion_status[0] if len(motion_status) > 0 else None
-
-            if tipo == 'GTIGN':
-                last_ign = data
-                last_gteri_ign = None
-                resultado.append({
-                    'linha': idx_int + 2,
-                    'Data/Hora Evento': data,
-                    'Tipo Mensagem': tipo,
-                    # 'Position Report Type': '',
-                    'Motion Status': '',
-                    'Diferença entre GTERI (IGN)': '',
-                    'Diferença entre GTERI (IGF)': ''
-                })
-
-            elif tipo == 'GTIGF':
-                last_igf = data
-                last_gteri_igf = None
-                resultado.append({
-                    'linha': idx_int + 2,
-                    'Data/Hora Evento': data,
-                    'Tipo Mensagem': tipo,
-                    # 'Position Report Type': '',
-                    'Motion Status': '',
-                    'Diferença entre GTERI (IGN)': '',
-                    'Diferença entre GTERI (IGF)': ''
-                })
-
-            elif tipo == 'GTERI' and report_type == '10':
-                if motion_prefix == '2':  # IGN ligado
-                    if last_gteri_ign is not None:
-                        diffON = (data - last_gteri_ign).total_seconds()
-                    elif last_ign is not None:
-                        diffON = (data - last_ign).total_seconds()
-                    last_gteri_ign = data
-
-                elif motion_prefix == '1':  # IGF desligado
-                    if last_gteri_igf is not None:
-                        diffOFF = (data - last_gteri_igf).total_seconds()
-                    elif last_igf is not None:
-                        diffOFF = (data - last_igf).total_seconds()
-                    last_gteri_igf = data
-
-                resultado.append({
-                    'linha': idx_int + 2,
-                    'Data/Hora Evento': data,
-                    'Tipo Mensagem': tipo,
-                    # 'Position Report Type': report_type,
-                    'Motion Status': motion_status,
-                    'Diferença entre GTERI (IGN)': diffON if diffON is not None else '',
-                    'Diferença entre GTERI (IGF)': diffOFF if diffOFF is not None else ''
-                })
+        tipo = df['Tipo Mensagem']
+        report_type = np.trunc(pd.to_numeric(df['Position Report Type'], errors='coerce'))
+        motion_prefix = df['Motion Status'].str[:1]
+        eh_gteri = (tipo == 'GTERI') & (report_type == 10)
+
+        # IGN ligado: GTERI com Motion Status '2', trechos iniciados por GTIGN
+        diffON = _intervalos_gteri(df['Data/Hora Evento'], tipo == 'GTIGN', eh_gteri & (motion_prefix == '2'))
+        # IGF desligado: GTERI com Motion Status '1', trechos iniciados por GTIGF
+        diffOFF = _intervalos_gteri(df['Data/Hora Evento'], tipo == 'GTIGF', eh_gteri & (motion_prefix == '1'))
+
+        manter = eh_gteri | tipo.isin(['GTIGN', 'GTIGF'])
+        resultado = {
+            'linha': df.index[manter].to_numpy() + 2,
+            'Data/Hora Evento': df.loc[manter, 'Data/Hora Evento'],
+            'Tipo Mensagem': tipo[manter],
+            'Motion Status': df['Motion Status'].where(eh_gteri, '')[manter],
+            'Diferença entre GTERI (IGN)': diffON[manter],
+            'Diferença entre GTERI (IGF)': diffOFF[manter],
+            # Identificação do dispositivo, para o perfil de intervalo esperado (perfis_intervalo)
+            'Tipo Dispositivo': df.loc[manter, 'Tipo Dispositivo'],
+            'Versão Firmware': df.loc[manter, 'Versão Firmware'],
+        }
 
         # Exportar resultado
-        df_result = pd.DataFrame(resultado)
+        df_result = pd.DataFrame(resultado).reset_index(drop=True)
         df_result.to_csv(caminho_saida, index=False, encoding='utf-8-sig')
         print(f"✅ Resultado salvo em: {caminho_saida}")
 
@@ -1,25 +1,56 @@
 import pandas as pd
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tabelas_html import renderizar_linhas
+from blocos_html import criar_bloco, salvar_bloco
+from perfis_intervalo import perfil_intervalo, classificar_desvios
+
+# Linha da tabela de faixas: faixa de desvio, quantidade, links das linhas de exemplo
+TEMPLATE_FAIXA = """
+            <tr>
+                <td>{0}</td>
+                <td>{1}</td>
+                <td>{2}</td>
+            </tr>
+            """
+
 def gerar_bloco_temporizadas(
     csv_path='Tempo de posicoes/temporizadas_final.csv',
-    filename='bloco_temporizadas.html'
+    filename='bloco_temporizadas.html',
+    pasta_saida=None,
+    salvar=True,
+    perfil=None
 ):
-    base_dir = Path(__file__).parent.parent / 'temp_blocos'
-    base_dir.mkdir(parents=True, exist_ok=True)
-    output_path = base_dir / filename
-
+    """
+    Bloco com as anomalias de intervalo entre GTERI, agrupadas em faixas de desvio
+    Args:
+        csv_path: CSV gerado por tempo_ERI.temporizadas_entre_si_com_ign
+        filename: nome do bloco
+        pasta_saida: pasta do arquivo do bloco (ver salvar_bloco)
+        salvar: grava o fragmento em disco
+        perfil: dict com intervalo_on, intervalo_off e tolerancia (s); se None,
+            vem de PERFIS_INTERVALO pelo tipo e firmware do dispositivo no CSV
+    Returns:
+        bloco estruturado (criar_bloco)
+    """
     df = pd.read_csv(csv_path, encoding='utf-8-sig')
+    perfil = perfil or perfil_intervalo(df)
 
-    # GTERI com ignição ligada: Motion Status começa com '2', tempo diferente de 180s
-    df_on = df[(df['Tipo Mensagem'] == 'GTERI') & df['Motion Status'].astype(str).str.startswith('2') & (df['Diferença entre GTERI (IGN)'] != '')].copy()
-    df_on['tempo'] = pd.to_numeric(df_on['Diferença entre GTERI (IGN)'], errors='coerce')
-    anomalias_on = df_on[df_on['tempo'] != 180]
+    # GTERI com ignição ligada: Motion Status começa com '2'
+    df_on = df[(df['Tipo Mensagem'] == 'GTERI') & df['Motion Status'].astype(str).str.startswith('2') & (df['Diferença entre GTERI (IGN)'] != '')]
+    total_anomalias_on, faixas_on = classificar_desvios(
+        pd.to_numeric(df_on['Diferença entre GTERI (IGN)'], errors='coerce'), df_on['linha'],
+        perfil['intervalo_on'], perfil['tolerancia']
+    )
 
-    # GTERI com ignição desligada: Motion Status começa com '1', tempo diferente de 3600s
-    df_off = df[(df['Tipo Mensagem'] == 'GTERI') & df['Motion Status'].astype(str).str.startswith('1') & (df['Diferença entre GTERI (IGF)'] != '')].copy()
-    df_off['tempo'] = pd.to_numeric(df_off['Diferença entre GTERI (IGF)'], errors='coerce')
-    anomalias_off = df_off[df_off['tempo'] != 3600]
+    # GTERI com ignição desligada: Motion Status começa com '1'
+    df_off = df[(df['Tipo Mensagem'] == 'GTERI') & df['Motion Status'].astype(str).str.startswith('1') & (df['Diferença entre GTERI (IGF)'] != '')]
+    total_anomalias_off, faixas_off = classificar_desvios(
+        pd.to_numeric(df_off['Diferença entre GTERI (IGF)'], errors='coerce'), df_off['linha'],
+        perfil['intervalo_off'], perfil['tolerancia']
+    )
 
     # CSS isolado
     css = """
@@ -115,27 +146,12 @@ def gerar_bloco_temporizadas(
         text-shadow: none;
         margin: 0;
     }
-    .ver-todos-btn {
-        margin-bottom: 10px;
-        background: linear-gradient(90deg,#764ba2,#667eea);
-        color: #fff;
-        border: none;
-        border-radius: 12px;
-        padding: 8px 22px;
-        font-size: 1em;
-        font-family: 'Saira', Arial, Helvetica, sans-serif;
-        font-weight: 700;
-        cursor: pointer;
-        box-shadow: 0 2px 8px rgba(102,51,153,0.07);
-        transition: background 0.2s, color 0.2s;
+    .bloco-temporizadas .tabela-temporizadas td:first-child {
+        white-space: nowrap;
     }
-    .ver-todos-btn:hover {
-        background: linear-gradient(90deg,#667eea,#764ba2);
-        color: #fff;
+    .bloco-temporizadas .Linha-link {
+        margin: 0 4px;
     }
-    .extra-row { display: none; }
-    .expanded .extra-row { display: table-row; }
-    
     """
     css_resumo = """
     .resumo-anomalias-container {
@@ -171,102 +187,64 @@ def gerar_bloco_temporizadas(
     }
     """
 
-    def tabela_html(df, titulo, table_id):
+    def tabela_html(faixas, titulo, esperado):
+        exemplos = [
+            ''.join(
+                f'<a href="#" class="Linha-link" onclick="mostrarModal({linha}); return false;">{linha}</a>'
+                for linha in linhas
+            )
+            for linhas in faixas['exemplos']
+        ]
         html = f"""
         <div class=\"tabela-temporizadas-container\">
-            <div class=\"grafico-titulo-container\"><span class=\"grafico-titulo\">{titulo}</span></div>
-            <table class=\"tabela-temporizadas\" id="{table_id}">
+            <div class=\"grafico-titulo-container\"><span class=\"grafico-titulo\">{titulo} (esperado {esperado:g} ± {perfil['tolerancia']:g} s)</span></div>
+            <table class=\"tabela-temporizadas\">
                 <thead>
                     <tr>
-                        <th>Linha</th>
-                        <th>Data</th>
-                        <th>Hora</th>
-                        <th>Tempo (s)</th>
+                        <th>Desvio do intervalo</th>
+                        <th>Mensagens</th>
+                        <th>Exemplos (linha)</th>
                     </tr>
                 </thead>
                 <tbody>
         """
-        for i, (_, row) in enumerate(df.iterrows()):
-            datahora = pd.to_datetime(row['Data/Hora Evento'])
-            data = datahora.strftime('%d/%m/%Y') if not pd.isnull(datahora) else ''
-            hora = datahora.strftime('%H:%M:%S') if not pd.isnull(datahora) else ''
-            extra_class = ''
-            if i >= 5:
-                extra_class = 'extra-row'
-            html += f"""
-            <tr class='{extra_class}'>
-                <td><a href=\"#\" class=\"Linha-link\" onclick=\"mostrarModal({int(row['linha'])}); return false;\">{int(row['linha'])}</a></td>
-                <td>{data}</td>
-                <td>{hora}</td>
-                <td>{int(row['tempo']) if not pd.isnull(row['tempo']) else ''}</td>
-            </tr>
-            """
-        html += f"""
+        html += renderizar_linhas(TEMPLATE_FAIXA, faixas['faixa'], faixas['quantidade'], exemplos)
+        html += """
                 </tbody>
             </table>
-            <div style='text-align:center; margin-top: 12px;'>
-                <button class='ver-todos-btn' onclick=\"toggleExpand('{table_id}')\" id=\"btn-{table_id}\">Ver todos os dados</button>
-            </div>
         </div>
         """
         return html
 
-    # Resumos de anomalias
-    total_on = len(df_on)
-    total_anomalias_on = len(anomalias_on)
-    total_off = len(df_off)
-    total_anomalias_off = len(anomalias_off)
-
     resumo_html = f'''
     <div class="resumo-anomalias-container">
         <div class="resumo-anomalia-card">
             <div class="resumo-anomalia-titulo">Analomalias por tempo em movimento</div>
             <div class="resumo-anomalia-numero">{total_anomalias_on}</div>
-            <div class="resumo-anomalia-legenda">de {total_on} eventos de temporização</div>
+            <div class="resumo-anomalia-legenda">de {len(df_on)} eventos de temporização</div>
         </div>
         <div class="resumo-anomalia-card">
             <div class="resumo-anomalia-titulo">Anomalias por modo econômico</div>
             <div class="resumo-anomalia-numero">{total_anomalias_off}</div>
-            <div class="resumo-anomalia-legenda">de {total_off} eventos de temporização</div>
+            <div class="resumo-anomalia-legenda">de {len(df_off)} eventos de temporização</div>
         </div>
     </div>
     '''
 
-    # JavaScript para expandir/recolher as tabelas
-    js = '''
-    <script>
-    function toggleExpand(tableId) {
-        var table = document.getElementById(tableId);
-        var btn = document.getElementById('btn-' + tableId);
-        if (table.classList.contains('expanded')) {
-            table.classList.remove('expanded');
-            btn.textContent = 'Ver todos os dados';
-        } else {
-            table.classList.add('expanded');
-            btn.textContent = 'Ver menos';
-        }
-    }
-    </script>
-    '''
-
     html = f"""
-    <style>
-    {css}
-    {css_resumo}
-    </style>
     <div class="bloco-temporizadas">
         <span class="dashboard-title-temporizadas">Anomalias de Intervalo entre mensagens temporizadas</span>
         {resumo_html}
-        {tabela_html(anomalias_on, 'Anomalias por tempo em movimento', 'tabela-on')}
-        {tabela_html(anomalias_off, 'Anomalias por modo econômico', 'tabela-off')}
+        {tabela_html(faixas_on, 'Anomalias por tempo em movimento', perfil['intervalo_on'])}
+        {tabela_html(faixas_off, 'Anomalias por modo econômico', perfil['intervalo_off'])}
     </div>
-    {js}
     """
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
-
-    print(f"✅ Bloco de temporizadas salvo em: {output_path.resolve()}")
+    bloco = criar_bloco(filename, html, css=[css, css_resumo])
+    if salvar:
+        output_path = salvar_bloco(bloco, pasta_saida)
+        print(f"✅ Bloco de temporizadas salvo em: {output_path.resolve()}")
+    return bloco
 
 if __name__ == "__main__":
     gerar_bloco_temporizadas()
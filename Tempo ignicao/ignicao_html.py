@@ -1,24 +1,46 @@
 import pandas as pd
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tabelas_html import renderizar_linhas
+from blocos_html import criar_bloco, salvar_bloco
+
+# Linha da tabela: linha do CSV, ignição, tempo, data, resumo
+TEMPLATE_LINHA = """
+        <tr>
+            <td><a href="#" class="Linha-link" onclick="mostrarModal({0}); return false;">{0}</a></td>
+            <td>{1}</td>
+            <td>{2}</td>
+            <td>{3}</td>
+            <td>{4}</td>
+        </tr>
+        """
+
 def gerar_bloco_ignicao(
     csv_path='Tempo ignicao/tempo_ignicao_viagens.csv',
-    filename='bloco_ignicao.html'
+    filename='bloco_ignicao.html',
+    pasta_saida=None,
+    ciclos=None,
+    salvar=True
 ):
-    base_dir = Path(__file__).parent.parent / 'temp_blocos'
-    base_dir.mkdir(parents=True, exist_ok=True)
-    output_path = base_dir / filename
 
-    # Lê o CSV de tempos de ignição
-    df = pd.read_csv(csv_path, encoding='utf-8-sig')
+    # Usa os ciclos já calculados (time_ignicao.ciclos_ignicao) ou lê o CSV
+    if ciclos is not None:
+        df = pd.DataFrame(ciclos)
+    else:
+        df = pd.read_csv(csv_path, encoding='utf-8-sig')
 
-    # Encontrar maior e menor tempo ON
-    df_on = df[df['ign on (s)'].notnull() & (df['ign on (s)'] != '')]
-    max_on = df_on.loc[df_on['ign on (s)'].idxmax()]
-    min_on = df_on.loc[df_on['ign on (s)'].idxmin()]
+    # Encontrar maior e menor tempo ON (log sem ciclo IGN -> IGF completo: tabela vazia)
+    df_on = df[df['ign on (s)'].notnull() & (df['ign on (s)'] != '')] if 'ign on (s)' in df.columns else df
+    if not df_on.empty:
+        max_on = df_on.loc[df_on['ign on (s)'].idxmax()]
+        min_on = df_on.loc[df_on['ign on (s)'].idxmin()]
+    else:
+        max_on = min_on = None
 
     # Encontrar maior e menor tempo OFF
-    df_off = df[df['ign off (s)'].notnull() & (df['ign off (s)'] != '')]
+    df_off = df[df['ign off (s)'].notnull() & (df['ign off (s)'] != '')] if 'ign off (s)' in df.columns else df
     if not df_off.empty:
         max_off = df_off.loc[df_off['ign off (s)'].idxmax()]
         min_off = df_off.loc[df_off['ign off (s)'].idxmin()]
@@ -28,13 +50,14 @@ def gerar_bloco_ignicao(
     # Montar linhas da tabela
     linhas = []
     # ON
-    linhas.append({
-        'linha': int(max_on['Linha_IGN']),
-        'tipo': 'on',
-        'tempo': int(max_on['ign on (s)']),
-        'data': max_on['Dia_IGN'],
-        'desc': 'Maior tempo ON'
-    })
+    if max_on is not None:
+        linhas.append({
+            'linha': int(max_on['Linha_IGN']),
+            'tipo': 'on',
+            'tempo': int(max_on['ign on (s)']),
+            'data': max_on['Dia_IGN'],
+            'desc': 'Maior tempo ON'
+        })
     # linhas.append({
     #     'linha': int(min_on['Linha_IGN']),
     #     'tipo': 'on',
@@ -61,7 +84,6 @@ def gerar_bloco_ignicao(
 
     # CSS isolado
     css = """
-    <style>
     .bloco-ignicao {
         background: #fff;
         border-radius: 30px;
@@ -126,12 +148,10 @@ def gerar_bloco_ignicao(
     .Linha-link:hover {
         color: #667eea;
     }
-    </style>
     """
 
     # Montar HTML
     html = f"""
-    {css}
     <div class="bloco-ignicao">
         <span class="dashboard-title-ignicao">Tempos de Ignição (ON/OFF)</span>
         <div class="tabela-ignicao-container">
@@ -148,16 +168,10 @@ def gerar_bloco_ignicao(
                 <tbody>
     """
 
-    for l in linhas:
-        html += f"""
-        <tr>
-            <td><a href="#" class="Linha-link" onclick="mostrarModal({l['linha']}); return false;">{l['linha']}</a></td>
-            <td>{l['tipo']}</td>
-            <td>{l['tempo']}</td>
-            <td>{l['data']}</td>
-            <td>{l['desc']}</td>
-        </tr>
-        """
+    html += renderizar_linhas(
+        TEMPLATE_LINHA,
+        *([l[campo] for l in linhas] for campo in ('linha', 'tipo', 'tempo', 'data', 'desc'))
+    )
 
     html += """
                 </tbody>
@@ -166,10 +180,11 @@ def gerar_bloco_ignicao(
     </div>
     """
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
-
-    print(f"✅ Bloco de ignição salvo em: {output_path.resolve()}")
+    bloco = criar_bloco(filename, html, css=[css])
+    if salvar:
+        output_path = salvar_bloco(bloco, pasta_saida)
+        print(f"✅ Bloco de ignição salvo em: {output_path.resolve()}")
+    return bloco
 
 if __name__ == "__main__":
     gerar_bloco_ignicao()
@@ -1,91 +1,82 @@
+import numpy as np
 import pandas as pd
+import sys
+from pathlib import Path
 
-def time_ign_por_viagem(caminho_csv, caminho_saida='Tempo ignicao/tempo_ignicao_viagens.csv'):
-    try:
-        # Leitura do CSV com fallback de codificações
-        codificacoes = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-        for enc in codificacoes:
-            try:
-                df = pd.read_csv(caminho_csv, encoding=enc, low_memory=False)
-                break
-            except:
-                continue
-        else:
-            print("❌ Erro: Não foi possível ler o arquivo.")
-            return
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log
+from segmentacao_ignicao import classificar_eventos_ignicao
+
+
+def ciclos_ignicao(df):
+    """
+    Monta os ciclos completos IGN -> IGF -> próximo IGN
+    Cada ciclo começa num IGN, termina no primeiro IGF depois dele e o
+    próximo ciclo começa no primeiro IGN depois desse IGF.
+    Args:
+        df: DataFrame do log (índice original preservado, linha = índice + 2)
+    Returns:
+        dict coluna -> np.ndarray (Linha_IGN, Dia_IGN, ign on (s), Linha_IGF,
+        Dia_IGF, ign off (s)); 'ign off (s)' é NaN no último ciclo sem IGN seguinte
+    """
+    # Tratamento de datas
+    df = df.copy()
+    df['Data/Hora Evento'] = pd.to_datetime(df['Data/Hora Evento'], errors='coerce')
+    df = df.dropna(subset=['Data/Hora Evento'])
+    df = df.sort_values('Data/Hora Evento')
 
-        # Tratamento de datas
-        df['Data/Hora Evento'] = pd.to_datetime(df['Data/Hora Evento'], errors='coerce')
-        df = df.dropna(subset=['Data/Hora Evento'])
-        df = df.sort_values('Data/Hora Evento')
+    # Separar IGN/IGF mantendo o índice original
+    evento = classificar_eventos_ignicao(df)
+    igns = df[evento.isin(['GTIGN', 'IGN'])]
+    igfs = df[evento.isin(['GTIGF', 'IGF'])]
+    ign_t = igns['Data/Hora Evento'].to_numpy()
+    igf_t = igfs['Data/Hora Evento'].to_numpy()
 
-        # Mapeamento de evento baseado no Motion Status
-        def get_evento(row):
-            motion_status = str(row.get('Motion Status', '')).strip()
-            if motion_status.startswith('1'):
-                return 'IGF'  # Ignição desligada
-            elif motion_status.startswith('2'):
-                return 'IGN'  # Ignição ligada
-            else:
-                # Fallback para o método anterior se Motion Status não estiver disponível
-                tipo = str(row.get('Tipo Mensagem', '')).strip().upper()
-                codigo = str(row.get('Event Code', '')).strip()
-                if tipo:
-                    return tipo
-                elif codigo:
-                    return {'20': 'GTIGF', '21': 'GTIGN'}.get(codigo, '')
-            return ''
+    # Primeiro IGF depois de cada IGN e primeiro IGN depois de cada IGF
+    igf_apos_ign = np.searchsorted(igf_t, ign_t, side='right')
+    ign_apos_igf = np.searchsorted(ign_t, igf_t, side='right')
 
-        df['Evento'] = df.apply(get_evento, axis=1)
+    # Encadeia os ciclos: cada passo é O(1)
+    pos_ign = []
+    pos_igf = []
+    k = 0
+    while k < len(ign_t) and igf_apos_ign[k] < len(igf_t):
+        pos_ign.append(k)
+        pos_igf.append(igf_apos_ign[k])
+        k = ign_apos_igf[igf_apos_ign[k]]
+    pos_ign = np.array(pos_ign, dtype=np.int64)
+    pos_igf = np.array(pos_igf, dtype=np.int64)
 
-        # Separar IGN/IGF mantendo o índice original
-        igns = df[df['Evento'].isin(['GTIGN', 'IGN'])]
-        igfs = df[df['Evento'].isin(['GTIGF', 'IGF'])]
+    pos_prox = ign_apos_igf[pos_igf]
+    tem_prox = pos_prox < len(ign_t)
+    prox_t = np.full(len(pos_igf), np.datetime64('NaT'), dtype=ign_t.dtype)
+    prox_t[tem_prox] = ign_t[pos_prox[tem_prox]]
 
-        # Montar ciclos completos: IGN -> IGF -> próximo IGN
-        ciclos = []
-        ign_idx = 0
-        igf_idx = 0
-        while ign_idx < len(igns) and igf_idx < len(igfs):
-            ign_row = igns.iloc[ign_idx]
-            ign_time = ign_row['Data/Hora Evento']
-            ign_index = igns.index[ign_idx]
-            # Procurar o IGF após esse IGN
-            igf_possivel = igfs[igfs['Data/Hora Evento'] > ign_time]
-            if len(igf_possivel) == 0:
-                break
-            igf_row = igf_possivel.iloc[0]
-            igf_time = igf_row['Data/Hora Evento']
-            igf_index = igf_possivel.index[0]
-            tempo_on = (igf_time - ign_time).total_seconds()
-            # Procurar o próximo IGN após esse IGF
-            next_ign_possivel = igns[igns['Data/Hora Evento'] > igf_time]
-            if len(next_ign_possivel) == 0:
-                tempo_off = None
-                next_ign_index = None
-                next_ign_time = None
-            else:
-                next_ign_row = next_ign_possivel.iloc[0]
-                next_ign_time = next_ign_row['Data/Hora Evento']
-                next_ign_index = next_ign_possivel.index[0]
-                tempo_off = (next_ign_time - igf_time).total_seconds()
-            ciclos.append({
-                'Linha_IGN': int(ign_index) + 2,
-                'Dia_IGN': ign_time.strftime('%d/%m/%Y'),
-                'ign on (s)': tempo_on,
-                'Linha_IGF': int(igf_index) + 2,
-                'Dia_IGF': igf_time.strftime('%d/%m/%Y'),
-                'ign off (s)': tempo_off if tempo_off is not None else ''
-            })
-            # Avançar para o próximo ciclo
-            # O próximo ciclo começa no próximo IGN após esse IGF
-            ign_idx = igns.index.get_loc(next_ign_index) if next_ign_index is not None else len(igns)
-            igf_idx = igfs.index.get_loc(igf_index) + 1
+    inicio = pd.DatetimeIndex(ign_t[pos_ign])
+    fim = pd.DatetimeIndex(igf_t[pos_igf])
+    return {
+        'Linha_IGN': igns.index.to_numpy()[pos_ign] + 2,
+        'Dia_IGN': np.asarray(inicio.strftime('%d/%m/%Y'), dtype=object),
+        'ign on (s)': (fim - inicio).total_seconds().to_numpy(),
+        'Linha_IGF': igfs.index.to_numpy()[pos_igf] + 2,
+        'Dia_IGF': np.asarray(fim.strftime('%d/%m/%Y'), dtype=object),
+        'ign off (s)': (pd.DatetimeIndex(prox_t) - fim).total_seconds().to_numpy(),
+    }
+
+
+def time_ign_por_viagem(caminho_csv, caminho_saida='Tempo ignicao/tempo_ignicao_viagens.csv'):
+    try:
+        # Leitura única do log (caminho ou DataFrame já carregado)
+        df = carregar_log(caminho_csv)
+        if df is None:
+            print("❌ Erro: Não foi possível ler o arquivo.")
+            return
 
-        df_final = pd.DataFrame(ciclos)
-        df_final.to_csv(caminho_saida, index=False, encoding='utf-8-sig')
+        ciclos = ciclos_ignicao(df)
+        pd.DataFrame(ciclos).to_csv(caminho_saida, index=False, encoding='utf-8-sig')
         print(f"✅ Arquivo salvo em: {caminho_saida}")
-        return df_final
+        # Colunas dos ciclos, repassadas pelo relatorio.py ao gerar_bloco_ignicao
+        return ciclos
 
     except Exception as e:
         print(f"❌ Erro inesperado: {e}")
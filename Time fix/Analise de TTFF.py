@@ -1,26 +1,93 @@
+import os
 import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log, ler_log_em_blocos, tamanho_bloco_streaming
+
+COLUNAS_ORDENADAS = ['Linha', 'Data/Hora Evento', 'Time fix', 'Média Geral', 'Média dos valores com delay']
+
+
+def calcular_time_fix_bloco(df):
+    """Time fix (s) de cada mensagem com data do evento e do GNSS."""
+    # Converte datas
+    df['Data/Hora Evento'] = pd.to_datetime(df['Data/Hora Evento'], errors='coerce')
+    df['GNSS UTC Time'] = pd.to_datetime(df['GNSS UTC Time'], errors='coerce')
+
+    df_filtrado = df.dropna(subset=['Data/Hora Evento', 'GNSS UTC Time']).copy()
+
+    df_filtrado['Time fix'] = (df_filtrado['Data/Hora Evento'] - df_filtrado['GNSS UTC Time']).dt.total_seconds()
+
+    # Adiciona o número da linha (contando o cabeçalho)
+    df_filtrado['Linha'] = df_filtrado.index + 2  # +2 porque o cabeçalho é linha 1 e o index começa em 0
+    return df_filtrado
+
+
+def imprimir_resumo(caminho_saida, media_geral, media_com_delay, total, com_delay):
+    print(f'✅ Arquivo salvo como: {caminho_saida}')
+    print(f'📊 Média geral do Time fix: {media_geral:.2f} segundos')
+    print(f'📈 Média dos valores com delay: {media_com_delay:.2f} segundos')
+    print(f'🔢 Total de registros processados: {total}')
+    print(f'⏱️ Registros com delay (>0): {com_delay}')
+
+
+def _time_fix_em_blocos(caminho_csv, caminho_saida, tamanho_bloco):
+    """
+    Modo em blocos: 1ª passada grava Linha/Data/Time fix num arquivo parcial e
+    acumula somas e contagens; 2ª passada relê o parcial em blocos e acrescenta
+    as colunas de médias, que só são conhecidas no fim
+    """
+    caminho_parcial = caminho_saida + '.parcial'
+    total = com_delay = 0
+    soma = soma_com_delay = 0.0
 
-def calcular_time_fix(caminho_csv, caminho_saida='Time fix/time_fix_resultado.csv'):
     try:
-        # Tenta múltiplas codificações
-        codificacoes = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-        for encoding in codificacoes:
-            try:
-                df = pd.read_csv(caminho_csv, encoding=encoding)
-                break
-            except UnicodeDecodeError:
-                continue
-        else:
-            print("❌ Erro: Não foi possível ler o arquivo com as codificações testadas.")
-            return
+        with open(caminho_parcial, 'w', encoding='utf-8', newline='') as parcial:
+            primeiro = True
+            for bloco in ler_log_em_blocos(caminho_csv, ['Data/Hora Evento', 'GNSS UTC Time'], tamanho_bloco):
+                df_filtrado = calcular_time_fix_bloco(bloco)
+                valores_com_delay = df_filtrado.loc[df_filtrado['Time fix'] > 0, 'Time fix']
+                total += len(df_filtrado)
+                soma += df_filtrado['Time fix'].sum()
+                com_delay += len(valores_com_delay)
+                soma_com_delay += valores_com_delay.sum()
+                df_filtrado[COLUNAS_ORDENADAS[:3]].to_csv(parcial, index=False, header=primeiro)
+                primeiro = False
+
+        media_geral = soma / total if total > 0 else float('nan')
+        media_com_delay = soma_com_delay / com_delay if com_delay > 0 else 0
+
+        with open(caminho_saida, 'w', encoding='utf-8', newline='') as saida:
+            primeiro = True
+            for trecho in pd.read_csv(caminho_parcial, dtype=str, keep_default_na=False, chunksize=tamanho_bloco):
+                trecho['Média Geral'] = media_geral
+                trecho['Média dos valores com delay'] = media_com_delay
+                trecho.to_csv(saida, index=False, header=primeiro)
+                primeiro = False
+            if primeiro:
+                pd.DataFrame(columns=COLUNAS_ORDENADAS).to_csv(saida, index=False)
+
+        imprimir_resumo(caminho_saida, media_geral, media_com_delay, total, com_delay)
+    finally:
+        if os.path.exists(caminho_parcial):
+            os.remove(caminho_parcial)
 
-        # Converte datas
-        df['Data/Hora Evento'] = pd.to_datetime(df['Data/Hora Evento'], errors='coerce')
-        df['GNSS UTC Time'] = pd.to_datetime(df['GNSS UTC Time'], errors='coerce')
 
-        df_filtrado = df.dropna(subset=['Data/Hora Evento', 'GNSS UTC Time']).copy()
+def calcular_time_fix(caminho_csv, caminho_saida='Time fix/time_fix_resultado.csv', tamanho_bloco=None):
+    try:
+        # Logs muito grandes são processados em blocos, sem carregar o arquivo inteiro
+        tamanho_bloco = tamanho_bloco_streaming(caminho_csv, tamanho_bloco)
+        if tamanho_bloco:
+            return _time_fix_em_blocos(caminho_csv, caminho_saida, tamanho_bloco)
 
-        df_filtrado['Time fix'] = (df_filtrado['Data/Hora Evento'] - df_filtrado['GNSS UTC Time']).dt.total_seconds()
+        # Leitura única do log (caminho ou DataFrame já carregado)
+        df = carregar_log(caminho_csv)
+        if df is None:
+            print("❌ Erro: Não foi possível ler o arquivo com as codificações testadas.")
+            return
+
+        df_filtrado = calcular_time_fix_bloco(df)
 
         # Calcula as médias
         media_geral = df_filtrado['Time fix'].mean()
@@ -29,24 +96,15 @@ def calcular_time_fix(caminho_csv, caminho_saida='Time fix/time_fix_resultado.cs
         valores_com_delay = df_filtrado[df_filtrado['Time fix'] > 0]['Time fix']
         media_com_delay = valores_com_delay.mean() if len(valores_com_delay) > 0 else 0
 
-        # Adiciona o número da linha (contando o cabeçalho)
-        df_filtrado['Linha'] = df_filtrado.index + 2  # +2 porque o cabeçalho é linha 1 e o index começa em 0
-
         # Adiciona as colunas de médias
         df_filtrado['Média Geral'] = media_geral
         df_filtrado['Média dos valores com delay'] = media_com_delay
 
         # Reorganiza as colunas para ficar mais clara
-        colunas_ordenadas = ['Linha', 'Data/Hora Evento', 'Time fix', 'Média Geral', 'Média dos valores com delay']
-        colunas_restantes = [col for col in df_filtrado.columns if col not in colunas_ordenadas]
-        df_final = df_filtrado[colunas_ordenadas]
+        df_final = df_filtrado[COLUNAS_ORDENADAS]
 
         df_final.to_csv(caminho_saida, index=False)
-        print(f'✅ Arquivo salvo como: {caminho_saida}')
-        print(f'📊 Média geral do Time fix: {media_geral:.2f} segundos')
-        print(f'📈 Média dos valores com delay: {media_com_delay:.2f} segundos')
-        print(f'🔢 Total de registros processados: {len(df_filtrado)}')
-        print(f'⏱️ Registros com delay (>0): {len(valores_com_delay)}')
+        imprimir_resumo(caminho_saida, media_geral, media_com_delay, len(df_filtrado), len(valores_com_delay))
 
     except Exception as e:
         print(f"\n❌ Erro inesperado: {e}")
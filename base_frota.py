@@ -0,0 +1,175 @@
+import argparse
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from leitura_logs import detectar_encoding_arquivo
+from cache_relatorio import hash_arquivo
+
+# Base SQLite com os resultados de todas as execuções, por IMEI
+ARQUIVO_BASE = 'resultados_frota.sqlite'
+
+# Consultas prontas sobre a última execução de cada IMEI
+CONSULTAS = {
+    'reboots_por_firmware': """
+        SELECT e.versao_firmware,
+               COUNT(DISTINCT e.imei) AS dispositivos,
+               COUNT(r.execucao_id) AS reboots,
+               ROUND(1.0 * COUNT(r.execucao_id) / COUNT(DISTINCT e.imei), 2) AS reboots_por_dispositivo
+        FROM ultimas_execucoes e
+        LEFT JOIN resultado_reboot_eventos r ON r.execucao_id = e.id
+        GROUP BY e.versao_firmware
+        ORDER BY reboots_por_dispositivo DESC
+    """,
+    'ttff_por_tipo': """
+        SELECT e.tipo_dispositivo,
+               COUNT(DISTINCT e.imei) AS dispositivos,
+               ROUND(AVG(t."Time fix"), 2) AS ttff_medio,
+               ROUND(AVG(CASE WHEN t."Time fix" > 0 THEN t."Time fix" END), 2) AS ttff_medio_com_delay
+        FROM ultimas_execucoes e
+        JOIN resultado_time_fix_resultado t ON t.execucao_id = e.id
+        GROUP BY e.tipo_dispositivo
+        ORDER BY ttff_medio DESC
+    """,
+    'deriva_por_dispositivo': """
+        SELECT e.imei, e.tipo_dispositivo, e.versao_firmware,
+               COUNT(d.execucao_id) AS paradas_com_deriva,
+               ROUND(SUM(d.distancia_fantasma_m), 1) AS distancia_fantasma_m,
+               ROUND(MAX(d.raio_m), 1) AS maior_raio_m
+        FROM ultimas_execucoes e
+        JOIN resultado_deriva_gps d ON d.execucao_id = e.id
+        GROUP BY e.id
+        ORDER BY distancia_fantasma_m DESC
+    """,
+    'execucoes': """
+        SELECT id, imei, tipo_dispositivo, versao_firmware, linhas, data_execucao, log
+        FROM execucoes
+        ORDER BY id
+    """,
+}
+
+
+def _conectar(caminho_base):
+    return sqlite3.connect(caminho_base, timeout=30)
+
+
+def _preparar_base(con):
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS execucoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            imei TEXT NOT NULL,
+            log TEXT,
+            hash_log TEXT,
+            data_execucao TEXT,
+            tipo_dispositivo TEXT,
+            versao_firmware TEXT,
+            linhas INTEGER,
+            etapas_concluidas TEXT,
+            etapas_com_falha TEXT
+        )
+    """)
+    con.execute('CREATE INDEX IF NOT EXISTS ix_execucoes_imei ON execucoes (imei)')
+    con.execute("""
+        CREATE VIEW IF NOT EXISTS ultimas_execucoes AS
+        SELECT * FROM execucoes WHERE id IN (SELECT MAX(id) FROM execucoes GROUP BY imei)
+    """)
+
+
+def _ler_resultado(caminho):
+    """CSV de resultado de uma análise (None se vazio ou ilegível)."""
+    enc = detectar_encoding_arquivo(caminho)
+    if enc is None:
+        return None
+    try:
+        return pd.read_csv(caminho, encoding='utf-8-sig' if enc == 'utf-8' else enc)
+    except pd.errors.EmptyDataError:
+        return None
+
+
+def _garantir_colunas(con, tabela, colunas):
+    """Acrescenta à tabela as colunas que ainda não existem (ex.: novos tipos de evento por dia)."""
+    existentes = {row[1] for row in con.execute(f'PRAGMA table_info("{tabela}")')}
+    if not existentes:
+        return
+    for coluna in colunas:
+        if coluna not in existentes:
+            con.execute(f'ALTER TABLE "{tabela}" ADD COLUMN "{coluna}"')
+
+
+def imei_do_resumo(resumo):
+    """IMEI do resumo de executar_relatorio ou, sem ele, o prefixo do nome do log."""
+    device = resumo.get('device') or {}
+    imei = device.get('imei', 'N/A')
+    if imei == 'N/A':
+        imei = Path(resumo['log']).name.split('_')[0]
+    return imei
+
+
+def gravar_execucao(caminho_base, resumo, pasta_relatorio, arquivos):
+    """
+    Grava uma execução do relatório e os CSVs de resultado na base da frota
+    Args:
+        caminho_base: arquivo SQLite da base
+        resumo: dict devolvido por executar_relatorio
+        pasta_relatorio: pasta onde o relatório gravou os CSVs
+        arquivos: nomes dos CSVs de resultado (relativos à pasta); cada um vai
+            para a tabela resultado_<nome do arquivo>, com execucao_id e imei
+    Returns:
+        id da execução gravada
+    """
+    device = resumo.get('device') or {}
+    imei = imei_do_resumo(resumo)
+    with closing(_conectar(caminho_base)) as con, con:
+        _preparar_base(con)
+        cursor = con.execute(
+            """INSERT INTO execucoes (imei, log, hash_log, data_execucao, tipo_dispositivo, versao_firmware,
+                                      linhas, etapas_concluidas, etapas_com_falha)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                imei, resumo['log'], hash_arquivo(resumo['log']), datetime.now().isoformat(timespec='seconds'),
+                device.get('tipo_dispositivo'), device.get('versao_firmware'), resumo.get('linhas'),
+                ','.join(resumo.get('concluidas', [])), ','.join(resumo.get('falhas', [])),
+            )
+        )
+        execucao_id = cursor.lastrowid
+
+        for arquivo in arquivos:
+            caminho = Path(pasta_relatorio) / arquivo
+            df = _ler_resultado(caminho) if caminho.is_file() else None
+            if df is None:
+                continue
+            df.insert(0, 'execucao_id', execucao_id)
+            df.insert(1, 'imei', imei)
+            tabela = 'resultado_' + Path(arquivo).stem
+            _garantir_colunas(con, tabela, df.columns)
+            df.to_sql(tabela, con, if_exists='append', index=False)
+            con.execute(f'CREATE INDEX IF NOT EXISTS "ix_{tabela}_execucao" ON "{tabela}" (execucao_id)')
+            con.execute(f'CREATE INDEX IF NOT EXISTS "ix_{tabela}_imei" ON "{tabela}" (imei)')
+    return execucao_id
+
+
+def consultar(caminho_base, consulta):
+    """
+    Consulta a base da frota
+    Args:
+        caminho_base: arquivo SQLite da base
+        consulta: nome de uma consulta pronta (CONSULTAS) ou SQL
+    Returns:
+        DataFrame com o resultado
+    """
+    sql = CONSULTAS.get(consulta, consulta)
+    with closing(_conectar(caminho_base)) as con, con:
+        _preparar_base(con)
+        return pd.read_sql_query(sql, con)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Consulta a base de resultados da frota.')
+    parser.add_argument('base', nargs='?', default=str(Path('frota') / ARQUIVO_BASE))
+    parser.add_argument('consulta', nargs='?', default='execucoes',
+                        help=f"SQL ou uma das consultas prontas: {', '.join(CONSULTAS)}")
+    args = parser.parse_args()
+    print(consultar(args.base, args.consulta).to_string(index=False))
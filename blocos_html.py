@@ -0,0 +1,128 @@
+import json
+import re
+from pathlib import Path
+
+# <style>/<script> de um fragmento salvo em disco (formato de temp_blocos/)
+PADRAO_TAGS = re.compile(r'<(style|script)\b([^>]*)>(.*?)</\1>', flags=re.DOTALL)
+PADRAO_SRC = re.compile(r'src=["\']([^"\']+)["\']')
+
+
+def criar_bloco(nome, html, css=None, js=None, scripts=None, graficos=None):
+    """
+    Bloco estruturado do dashboard, montado pelos gerar_bloco_*
+    Args:
+        nome: nome do bloco (o mesmo do arquivo .html em temp_blocos/)
+        html: marcação do bloco, sem <style> nem <script>
+        css: lista de trechos de CSS
+        js: lista de trechos de JavaScript
+        scripts: URLs de scripts externos usados pelo bloco
+        graficos: dict id do <canvas> -> configuração do Chart.js (apenas JSON)
+    Returns:
+        dict com as partes do bloco
+    """
+    return {
+        'nome': nome,
+        'html': html.strip(),
+        'css': list(css or []),
+        'js': [trecho.strip() for trecho in js or []],
+        'scripts': list(scripts or []),
+        'graficos': dict(graficos or {}),
+    }
+
+
+def script_graficos(graficos):
+    """JavaScript que cria os gráficos do Chart.js a partir das configurações dos blocos."""
+    return f"""document.addEventListener('DOMContentLoaded', function() {{
+        setTimeout(function() {{
+            window.charts = window.charts || {{}};
+            if (typeof Chart !== 'undefined' && Chart.register && typeof ChartZoom !== 'undefined') {{
+                Chart.register(ChartZoom);
+            }}
+            const configuracoes = {json.dumps(graficos, ensure_ascii=False)};
+            Object.keys(configuracoes).forEach(function(id) {{
+                const canvas = document.getElementById(id);
+                if (!canvas || window.charts[id]) return;
+                window.charts[id] = new Chart(canvas.getContext('2d'), configuracoes[id]);
+                canvas.addEventListener('dblclick', function() {{
+                    window.charts[id].resetZoom();
+                }});
+            }});
+        }}, 100);
+    }});"""
+
+
+def _sem_repeticao(trechos):
+    return list(dict.fromkeys(trecho for trecho in trechos if trecho))
+
+
+def consolidar_blocos(blocos, scripts_carregados=()):
+    """
+    Junta as partes dos blocos para o dashboard, sem repetir trechos iguais
+    Args:
+        blocos: lista ordenada de blocos (criar_bloco)
+        scripts_carregados: URLs de scripts externos já incluídos no <head>
+    Returns:
+        dict com 'html' (lista de marcações), 'css', 'js' e 'scripts' (listas sem repetição)
+    """
+    graficos = {}
+    for bloco in blocos:
+        graficos.update(bloco['graficos'])
+    js = _sem_repeticao(trecho for bloco in blocos for trecho in bloco['js'])
+    if graficos:
+        js.append(script_graficos(graficos))
+    return {
+        'html': [f"<!-- Block: {bloco['nome']} -->\n{bloco['html']}\n" for bloco in blocos],
+        'css': _sem_repeticao(trecho for bloco in blocos for trecho in bloco['css']),
+        'js': js,
+        'scripts': [url for url in _sem_repeticao(url for bloco in blocos for url in bloco['scripts'])
+                    if url not in scripts_carregados],
+    }
+
+
+def html_do_bloco(bloco):
+    """Fragmento HTML autocontido do bloco, no formato dos arquivos de temp_blocos/."""
+    partes = [f'<script src="{url}"></script>' for url in bloco['scripts']]
+    partes += [f'<style>{trecho}</style>' for trecho in bloco['css']]
+    partes.append(bloco['html'])
+    js = bloco['js'] + ([script_graficos(bloco['graficos'])] if bloco['graficos'] else [])
+    partes += [f'<script>\n{trecho}\n</script>' for trecho in js]
+    return '\n'.join(partes)
+
+
+def salvar_bloco(bloco, pasta_saida=None):
+    """
+    Grava o fragmento do bloco, para uso fora do relatorio.py (unir_blocos lê temp_blocos/)
+    Args:
+        bloco: bloco estruturado (criar_bloco)
+        pasta_saida: pasta do arquivo; se None, temp_blocos/ na raiz do repositório
+    Returns:
+        caminho do arquivo gravado
+    """
+    base_dir = Path(pasta_saida) if pasta_saida else Path(__file__).parent / 'temp_blocos'
+    base_dir.mkdir(parents=True, exist_ok=True)
+    output_path = base_dir / bloco['nome']
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(html_do_bloco(bloco))
+    return output_path
+
+
+def ler_bloco(caminho):
+    """
+    Converte um fragmento salvo em disco de volta em bloco estruturado
+    Returns:
+        bloco (criar_bloco) ou None se o arquivo estiver vazio
+    """
+    with open(caminho, 'r', encoding='utf-8') as f:
+        conteudo = f.read().strip()
+    if not conteudo:
+        return None
+    css, js, scripts = [], [], []
+    for tag, atributos, corpo in PADRAO_TAGS.findall(conteudo):
+        src = PADRAO_SRC.search(atributos)
+        if tag == 'style':
+            css.append(corpo)
+        elif src:
+            scripts.append(src.group(1))
+        else:
+            js.append(corpo)
+    return criar_bloco(Path(caminho).name, PADRAO_TAGS.sub('', conteudo), css, js, scripts)
@@ -0,0 +1,110 @@
+import hashlib
+import json
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent
+
+# Pasta (dentro da pasta do relatório) com o manifesto e os resultados guardados
+PASTA_CACHE = 'cache_relatorio'
+ARQUIVO_MANIFESTO = 'manifesto.json'
+
+# Módulos da raiz que só orquestram o relatório: não alteram o resultado das etapas
+MODULOS_ORQUESTRACAO = {'relatorio.py', 'frota.py', 'html_final.py', 'cache_relatorio.py'}
+
+
+def hash_arquivo(caminho):
+    """Hash do conteúdo do arquivo (None se não existir)."""
+    caminho = Path(caminho)
+    if not caminho.is_file():
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    with open(caminho, 'rb') as f:
+        for trecho in iter(lambda: f.read(1 << 20), b''):
+            h.update(trecho)
+    return h.hexdigest()
+
+
+def hash_valores(valores):
+    """Hash de uma estrutura serializável em JSON (ordem das chaves não importa)."""
+    texto = json.dumps(valores, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def hash_codigo_comum():
+    """Hash dos módulos compartilhados da raiz (leitura, segmentação, distâncias...)."""
+    return hash_valores({
+        arquivo.name: hash_arquivo(arquivo)
+        for arquivo in sorted(RAIZ.glob('*.py'))
+        if arquivo.name not in MODULOS_ORQUESTRACAO
+    })
+
+
+def ler_manifesto(pasta):
+    """Manifesto do relatório: etapa -> chave das entradas e hash de cada saída."""
+    caminho = Path(pasta) / PASTA_CACHE / ARQUIVO_MANIFESTO
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            manifesto = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifesto = {}
+    manifesto.setdefault('etapas', {})
+    return manifesto
+
+
+def gravar_manifesto(pasta, manifesto):
+    caminho = Path(pasta) / PASTA_CACHE / ARQUIVO_MANIFESTO
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=1)
+
+
+def em_dia(manifesto, nome, chave, pasta):
+    """
+    Verifica se a etapa pode ser reaproveitada
+    Returns:
+        True se a chave das entradas é a mesma da última execução e nenhuma
+        saída registrada foi apagada ou alterada desde então
+    """
+    registro = manifesto['etapas'].get(nome)
+    if registro is None or registro['chave'] != chave:
+        return False
+    return all(hash_arquivo(Path(pasta) / arquivo) == h for arquivo, h in registro['saidas'].items())
+
+
+def registrar(manifesto, nome, chave, pasta, saidas=(), conteudo=None):
+    """
+    Registra a execução de uma etapa no manifesto
+    Args:
+        manifesto: manifesto carregado por ler_manifesto
+        nome: nome da etapa
+        chave: hash das entradas da etapa
+        pasta: pasta do relatório
+        saidas: arquivos gerados pela etapa (relativos à pasta)
+        conteudo: resultado em memória a guardar (ex.: o bloco), serializável em JSON
+    """
+    saidas = list(saidas)
+    if conteudo is not None:
+        caminho = Path(pasta) / PASTA_CACHE / f'{nome}.json'
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(conteudo, f, ensure_ascii=False)
+        saidas.append(f'{PASTA_CACHE}/{nome}.json')
+    manifesto['etapas'][nome] = {
+        'chave': chave,
+        'saidas': {arquivo: hash_arquivo(Path(pasta) / arquivo) for arquivo in saidas},
+    }
+
+
+def conteudo_guardado(pasta, nome):
+    """Resultado em memória guardado por registrar (None se não houver)."""
+    caminho = Path(pasta) / PASTA_CACHE / f'{nome}.json'
+    if not caminho.is_file():
+        return None
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def descartar(manifesto, nomes):
+    """Remove etapas do manifesto, forçando a execução delas na próxima rodada."""
+    for nome in nomes:
+        manifesto['etapas'].pop(nome, None)
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+from distancias import distancias_incrementais_m
+from segmentacao_ignicao import identificar_blocos_ignicao
+from simplificacao_trajeto import projetar_metros
+
+# Lado (m) das células da grade espacial; o núcleo de uma parada é a célula mais
+# ocupada e as oito vizinhas
+TAMANHO_CELULA_M = 25.0
+
+# Paradas com menos pontos que isto não são avaliadas
+MIN_PONTOS_PARADA = 3
+
+# Raio (m) a partir do qual a dispersão de uma parada conta como deriva
+RAIO_DERIVA_M = 30.0
+
+
+def blocos_efeito_estrela(df):
+    """
+    Pontos analisados no efeito estrela: coordenadas válidas, em ordem, Motion Status 21
+    Args:
+        df: log carregado (carregar_log); é alterado no lugar
+    Returns:
+        lista de DataFrames (um por bloco de ignição), com a coluna 'linha'
+    """
+    df['linha'] = df.index + 2
+    df['Data/Hora Evento'] = pd.to_datetime(df['Data/Hora Evento'], errors='coerce')
+    df['Latitude'] = pd.to_numeric(df['Latitude'], errors='coerce')
+    df['Longitude'] = pd.to_numeric(df['Longitude'], errors='coerce')
+    df = df.dropna(subset=['Data/Hora Evento', 'Latitude', 'Longitude', 'Motion Status'])
+    df = df[(df['Latitude'] != 0) & (df['Longitude'] != 0) & (df['Latitude'].abs() <= 90) & (df['Longitude'].abs() <= 180)]
+    df = df.sort_values('Data/Hora Evento').reset_index(drop=True)
+    return [bloco[pd.to_numeric(bloco['Motion Status'], errors='coerce') == 21] for bloco in identificar_blocos_ignicao(df)]
+
+
+def detectar_deriva(blocos, tamanho_celula_m=TAMANHO_CELULA_M, min_pontos=MIN_PONTOS_PARADA,
+                    raio_deriva_m=RAIO_DERIVA_M):
+    """
+    Encontra paradas com deriva de GPS (efeito estrela): trechos do bloco em que o
+    'Hodômetro Total' não avança, mas as posições se espalham
+    A ocupação de uma grade espacial (agrupamento por célula, O(n log n)) define o núcleo
+    de cada parada; a dispersão é medida a partir do centro do núcleo.
+    Args:
+        blocos: lista de DataFrames (um por bloco de ignição), com 'Latitude', 'Longitude',
+            'Hodômetro Total' e 'Data/Hora Evento', em ordem
+        tamanho_celula_m: lado das células da grade, em metros
+        min_pontos: mínimo de pontos de uma parada
+        raio_deriva_m: raio mínimo, em metros, para a parada ser reportada
+    Returns:
+        DataFrame com uma linha por parada com deriva: bloco, linhas/horários de início e fim,
+        hodômetro, pontos, pontos fora do núcleo, centro, raio_m e distancia_fantasma_m
+        (soma das distâncias entre pontos consecutivos da parada)
+    """
+    partes = [bloco.assign(bloco=i + 1) for i, bloco in enumerate(blocos) if not bloco.empty]
+    colunas = ['bloco', 'linha_inicial', 'linha_final', 'inicio', 'fim', 'Hodômetro Total', 'pontos',
+               'pontos_fora_do_nucleo', 'latitude', 'longitude', 'raio_m', 'distancia_fantasma_m']
+    if not partes or 'Hodômetro Total' not in partes[0].columns:
+        return pd.DataFrame(columns=colunas)
+    pontos = pd.concat(partes, ignore_index=True)
+
+    lat = pontos['Latitude'].to_numpy(dtype=float)
+    lon = pontos['Longitude'].to_numpy(dtype=float)
+    x, y = projetar_metros(lat, lon)
+    hodometro = pd.to_numeric(pontos['Hodômetro Total'], errors='coerce')
+
+    # Parada: pontos consecutivos do mesmo bloco com o mesmo hodômetro
+    nova = pontos['bloco'].ne(pontos['bloco'].shift()) | hodometro.ne(hodometro.shift())
+    parada = nova.cumsum().to_numpy() - 1
+
+    # Grade espacial: célula mais ocupada de cada parada
+    celula_x = np.floor(x / tamanho_celula_m).astype(np.int64)
+    celula_y = np.floor(y / tamanho_celula_m).astype(np.int64)
+    ocupacao = pd.DataFrame({'parada': parada, 'cx': celula_x, 'cy': celula_y}).value_counts(sort=False)
+    ocupacao = ocupacao.sort_values(ascending=False, kind='stable').reset_index()
+    modal = ocupacao.drop_duplicates('parada').set_index('parada').sort_index()
+    nucleo = ((np.abs(celula_x - modal['cx'].to_numpy()[parada]) <= 1)
+              & (np.abs(celula_y - modal['cy'].to_numpy()[parada]) <= 1))
+
+    # Centro do núcleo e dispersão de todos os pontos da parada
+    no_nucleo = np.bincount(parada, weights=nucleo)
+    centro_x = np.bincount(parada, weights=x * nucleo) / no_nucleo
+    centro_y = np.bincount(parada, weights=y * nucleo) / no_nucleo
+    distancia_centro = np.hypot(x - centro_x[parada], y - centro_y[parada])
+
+    incremental = distancias_incrementais_m(lat, lon)
+    incremental[nova.to_numpy()] = 0.0
+
+    grupos = pd.DataFrame({
+        'parada': parada,
+        'bloco': pontos['bloco'],
+        'linha': pontos['linha'] if 'linha' in pontos.columns else pd.Series(np.nan, index=pontos.index),
+        'data': pontos['Data/Hora Evento'],
+        'hodometro': hodometro,
+        'fora': ~nucleo,
+        'lat_nucleo': np.where(nucleo, lat, np.nan),
+        'lon_nucleo': np.where(nucleo, lon, np.nan),
+        'distancia_centro': distancia_centro,
+        'incremental': incremental,
+    }).groupby('parada', sort=True)
+    resultado = pd.DataFrame({
+        'bloco': grupos['bloco'].first(),
+        'linha_inicial': grupos['linha'].first(),
+        'linha_final': grupos['linha'].last(),
+        'inicio': grupos['data'].first(),
+        'fim': grupos['data'].last(),
+        'Hodômetro Total': grupos['hodometro'].first(),
+        'pontos': grupos.size(),
+        'pontos_fora_do_nucleo': grupos['fora'].sum(),
+        'latitude': grupos['lat_nucleo'].mean().round(6),
+        'longitude': grupos['lon_nucleo'].mean().round(6),
+        'raio_m': grupos['distancia_centro'].max().round(1),
+        'distancia_fantasma_m': grupos['incremental'].sum().round(1),
+    })
+    deriva = resultado['Hodômetro Total'].notna() & (resultado['pontos'] >= min_pontos) & (resultado['raio_m'] > raio_deriva_m)
+    return resultado[deriva].reset_index(drop=True)[colunas]
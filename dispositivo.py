@@ -0,0 +1,52 @@
+def get_device_info(df):
+    """
+    Extrai informações do dispositivo do DataFrame
+    Args:
+        df: DataFrame com dados do dispositivo
+    Returns:
+        dict com informações do dispositivo
+    """
+    if df is None or df.empty:
+        return {
+            'tipo_dispositivo': 'N/A',
+            'imei': 'N/A',
+            'versao_firmware': 'N/A'
+        }
+    # Mapeamento de tipos de dispositivo
+    tipo_mapping = {
+        '802003': 'TM-10',
+        '385349': 'TM-08',
+        '83': 'TM-07'
+    }
+    # Extrair tipo de dispositivo
+    tipo_dispositivo = 'N/A'
+    if 'Tipo Dispositivo' in df.columns:
+        tipos_unicos = df['Tipo Dispositivo'].dropna().unique()
+        if len(tipos_unicos) > 0:
+            try:
+                tipo_int = int(float(tipos_unicos[0])) 
+                tipo_raw = str(tipo_int)
+            except:
+                tipo_raw = str(tipos_unicos[0])  # fallback
+            tipo_dispositivo = tipo_mapping.get(tipo_raw, f"Desconhecido ({tipo_raw})")
+    # Extrair IMEI
+    imei = 'N/A'
+    if 'IMEI' in df.columns:
+        imeis_unicos = df['IMEI'].dropna().unique()
+        if len(imeis_unicos) > 0:
+            imei = ', '.join([
+                str(int(float(i))) if isinstance(i, (str, float, int)) and str(i).replace('.', '', 1).isdigit()
+                else str(i)
+                for i in imeis_unicos
+            ])
+    # Extrair Versão Firmware
+    versao_firmware = 'N/A'
+    if 'Versão Firmware' in df.columns:
+        versoes_unicas = df['Versão Firmware'].dropna().unique()
+        if len(versoes_unicas) > 0:
+            versao_firmware = ', '.join([str(v) for v in versoes_unicas])
+    return {
+        'tipo_dispositivo': tipo_dispositivo,
+        'imei': imei,
+        'versao_firmware': versao_firmware
+    }
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+# Raio médio da Terra, o mesmo usado pela biblioteca haversine
+RAIO_MEDIO_TERRA_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Distância de grande círculo entre pares de pontos, calculada em lote
+    Args:
+        lat1, lon1: latitude/longitude de origem em graus (escalares ou arrays)
+        lat2, lon2: latitude/longitude de destino em graus
+    Returns:
+        np.ndarray com as distâncias em km (NaN onde faltar coordenada)
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    d = np.sin((lat2 - lat1) * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) * 0.5) ** 2
+    return 2 * RAIO_MEDIO_TERRA_KM * np.arcsin(np.sqrt(d))
+
+
+def distancias_incrementais_m(lat, lon):
+    """Distância em metros de cada ponto ao anterior da sequência (0.0 no primeiro)."""
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    dist = np.zeros(len(lat))
+    if len(lat) > 1:
+        dist[1:] = haversine_km(lat[:-1], lon[:-1], lat[1:], lon[1:]) * 1000
+    return dist
+
+
+def posicoes_linhas_anteriores(linhas, df_original):
+    """
+    Posição, em df_original, da linha do CSV imediatamente anterior a cada linha
+    Args:
+        linhas: números de linha do CSV ('linha' = índice + 2)
+        df_original: log completo com a coluna 'linha'
+    Returns:
+        np.ndarray de posições para iloc (-1 quando a linha anterior não existe)
+    """
+    anteriores = np.asarray(linhas, dtype=np.int64) - 1
+    return pd.Index(df_original['linha']).get_indexer(anteriores)
+
+
+def _valores_nas_posicoes(serie, posicoes):
+    valores = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=float)
+    return np.where(posicoes >= 0, valores[np.maximum(posicoes, 0)], np.nan)
+
+
+def distancias_blocos(blocos, df_original):
+    """
+    Tabela de distâncias incrementais dos blocos de ignição
+    A distância de cada ponto é medida até a linha anterior do CSV original,
+    e o hodômetro incremental é relativo ao primeiro ponto do bloco.
+    Args:
+        blocos: lista de DataFrames (um por bloco de ignição)
+        df_original: log completo com a coluna 'linha'
+    Returns:
+        DataFrame com uma linha por ponto, na ordem dos blocos
+    """
+    partes = [bloco.assign(bloco=i + 1) for i, bloco in enumerate(blocos) if not bloco.empty]
+    if not partes:
+        return pd.DataFrame()
+    pontos = pd.concat(partes, ignore_index=True)
+
+    ordem = pontos.groupby('bloco', sort=False).cumcount().to_numpy()
+    primeiro = ordem == 0
+    lat = pontos['Latitude'].astype(float).to_numpy()
+    lon = pontos['Longitude'].astype(float).to_numpy()
+
+    posicoes = posicoes_linhas_anteriores(pontos['linha'], df_original)
+    lat_ant = _valores_nas_posicoes(df_original['Latitude'], posicoes)
+    lon_ant = _valores_nas_posicoes(df_original['Longitude'], posicoes)
+
+    dist_incr = haversine_km(lat_ant, lon_ant, lat, lon) * 1000
+    dist_incr[primeiro] = 0.0
+
+    if 'Hodômetro Total' in pontos.columns:
+        hodo_total = pontos['Hodômetro Total']
+        hodo_total_f = pd.to_numeric(hodo_total, errors='coerce').to_numpy(dtype=float)
+        hodo_inicial = pd.Series(hodo_total_f).groupby(pontos['bloco']).transform('first').to_numpy()
+        hodo_incremental = np.where(primeiro, 0.0, hodo_total_f - hodo_inicial)
+    else:
+        hodo_total = None
+        hodo_incremental = np.where(primeiro, 0.0, np.nan)
+    if 'Hodômetro Total' in df_original.columns:
+        hodo_ant = _valores_nas_posicoes(df_original['Hodômetro Total'], posicoes)
+    else:
+        hodo_ant = np.full(len(pontos), np.nan)
+
+    return pd.DataFrame({
+        'linha': pontos['linha'],
+        'bloco': pontos['bloco'],
+        'ordem_no_bloco': ordem + 1,
+        'latitude': lat,
+        'longitude': lon,
+        'latitude_anterior': lat_ant,
+        'longitude_anterior': lon_ant,
+        'Hodômetro Total': hodo_total,
+        'Hodômetro anterior': hodo_ant,
+        'Hodômetro incremental do bloco': hodo_incremental,
+        'Data/Hora Evento': pontos['Data/Hora Evento'],
+        'GNSS UTC Time': pontos.get('GNSS UTC Time', ''),
+        'Tipo Mensagem': pontos.get('Tipo Mensagem', ''),
+        'Motion Status': pontos['Motion Status'],
+        'Distância incremental (m)': dist_incr,
+    })
@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log
+from deteccao_deriva import blocos_efeito_estrela, detectar_deriva
+
+
+def deriva_gps(df_path, caminho_saida='efeito estrela/deriva_gps.csv'):
+    try:
+        # Lê o log uma única vez (aceita caminho ou DataFrame já carregado)
+        df = carregar_log(df_path)
+        if df is None:
+            print("❌ Erro: Não foi possível abrir o arquivo.")
+            return
+
+        df_deriva = detectar_deriva(blocos_efeito_estrela(df))
+        df_deriva.to_csv(caminho_saida, index=False, encoding='utf-8-sig')
+
+        print(f" Paradas com deriva de GPS: {len(df_deriva)} "
+              f"(distância fantasma total: {df_deriva['distancia_fantasma_m'].sum():.1f} m)")
+        print(f"✅ Análise concluída. Resultados salvos em: {caminho_saida}")
+
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+
+if __name__ == "__main__":
+    deriva_gps('logs/867488065171646_novo.csv')
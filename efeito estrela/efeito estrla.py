@@ -1,15 +1,90 @@
 import pandas as pd
+import numpy as np
 import folium
+from branca.element import MacroElement
+from jinja2 import Template
 from datetime import datetime
 import webbrowser
+import json
 import os
 import sys
+from pathlib import Path
 from typing import List, Tuple, Optional
-from haversine import haversine
 import math
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log
+from distancias import distancias_incrementais_m
+from segmentacao_ignicao import identificar_blocos_ignicao as segmentar_blocos_ignicao
+from simplificacao_trajeto import simplificar_bloco, TOLERANCIA_SIMPLIFICACAO_M, RAIO_PARADO_M
+from paleta_cores import (PALETA_BLOCOS, DEGRADE_AZUL_ROXO_VERMELHO, cores_ciclicas, degrade_pontos,
+                          paradas_escurecimento, tabela_degrade)
+
 
 caminho_csv = "logs/867488065171646_novo.csv"  # ALTERE AQUI para o caminho do seu arquivo
+simplificar_trajeto = False  # ALTERE AQUI para agrupar o jitter parado e simplificar o trajeto
+
+# Acima deste total de pontos o mapa passa para o modo de alto volume (GeoJSON + canvas)
+LIMITE_PONTOS_MARCADORES = 2000
+
+# Níveis de cor do degradê das linhas no modo de alto volume
+NIVEIS_DEGRADE_LINHA = 64
+
+# Cor do primeiro ponto de cada bloco (popup), nos dois modos
+COR_INICIO_BLOCO = '#00f6ff'  # Azul fluorescente
+
+# Popup dos pontos no modo de alto volume, montado no navegador a partir das propriedades
+SCRIPT_POPUP_PONTO = """
+<script>
+function popupPontoBloco(p, latlng) {
+    return '<div style="font-family: Arial, sans-serif; min-width: 200px;">'
+        + '<h4 style="color: ' + p.cor + '; margin: 0;">🚗 Bloco ' + p.bloco + ' - Ponto ' + p.ponto + '/' + p.total + '</h4>'
+        + '<hr style="margin: 5px 0;">'
+        + '<b>📅 Data/Hora:</b> ' + p.data + '<br>'
+        + '<b>🌍 Coordenadas:</b> ' + latlng.lat.toFixed(6) + ', ' + latlng.lng.toFixed(6) + '<br>'
+        + '<b>🔧 Motion Status:</b> ' + p.motion + '<br>'
+        + '<b>📏 Distância incremental:</b> ' + p.dist_incr.toFixed(1) + ' m<br>'
+        + '<b>📏 Distância acumulada:</b> ' + p.dist_total.toFixed(1) + ' m<br>'
+        + '<b>⏱️ Progresso temporal:</b> ' + p.progresso.toFixed(1) + '%<br>'
+        + '<b>🛣️ Hodômetro Atual:</b> ' + p.hodometro
+        + '</div>';
+}
+</script>
+"""
+
+
+class CamadaBlocoGeoJson(MacroElement):
+    """Pontos e trajeto de um bloco como GeoJSON: estilo e popup saem das propriedades de cada feature."""
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        L.geoJSON({{ this.linhas }}, {
+            style: function(f) {
+                return {color: f.properties.cor, weight: f.properties.peso, opacity: f.properties.opacidade};
+            }
+        }).addTo({{ this._parent.get_name() }});
+        L.geoJSON({{ this.pontos }}, {
+            pointToLayer: function(f, latlng) {
+                var tipo = f.properties.tipo;
+                if (tipo === 'inicio') {
+                    return L.marker(latlng, {icon: L.AwesomeMarkers.icon({icon: 'star', markerColor: 'red', prefix: 'glyphicon'})});
+                }
+                return L.circleMarker(latlng, {
+                    radius: 6, color: tipo === 'marco' ? 'green' : 'black', weight: tipo === 'marco' ? 3 : 2,
+                    fill: true, fillColor: f.properties.cor, fillOpacity: 0.85
+                });
+            },
+            onEachFeature: function(f, layer) {
+                layer.bindPopup(function() { return popupPontoBloco(f.properties, layer.getLatLng()); }, {maxWidth: 300});
+            }
+        }).addTo({{ this._parent.get_name() }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, pontos: dict, linhas: dict):
+        super().__init__()
+        self._name = 'CamadaBlocoGeoJson'
+        self.pontos = json.dumps(pontos, ensure_ascii=False, separators=(',', ':'))
+        self.linhas = json.dumps(linhas, separators=(',', ':'))
 
 
 def ler_csv_com_encoding(caminho_csv: str) -> Optional[pd.DataFrame]:
@@ -17,20 +92,12 @@ def ler_csv_com_encoding(caminho_csv: str) -> Optional[pd.DataFrame]:
         print(f"❌ Arquivo não encontrado: {caminho_csv}")
         return None
     
-    codificacoes = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-    
-    for encoding in codificacoes:
-        try:
-            print(f"🔄 Tentando ler com encoding: {encoding}")
-            df = pd.read_csv(caminho_csv, encoding=encoding, low_memory=False)
-            print(f"✅ Arquivo lido com sucesso usando encoding: {encoding}")
-            return df
-        except Exception as e:
-            print(f"❌ Falha com {encoding}: {str(e)}")
-            continue
-    
-    print("❌ Não foi possível ler o arquivo com nenhuma codificação testada")
-    return None
+    df = carregar_log(caminho_csv)
+    if df is None:
+        print("❌ Não foi possível ler o arquivo com nenhuma codificação testada")
+        return None
+    print(f"✅ Arquivo lido com sucesso: {len(df)} linhas")
+    return df
 
 
 def validar_colunas(df: pd.DataFrame) -> bool:
@@ -77,61 +144,15 @@ def processar_dados(df: pd.DataFrame) -> pd.DataFrame:
 def identificar_blocos_ignicao(df: pd.DataFrame) -> List[pd.DataFrame]:
     print("🔄 Identificando blocos de ignição...")
     
-    blocos = []
-    bloco_atual = []
-    ignicao_ligada = False
-    
-    for idx, row in df.iterrows():
-        motion_status = str(row['Motion Status'])
-        # print('motion_status', motion_status)
-        motion_prefix = motion_status[0] if len(motion_status) > 0 else None
-        # print('motion_prefix', motion_prefix)
-        # Início de bloco: motion_prefix == '2'
-        if motion_prefix == '2':
-            if not ignicao_ligada:
-                ignicao_ligada = True
-                bloco_atual = [row]
-            else:
-                bloco_atual.append(row)
-        # Fim de bloco: motion_prefix == '1'
-        elif motion_prefix == '1':
-            if ignicao_ligada:
-                ignicao_ligada = False
-                if bloco_atual:
-                    blocos.append(pd.DataFrame(bloco_atual))
-                    bloco_atual = []
-    # Adicionar último bloco se ainda estiver ativo
-    if bloco_atual:
-        blocos.append(pd.DataFrame(bloco_atual))
+    # Início de bloco: Motion Status '2x'; fim de bloco: Motion Status '1x'
+    blocos = segmentar_blocos_ignicao(df)
     print(f"✅ Identificados {len(blocos)} blocos de ignição")
     return blocos
 
 
 def gerar_cores_blocos(num_blocos: int) -> List[str]:
     """Gera cores bem distintas para cada bloco"""
-    cores_base = [
-        '#FF0000',  # Vermelho
-        '#0066FF',  # Azul
-        '#FF6600',  # Laranja
-        '#9900FF',  # Roxo
-        '#00CC00',  # Verde
-        '#FF0099',  # Rosa
-        '#00CCCC',  # Ciano
-        '#FFCC00',  # Amarelo
-        '#CC0066',  # Magenta escuro
-        '#6600CC',  # Violeta
-        '#FF3333',  # Vermelho claro
-        '#3366FF',  # Azul royal
-        '#FF9900',  # Laranja dourado
-        '#CC00CC',  # Magenta
-        '#00FF66',  # Verde limão
-    ]
-    
-    cores = []
-    for i in range(num_blocos):
-        cores.append(cores_base[i % len(cores_base)])
-    
-    return cores
+    return cores_ciclicas(PALETA_BLOCOS, num_blocos)
 
 
 def gerar_degrade_temporal_otimizado(cor_base: str, num_pontos: int) -> List[str]:
@@ -140,61 +161,12 @@ def gerar_degrade_temporal_otimizado(cor_base: str, num_pontos: int) -> List[str
     """
     if num_pontos <= 1:
         return [cor_base]
-    
-    # Converter cor base para RGB
-    cor_base = cor_base.lstrip('#')
-    r = int(cor_base[0:2], 16)
-    g = int(cor_base[2:4], 16)
-    b = int(cor_base[4:6], 16)
-    
-    cores = []
-    for i in range(num_pontos):
-        # Progressão MUITO mais dramática: de 10% a 100% com curva exponencial
-        progress = i / (num_pontos - 1)
-        
-        # Usar curva exponencial para criar contraste mais dramático
-        fator = 0.1 + (0.9 * (progress ** 0.5))  # Curva suave do escuro para claro
-        
-        # Para os primeiros pontos, usar cores muito escuras
-        if i < num_pontos * 0.3:  # Primeiros 30% bem escuros
-            fator = 0.1 + (0.4 * progress * 3.33)  # 10% a 50%
-        elif i < num_pontos * 0.7:  # Meio termo
-            fator = 0.5 + (0.3 * (progress - 0.3) * 2.5)  # 50% a 80%
-        else:  # Últimos 30% bem claros
-            fator = 0.8 + (0.2 * (progress - 0.7) * 3.33)  # 80% a 100%
-        
-        # Calcular nova cor
-        r_new = min(255, int(r * fator))
-        g_new = min(255, int(g * fator))
-        b_new = min(255, int(b * fator))
-        
-        cor_hex = f"#{r_new:02x}{g_new:02x}{b_new:02x}"
-        cores.append(cor_hex)
-    
-    return cores
+    return degrade_pontos(num_pontos, paradas_escurecimento(cor_base))
 
 
 def gerar_degrade_azul_roxo_vermelho(num_pontos: int) -> list:
     """Gera um degradê de azul fluorescente para roxo e depois vermelho."""
-    if num_pontos <= 1:
-        return ['#00f6ff']
-    result = []
-    for i in range(num_pontos):
-        t = i / (num_pontos - 1)
-        if t < 0.5:
-            # Azul (#00f6ff) -> Roxo (#8000ff)
-            ratio = t / 0.5
-            r = int(0x00 + (0x80 - 0x00) * ratio)
-            g = int(0xf6 + (0x00 - 0xf6) * ratio)
-            b = int(0xff + (0xff - 0xff) * ratio)
-        else:
-            # Roxo (#8000ff) -> Vermelho (#ff0000)
-            ratio = (t - 0.5) / 0.5
-            r = int(0x80 + (0xff - 0x80) * ratio)
-            g = int(0x00 + (0x00 - 0x00) * ratio)
-            b = int(0xff + (0x00 - 0xff) * ratio)
-        result.append(f'#{r:02x}{g:02x}{b:02x}')
-    return result
+    return degrade_pontos(num_pontos, DEGRADE_AZUL_ROXO_VERMELHO)
 
 
 def filtrar_pontos_distintos(bloco: pd.DataFrame) -> pd.DataFrame:
@@ -210,7 +182,123 @@ def filtrar_pontos_distintos(bloco: pd.DataFrame) -> pd.DataFrame:
     return bloco.iloc[indices].reset_index(drop=True)
 
 
-def criar_mapa_interativo_otimizado(blocos: List[pd.DataFrame]) -> folium.Map:
+def geojson_bloco(numero_bloco: int, bloco_21: pd.DataFrame, cores_degrade: List[str],
+                  dist_incrementais: np.ndarray, dist_acumuladas: np.ndarray) -> Tuple[dict, dict, list]:
+    """
+    Monta o bloco para o modo de alto volume, sem um objeto do Leaflet por ponto
+    O primeiro ponto e o primeiro segmento saem como no modo com marcadores. Os marcos de
+    hodômetro, que lá são pinos verdes (folium.Marker), aqui são círculos com borda verde:
+    um marco por mudança de hodômetro pode chegar a um por ponto, e os círculos ficam no canvas.
+    Args:
+        numero_bloco: número do bloco (a partir de 1)
+        bloco_21: pontos do bloco com Motion Status 21, em ordem
+        cores_degrade: cor de cada ponto
+        dist_incrementais: distância de cada ponto ao anterior (m)
+        dist_acumuladas: distância acumulada no bloco (m)
+    Returns:
+        (FeatureCollection dos pontos, FeatureCollection das linhas agrupadas por
+        nível de cor, linhas para o pontos_plotados.csv)
+    """
+    n = len(bloco_21)
+    lats = bloco_21['Latitude'].to_numpy(dtype=float)
+    lons = bloco_21['Longitude'].to_numpy(dtype=float)
+    motion = bloco_21['Motion Status'].tolist()
+    datas = bloco_21['Data/Hora Evento']
+    progresso = np.arange(n) / (n - 1) * 100 if n > 1 else np.array([100.0])
+
+    # Marco de hodômetro: primeiro ponto e cada mudança de valor (NaN sempre conta como mudança)
+    if 'Hodômetro Total' in bloco_21.columns:
+        hodometro = bloco_21['Hodômetro Total']
+        marco = hodometro.ne(hodometro.shift()).to_numpy()
+    else:
+        hodometro = pd.Series([None] * n, index=bloco_21.index)
+        marco = np.zeros(n, dtype=bool)
+    tipo = np.where(marco, 'marco', 'ponto').astype(object)
+    tipo[0] = 'inicio'
+    cores_pontos = [COR_INICIO_BLOCO] + list(cores_degrade[1:n])
+
+    hodometros = hodometro.tolist()
+    pontos = {'type': 'FeatureCollection', 'features': [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [round(lon, 6), round(lat, 6)]},
+            'properties': {
+                'bloco': numero_bloco, 'ponto': j + 1, 'total': n, 'tipo': t, 'cor': cor, 'data': data,
+                'motion': str(ms), 'dist_incr': round(di, 1), 'dist_total': round(da, 1),
+                'progresso': round(pg, 1), 'hodometro': str(hod),
+            },
+        }
+        for j, (lat, lon, t, cor, data, ms, di, da, pg, hod) in enumerate(zip(
+            lats.tolist(), lons.tolist(), tipo.tolist(), cores_pontos, datas.dt.strftime('%d/%m/%Y %H:%M:%S'),
+            motion, dist_incrementais.tolist(), dist_acumuladas.tolist(), progresso.tolist(), hodometros
+        ))
+    ]}
+
+    # Trajeto: cada segmento recebe a cor do ponto de origem, quantizada em NIVEIS_DEGRADE_LINHA
+    # níveis; segmentos do mesmo nível viram uma única MultiLineString
+    linhas = {'type': 'FeatureCollection', 'features': []}
+    if n > 1:
+        coordenadas = np.round(np.column_stack([lons, lats]), 6)
+        segmentos = np.stack([coordenadas[:-1], coordenadas[1:]], axis=1)
+        paleta = tabela_degrade(DEGRADE_AZUL_ROXO_VERMELHO, NIVEIS_DEGRADE_LINHA)
+        nivel = np.rint(np.arange(n - 1) / (n - 1) * (NIVEIS_DEGRADE_LINHA - 1)).astype(int)
+        # Primeiro segmento destacado, como no modo com marcadores
+        linhas['features'].append({
+            'type': 'Feature',
+            'geometry': {'type': 'LineString', 'coordinates': segmentos[0].tolist()},
+            'properties': {'cor': cores_degrade[0], 'peso': 6, 'opacidade': 0.95},
+        })
+        for k in np.unique(nivel[1:]).tolist():
+            linhas['features'].append({
+                'type': 'Feature',
+                'geometry': {'type': 'MultiLineString', 'coordinates': segmentos[1:][nivel[1:] == k].tolist()},
+                'properties': {'cor': paleta[k], 'peso': 4, 'opacidade': 0.8},
+            })
+
+    pontos_plotados = [
+        {
+            'bloco': numero_bloco, 'ordem_no_bloco': j + 1, 'latitude': lat, 'longitude': lon,
+            'data_hora': data, 'hodometro_atual': hod, 'motion_status': ms,
+        }
+        for j, (lat, lon, data, hod, ms) in enumerate(zip(lats.tolist(), lons.tolist(), datas.tolist(), hodometros, motion))
+    ]
+    return pontos, linhas, pontos_plotados
+
+
+def destacar_agrupamentos(mapa: folium.Map, numero_bloco: int, bloco_21: pd.DataFrame):
+    """Círculo no raio de cada grupo de pontos parados (simplificar_bloco) com mais de um ponto."""
+    agrupados = bloco_21[bloco_21['pontos_agrupados'] > 1]
+    for lat, lon, quantidade, raio in zip(agrupados['Latitude'], agrupados['Longitude'],
+                                         agrupados['pontos_agrupados'], agrupados['raio_agrupamento_m']):
+        folium.Circle(
+            location=(lat, lon),
+            radius=max(raio, 1.0),
+            color='#ff9800',
+            weight=2,
+            fill=True,
+            fillOpacity=0.2,
+            popup=folium.Popup(f"🌟 Bloco {numero_bloco}: {quantidade} pontos parados em até {raio:.1f} m", max_width=300)
+        ).add_to(mapa)
+
+
+def criar_mapa_interativo_otimizado(blocos: List[pd.DataFrame], alto_volume: Optional[bool] = None,
+                                    simplificar: bool = False, tolerancia_m: float = TOLERANCIA_SIMPLIFICACAO_M,
+                                    raio_parado_m: float = RAIO_PARADO_M) -> folium.Map:
+    """
+    Mapa dos blocos de ignição
+    Args:
+        blocos: blocos de ignição (identificar_blocos_ignicao)
+        alto_volume: True desenha cada bloco como GeoJSON em canvas, com popups montados no
+            navegador; False usa um marcador do Leaflet por ponto; None escolhe pelo total
+            de pontos (LIMITE_PONTOS_MARCADORES)
+        simplificar: agrupa o jitter parado e simplifica o trajeto de cada bloco antes de
+            desenhar (simplificacao_trajeto.simplificar_bloco); os grupos ganham um círculo
+            no mapa e as colunas pontos_agrupados/raio_agrupamento_m no pontos_plotados.csv
+        tolerancia_m: tolerância de Douglas-Peucker, em metros
+        raio_parado_m: raio do agrupamento de pontos parados, em metros
+    Returns:
+        folium.Map
+    """
     print("🗺️  Criando mapa interativo otimizado...")
 
     # Lista para salvar os pontos plotados
@@ -226,44 +314,62 @@ def criar_mapa_interativo_otimizado(blocos: List[pd.DataFrame]) -> folium.Map:
     centro_lat = sum(todas_lats) / len(todas_lats)
     centro_lon = sum(todas_lons) / len(todas_lons)
 
+    if alto_volume is None:
+        alto_volume = len(todas_lats) > LIMITE_PONTOS_MARCADORES
+
     # Criar mapa com melhor visualização
     mapa = folium.Map(
         location=[centro_lat, centro_lon], 
         zoom_start=16,  # Zoom maior para melhor visualização
-        tiles='OpenStreetMap'
+        tiles='OpenStreetMap',
+        prefer_canvas=alto_volume
     )
+    if alto_volume:
+        print("⚡ Modo de alto volume: blocos em GeoJSON")
+        mapa.get_root().header.add_child(folium.Element(SCRIPT_POPUP_PONTO))
     
     cores_blocos = gerar_cores_blocos(len(blocos))
 
     for i, bloco in enumerate(blocos):
         # Filtra apenas os pontos com Motion Status == 21
-        bloco_21 = bloco[bloco['Motion Status'].astype(float).astype(int) == 21]
+        bloco_21 = bloco[pd.to_numeric(bloco['Motion Status'], errors='coerce') == 21]
         # print('bloco_21', bloco_21)
         if bloco_21.empty:
             continue  # Pula blocos sem pontos 21
+        extras = [{}] * len(bloco_21)
+        if simplificar:
+            bloco_21 = simplificar_bloco(bloco_21, tolerancia_m, raio_parado_m)
+            extras = [
+                {'pontos_agrupados': quantidade, 'raio_agrupamento_m': raio}
+                for quantidade, raio in zip(bloco_21['pontos_agrupados'], bloco_21['raio_agrupamento_m'])
+            ]
+            destacar_agrupamentos(mapa, i + 1, bloco_21)
         # Use bloco_21 para plotar e analisar
         cores_degrade = gerar_degrade_azul_roxo_vermelho(len(bloco_21))
         coordenadas = []
-        dist_total = 0.0
+        dist_incrementais = distancias_incrementais_m(bloco_21['Latitude'], bloco_21['Longitude'])
+        dist_acumuladas = dist_incrementais.cumsum()
 
         print(f"📍 Processando bloco {i+1} com {len(bloco_21)} pontos distintos...")
 
+        if alto_volume:
+            pontos, linhas, plotados = geojson_bloco(i + 1, bloco_21, cores_degrade, dist_incrementais, dist_acumuladas)
+            mapa.add_child(CamadaBlocoGeoJson(pontos, linhas))
+            pontos_plotados.extend({**linha, **extra} for linha, extra in zip(plotados, extras))
+            continue
+
         hodometro_anterior = None
         for j, (_, ponto) in enumerate(bloco_21.iterrows()):
             latlon = (float(ponto['Latitude']), float(ponto['Longitude']))
             coordenadas.append(latlon)
 
-            # Calcular distância incremental e acumulada
-            if j > 0:
-                anterior = (float(bloco_21.iloc[j - 1]['Latitude']), float(bloco_21.iloc[j - 1]['Longitude']))
-                dist_incr = haversine(anterior, latlon) * 1000  # metros
-                dist_total += dist_incr
-            else:
-                dist_incr = 0.0
+            # Distância incremental e acumulada (metros)
+            dist_incr = dist_incrementais[j]
+            dist_total = dist_acumuladas[j]
 
             # Cor e destaque especial para o primeiro ponto
             if j == 0:
-                cor_ponto = '#00f6ff'  # Azul fluorescente
+                cor_ponto = COR_INICIO_BLOCO
                 borda = 'black'
                 peso = 4
                 raio = 10
@@ -291,7 +397,8 @@ def criar_mapa_interativo_otimizado(blocos: List[pd.DataFrame]) -> folium.Map:
                 'longitude': latlon[1],
                 'data_hora': ponto['Data/Hora Evento'],
                 'hodometro_atual': hodometro_atual,
-                'motion_status': ponto['Motion Status']
+                'motion_status': ponto['Motion Status'],
+                **extras[j]
             })
 
             if len(bloco_21) > 1:
@@ -354,7 +461,10 @@ def criar_mapa_interativo_otimizado(blocos: List[pd.DataFrame]) -> folium.Map:
     # Salvar pontos plotados em CSV
     import csv
     with open('pontos_plotados.csv', 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=['bloco', 'ordem_no_bloco', 'latitude', 'longitude', 'data_hora', 'hodometro_atual', 'motion_status'])
+        colunas = ['bloco', 'ordem_no_bloco', 'latitude', 'longitude', 'data_hora', 'hodometro_atual', 'motion_status']
+        if simplificar:
+            colunas += ['pontos_agrupados', 'raio_agrupamento_m']
+        writer = csv.DictWriter(f, fieldnames=colunas)
         writer.writeheader()
         for row in pontos_plotados:
             writer.writerow(row)
@@ -378,11 +488,7 @@ def criar_mapa_interativo_otimizado(blocos: List[pd.DataFrame]) -> folium.Map:
         duracao = fim - inicio
         
         # Calcular distância total do bloco
-        dist_total = 0.0
-        for j in range(1, len(bloco)):
-            p1 = (bloco.iloc[j-1]['Latitude'], bloco.iloc[j-1]['Longitude'])
-            p2 = (bloco.iloc[j]['Latitude'], bloco.iloc[j]['Longitude'])
-            dist_total += haversine(p1, p2) * 1000
+        dist_total = distancias_incrementais_m(bloco['Latitude'], bloco['Longitude']).sum()
         
         legenda_html += f'''
         <div style="margin: 5px 0; padding: 5px; border-left: 4px solid {cores_blocos[i]};">
@@ -449,7 +555,7 @@ def main():
         return
     
     # Criar mapa interativo otimizado
-    mapa = criar_mapa_interativo_otimizado(blocos_ignicao)
+    mapa = criar_mapa_interativo_otimizado(blocos_ignicao, simplificar=simplificar_trajeto)
     
     # Salvar e abrir mapa
     salvar_e_abrir_mapa(mapa)
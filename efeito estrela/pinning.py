@@ -1,26 +1,28 @@
+import numpy as np
 import pandas as pd
 import os
-from haversine import haversine
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log
+from distancias import distancias_blocos
+from segmentacao_ignicao import identificar_blocos_ignicao as segmentar_blocos_ignicao
+from simplificacao_trajeto import simplificar_bloco, TOLERANCIA_SIMPLIFICACAO_M, RAIO_PARADO_M
+from deteccao_deriva import detectar_deriva
 
 
 def ler_csv_com_encoding(caminho_csv: str):
     if not os.path.exists(caminho_csv):
         # print(f"❌ Arquivo não encontrado: {caminho_csv}")
         return None
-    codificacoes = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-    for encoding in codificacoes:
-        try:
-            # print(f"🔄 Tentando ler com encoding: {encoding}")
-            df = pd.read_csv(caminho_csv, encoding=encoding, low_memory=False)
-            # Adiciona coluna 'linha' com o número da linha original (começando em 2)
-            df['linha'] = df.index + 2
-            # print(f"✅ Arquivo lido com sucesso usando encoding: {encoding}")
-            return df
-        except Exception as e:
-            # print(f"❌ Falha com {encoding}: {str(e)}")
-            continue
-    print("❌ Não foi possível ler o arquivo com nenhuma codificação testada")
-    return None
+    df = carregar_log(caminho_csv)
+    if df is None:
+        print("❌ Não foi possível ler o arquivo com nenhuma codificação testada")
+        return None
+    # Adiciona coluna 'linha' com o número da linha original (começando em 2)
+    df['linha'] = df.index + 2
+    return df
 
 def validar_colunas(df: pd.DataFrame) -> bool:
     colunas_necessarias = ['Data/Hora Evento', 'Latitude', 'Longitude', 'Motion Status']
@@ -45,105 +47,36 @@ def processar_dados(df: pd.DataFrame) -> pd.DataFrame:
 
 def identificar_blocos_ignicao(df: pd.DataFrame):
     # print("🔄 Identificando blocos de ignição...")
-    blocos = []
-    bloco_atual = []
-    ignicao_ligada = False
-    for idx, row in df.iterrows():
-        motion_status = str(row['Motion Status'])
-        motion_prefix = motion_status[0] if len(motion_status) > 0 else None
-        if motion_prefix == '2':
-            if not ignicao_ligada:
-                ignicao_ligada = True
-                bloco_atual = [row]
-            else:
-                bloco_atual.append(row)
-        elif motion_prefix == '1':
-            if ignicao_ligada:
-                ignicao_ligada = False
-                if bloco_atual:
-                    blocos.append(pd.DataFrame(bloco_atual))
-                    bloco_atual = []
-    if bloco_atual:
-        blocos.append(pd.DataFrame(bloco_atual))
+    blocos = segmentar_blocos_ignicao(df)
     # print(f"✅ Identificados {len(blocos)} blocos de ignição")
     return blocos
 
-def gerar_csv_blocos(blocos, df_original, nome_arquivo="efeito estrela/distancia_blocos.csv", gerar_incremento=False, nome_arquivo_incremento="efeito estrela/distancia_blocos_incremento.csv"):
+def gerar_csv_blocos(blocos, df_original, nome_arquivo="efeito estrela/distancia_blocos.csv", gerar_incremento=False, nome_arquivo_incremento="efeito estrela/distancia_blocos_incremento.csv",
+                     simplificar=False, tolerancia_m=TOLERANCIA_SIMPLIFICACAO_M, raio_parado_m=RAIO_PARADO_M,
+                     nome_arquivo_deriva=None):
     # print(f"💾 Salvando CSV como '{nome_arquivo}'...")
-    linhas = []
-    linhas_incremento = []
-    for i, bloco in enumerate(blocos):
-        bloco = bloco.reset_index(drop=True)
-        # Filtrar apenas Motion Status == 21
-        bloco_21 = bloco[bloco['Motion Status'].astype(float).astype(int) == 21].reset_index(drop=True)
-        if bloco_21.empty:
-            continue
-        hodo_inicial = None
-        hodo_incremental = 0.0
-        for j, (_, ponto) in enumerate(bloco_21.iterrows()):
-            lat = float(ponto['Latitude'])
-            lon = float(ponto['Longitude'])
-            hodo_total = ponto.get('Hodômetro Total', None)
-            # Tenta converter o hodômetro total para float, se possível
-            try:
-                hodo_total_f = float(hodo_total)
-            except (TypeError, ValueError):
-                hodo_total_f = None
-            linha_atual = ponto['linha']
-            linha_anterior = linha_atual - 1
-            ponto_anterior = df_original[df_original['linha'] == linha_anterior]
-            if not ponto_anterior.empty:
-                lat_ant = ponto_anterior.iloc[0]['Latitude']
-                lon_ant = ponto_anterior.iloc[0]['Longitude']
-                hodo_ant = ponto_anterior.iloc[0].get('Hodômetro Total', None)
-                try:
-                    hodo_ant_f = float(hodo_ant)
-                except (TypeError, ValueError):
-                    hodo_ant_f = ''
-            else:
-                lat_ant = ''
-                lon_ant = ''
-                hodo_ant_f = ''
-            if j == 0:
-                dist_incr = 0.0
-                hodo_inicial = hodo_total_f
-                hodo_incremental = 0.0
-            else:
-                dist_incr = haversine((lat_ant, lon_ant), (lat, lon)) * 1000
-                # Incremento do hodômetro dentro do bloco
-                if hodo_total_f is not None and hodo_inicial is not None:
-                    hodo_incremental = hodo_total_f - hodo_inicial
-                else:
-                    hodo_incremental = ''
-            linha_saida = {
-                'linha': ponto['linha'],
-                'bloco': i+1,
-                'ordem_no_bloco': j+1,                
-                'latitude': lat,
-                'longitude': lon,
-                'latitude_anterior': lat_ant,
-                'longitude_anterior': lon_ant,
-                'Hodômetro Total': hodo_total,
-                'Hodômetro anterior': hodo_ant_f,
-                'Hodômetro incremental do bloco': hodo_incremental,
-                'Data/Hora Evento': ponto['Data/Hora Evento'],
-                'GNSS UTC Time': ponto['GNSS UTC Time'],
-                'Tipo Mensagem': ponto['Tipo Mensagem'],
-                'Motion Status': ponto['Motion Status'],
-                'Distância incremental (m)': dist_incr
-            }
-            linhas.append(linha_saida)
-            # Para a planilha de incremento: só linhas com incremento de hodômetro
-            if gerar_incremento:
-                if (isinstance(hodo_total_f, float) and isinstance(hodo_ant_f, float)
-                    and not pd.isna(hodo_total_f) and not pd.isna(hodo_ant_f)
-                    and hodo_total_f > hodo_ant_f):
-                    linhas_incremento.append(linha_saida)
-    df_saida = pd.DataFrame(linhas)
+    # Filtrar apenas Motion Status == 21
+    blocos_21 = [bloco[pd.to_numeric(bloco['Motion Status'], errors='coerce') == 21] for bloco in blocos]
+    if nome_arquivo_deriva:
+        # Paradas em que o hodômetro não avança mas as posições se espalham (deteccao_deriva)
+        detectar_deriva(blocos_21).to_csv(nome_arquivo_deriva, index=False, encoding='utf-8')
+        print(f"✅ CSV de deriva salvo com sucesso: {nome_arquivo_deriva}")
+    if simplificar:
+        # Um ponto por grupo de jitter parado e trajeto simplificado (simplificacao_trajeto)
+        blocos_21 = [simplificar_bloco(bloco, tolerancia_m, raio_parado_m) for bloco in blocos_21]
+    df_saida = distancias_blocos(blocos_21, df_original)
+    if simplificar and not df_saida.empty:
+        df_saida['pontos_agrupados'] = np.concatenate([bloco['pontos_agrupados'].to_numpy() for bloco in blocos_21 if not bloco.empty])
+        df_saida['raio_agrupamento_m'] = np.concatenate([bloco['raio_agrupamento_m'].to_numpy() for bloco in blocos_21 if not bloco.empty])
     df_saida.to_csv(nome_arquivo, index=False, encoding='utf-8')
     print(f"✅ CSV salvo com sucesso: {nome_arquivo}")
     if gerar_incremento:
-        df_incremento = pd.DataFrame(linhas_incremento)
+        # Para a planilha de incremento: só linhas com incremento de hodômetro
+        if df_saida.empty:
+            df_incremento = df_saida
+        else:
+            hodo_total = pd.to_numeric(df_saida['Hodômetro Total'], errors='coerce')
+            df_incremento = df_saida[hodo_total > df_saida['Hodômetro anterior']]
         df_incremento.to_csv(nome_arquivo_incremento, index=False, encoding='utf-8')
         print(f"✅ CSV de incremento salvo com sucesso: {nome_arquivo_incremento}")
 
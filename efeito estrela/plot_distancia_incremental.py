@@ -1,26 +1,25 @@
 import pandas as pd
 import os
-from haversine import haversine
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log
+from distancias import distancias_blocos
+from segmentacao_ignicao import identificar_blocos_ignicao as segmentar_blocos_ignicao
 
 
 def ler_csv_com_encoding(caminho_csv: str):
     if not os.path.exists(caminho_csv):
         # print(f"❌ Arquivo não encontrado: {caminho_csv}")
         return None
-    codificacoes = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-    for encoding in codificacoes:
-        try:
-            # print(f"🔄 Tentando ler com encoding: {encoding}")
-            df = pd.read_csv(caminho_csv, encoding=encoding, low_memory=False)
-            # Adiciona coluna 'linha' com o número da linha original (começando em 2)
-            df['linha'] = df.index + 2
-            # print(f"✅ Arquivo lido com sucesso usando encoding: {encoding}")
-            return df
-        except Exception as e:
-            # print(f"❌ Falha com {encoding}: {str(e)}")
-            continue
-    print("❌ Não foi possível ler o arquivo com nenhuma codificação testada")
-    return None
+    df = carregar_log(caminho_csv)
+    if df is None:
+        print("❌ Não foi possível ler o arquivo com nenhuma codificação testada")
+        return None
+    # Adiciona coluna 'linha' com o número da linha original (começando em 2)
+    df['linha'] = df.index + 2
+    return df
 
 def validar_colunas(df: pd.DataFrame) -> bool:
     colunas_necessarias = ['Data/Hora Evento', 'Latitude', 'Longitude', 'Motion Status']
@@ -45,90 +44,13 @@ def processar_dados(df: pd.DataFrame) -> pd.DataFrame:
 
 def identificar_blocos_ignicao(df: pd.DataFrame):
     # print("🔄 Identificando blocos de ignição...")
-    blocos = []
-    bloco_atual = []
-    ignicao_ligada = False
-    for idx, row in df.iterrows():
-        motion_status = str(row['Motion Status'])
-        motion_prefix = motion_status[0] if len(motion_status) > 0 else None
-        if motion_prefix == '2':
-            if not ignicao_ligada:
-                ignicao_ligada = True
-                bloco_atual = [row]
-            else:
-                bloco_atual.append(row)
-        elif motion_prefix == '1':
-            if ignicao_ligada:
-                ignicao_ligada = False
-                if bloco_atual:
-                    blocos.append(pd.DataFrame(bloco_atual))
-                    bloco_atual = []
-    if bloco_atual:
-        blocos.append(pd.DataFrame(bloco_atual))
+    blocos = segmentar_blocos_ignicao(df)
     # print(f"✅ Identificados {len(blocos)} blocos de ignição")
     return blocos
 
 def gerar_csv_blocos(blocos, df_original, nome_arquivo="efeito estrela/distancia_blocos-todos.csv"):
     # print(f"💾 Salvando CSV como '{nome_arquivo}'...")
-    linhas = []
-    for i, bloco in enumerate(blocos):
-        bloco = bloco.reset_index(drop=True)
-        hodo_inicial = None
-        hodo_incremental = 0.0
-        for j, (_, ponto) in enumerate(bloco.iterrows()):
-            lat = float(ponto['Latitude'])
-            lon = float(ponto['Longitude'])
-            hodo_total = ponto.get('Hodômetro Total', None)
-            # Tenta converter o hodômetro total para float, se possível
-            try:
-                hodo_total_f = float(hodo_total)
-            except (TypeError, ValueError):
-                hodo_total_f = None
-            linha_atual = ponto['linha']
-            linha_anterior = linha_atual - 1
-            ponto_anterior = df_original[df_original['linha'] == linha_anterior]
-            if not ponto_anterior.empty:
-                lat_ant = ponto_anterior.iloc[0]['Latitude']
-                lon_ant = ponto_anterior.iloc[0]['Longitude']
-                hodo_ant = ponto_anterior.iloc[0].get('Hodômetro Total', None)
-                try:
-                    hodo_ant_f = float(hodo_ant)
-                except (TypeError, ValueError):
-                    hodo_ant_f = ''
-            else:
-                lat_ant = ''
-                lon_ant = ''
-                hodo_ant_f = ''
-            if j == 0:
-                dist_incr = 0.0
-                hodo_inicial = hodo_total_f
-                hodo_incremental = 0.0
-            else:
-                dist_incr = haversine((lat_ant, lon_ant), (lat, lon)) * 1000
-                # Incremento do hodômetro dentro do bloco
-                if hodo_total_f is not None and hodo_inicial is not None:
-                    hodo_incremental = hodo_total_f - hodo_inicial
-                else:
-                    hodo_incremental = ''
-            linha_saida = {
-                'linha': ponto['linha'],
-                'bloco': i+1,
-                'ordem_no_bloco': j+1,                
-                'latitude': lat,
-                'longitude': lon,
-                'latitude_anterior': lat_ant,
-                'longitude_anterior': lon_ant,
-                'Hodômetro Total': hodo_total,
-                'Hodômetro anterior': hodo_ant_f,
-                'Hodômetro incremental do bloco': hodo_incremental,
-                'Data/Hora Evento': ponto['Data/Hora Evento'],
-                'GNSS UTC Time': ponto.get('GNSS UTC Time', ''),
-                'Tipo Mensagem': ponto.get('Tipo Mensagem', ''),
-                'Motion Status': ponto['Motion Status'],
-                'Distância incremental (m)': dist_incr
-            }
-            linhas.append(linha_saida)
-    df_saida = pd.DataFrame(linhas)
+    df_saida = distancias_blocos(blocos, df_original)
     df_saida.to_csv(nome_arquivo, index=False, encoding='utf-8')
     print(f"✅ CSV salvo com sucesso: {nome_arquivo}")
 
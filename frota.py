@@ -0,0 +1,138 @@
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from relatorio import executar_relatorio, arquivos_resultado
+from base_frota import ARQUIVO_BASE, gravar_execucao
+
+
+def _gerar_dashboard_imei(caminho_log, pasta_imei, sob_demanda=False, incremental=False):
+    """Gera o relatório de um IMEI; roda dentro de um processo do pool."""
+    inicio = time.time()
+    try:
+        resumo = executar_relatorio(
+            caminho_log, max_workers=1, pasta_saida=pasta_imei, sob_demanda=sob_demanda, incremental=incremental
+        )
+    except Exception as e:
+        print(f"❌ Erro ao gerar o relatório de {caminho_log}: {e}")
+        resumo = None
+    if resumo is None:
+        resumo = {'log': caminho_log, 'linhas': 0, 'device': None, 'concluidas': [], 'falhas': ['leitura']}
+    resumo['segundos'] = time.time() - inicio
+    return resumo
+
+
+def gerar_indice(resultados, pasta_saida):
+    """Gera o index.html da frota com um link para o dashboard de cada IMEI."""
+    linhas = []
+    for imei, resumo in sorted(resultados.items()):
+        device = resumo['device'] or {}
+        status = 'OK' if not resumo['falhas'] else f"Falhas: {', '.join(resumo['falhas'])}"
+        linhas.append(f"""
+            <tr>
+                <td><a href="{html.escape(imei)}/dashboard_final.html">{html.escape(imei)}</a></td>
+                <td>{html.escape(str(device.get('tipo_dispositivo', 'N/A')))}</td>
+                <td>{html.escape(str(device.get('versao_firmware', 'N/A')))}</td>
+                <td>{resumo['linhas']}</td>
+                <td>{resumo['segundos']:.1f}</td>
+                <td>{html.escape(status)}</td>
+            </tr>""")
+
+    pagina = f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+    <meta charset="UTF-8">
+    <title>Dashboards da Frota</title>
+    <style>
+    body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #f8f9fa; padding: 20px; }}
+    .tabela-container {{ max-width: 1200px; margin: 0 auto; background: white; border-radius: 15px; padding: 20px; box-shadow: 0 5px 15px rgba(0,0,0,0.1); }}
+    h1 {{ text-align: center; color: #495057; margin-bottom: 20px; }}
+    table {{ width: 100%; border-collapse: collapse; font-size: 14px; }}
+    th, td {{ padding: 12px 18px; border: 1px solid #dee2e6; text-align: center; }}
+    th {{ background-color: #f8f9fa; color: #495057; }}
+    a {{ color: #764ba2; font-weight: bold; }}
+    </style>
+</head>
+<body>
+    <div class="tabela-container">
+        <h1>📊 Dashboards da Frota ({len(resultados)} equipamentos)</h1>
+        <table>
+            <thead>
+                <tr>
+                    <th>IMEI</th>
+                    <th>Nome Comercial</th>
+                    <th>Versão Firmware</th>
+                    <th>Linhas do log</th>
+                    <th>Tempo (s)</th>
+                    <th>Status</th>
+                </tr>
+            </thead>
+            <tbody>{''.join(linhas)}
+            </tbody>
+        </table>
+    </div>
+</body>
+</html>"""
+
+    caminho_indice = Path(pasta_saida) / 'index.html'
+    with open(caminho_indice, 'w', encoding='utf-8') as f:
+        f.write(pagina)
+    print(f"✅ Índice da frota salvo em: {caminho_indice.resolve()}")
+    return caminho_indice
+
+
+def gerar_frota(pasta_logs, pasta_saida='frota', max_workers=None, sob_demanda=False, incremental=False,
+                base_resultados=None):
+    """
+    Gera um dashboard individual para cada <IMEI>_decoded.csv de uma pasta
+    Args:
+        pasta_logs: pasta com os logs decodificados
+        pasta_saida: pasta da frota; cada IMEI ganha a sua subpasta
+        max_workers: número de processos (None = número de CPUs)
+        sob_demanda: dashboards com dados servidos pelo servidor_dados.py
+        incremental: refaz em cada IMEI só as etapas cujas entradas mudaram
+        base_resultados: base SQLite onde cada execução é gravada (base_frota.py);
+            se None, <pasta_saida>/resultados_frota.sqlite
+    Returns:
+        dict IMEI -> resumo da execução
+    """
+    pasta_saida = Path(pasta_saida).resolve()
+    pasta_saida.mkdir(parents=True, exist_ok=True)
+    base_resultados = base_resultados or pasta_saida / ARQUIVO_BASE
+    logs = sorted(Path(pasta_logs).resolve().glob('*_decoded.csv'))
+    if not logs:
+        print(f"❌ Nenhum arquivo *_decoded.csv encontrado em: {pasta_logs}")
+        return {}
+
+    resultados = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futuros = {}
+        for caminho in logs:
+            imei = caminho.name[:-len('_decoded.csv')]
+            futuro = pool.submit(_gerar_dashboard_imei, str(caminho), str(pasta_saida / imei), sob_demanda, incremental)
+            futuros[futuro] = imei
+        for futuro in as_completed(futuros):
+            imei = futuros[futuro]
+            resultados[imei] = futuro.result()
+            # Gravado aqui, no processo principal, para não disputar a escrita na base
+            if resultados[imei]['device'] is not None:
+                gravar_execucao(base_resultados, resultados[imei], pasta_saida / imei, arquivos_resultado())
+            print(f"✅ {imei} concluído ({len(resultados)}/{len(logs)})")
+
+    gerar_indice(resultados, pasta_saida)
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Gera os dashboards individuais de todos os logs de uma pasta.')
+    parser.add_argument('pasta_logs', nargs='?', default='logs')
+    parser.add_argument('--saida', default='frota', help='Pasta de saída da frota')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Número de processos em paralelo')
+    parser.add_argument('--sob-demanda', action='store_true', help='Serve registros e tabelas longas pelo servidor_dados.py')
+    parser.add_argument('--incremental', action='store_true', help='Refaz só as etapas cujas entradas mudaram')
+    parser.add_argument('--base', default=None, help='Base SQLite dos resultados (padrão: <saida>/resultados_frota.sqlite)')
+    args = parser.parse_args()
+    gerar_frota(args.pasta_logs, args.saida, args.workers, args.sob_demanda, args.incremental, args.base)
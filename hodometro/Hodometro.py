@@ -1,121 +1,94 @@
+import numpy as np
 import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log
+from segmentacao_ignicao import classificar_eventos_ignicao
+
+CATEGORIAS = ['Curta', 'Media', 'Longa']
+
+
+def extrair_viagens(df):
+    """
+    Pareia cada ignição com o primeiro desligamento antes da próxima ignição
+    Returns:
+        DataFrame com Dia, IGN, IGF e Distancia_km (diferença do Hodômetro Total)
+    """
+    df = df.copy()
+    df.columns = [col.strip() for col in df.columns]
+    df['Data/Hora Evento'] = pd.to_datetime(df['Data/Hora Evento'], errors='coerce')
+    df = df.dropna(subset=['Data/Hora Evento'])
+    df = df.sort_values('Data/Hora Evento')
+
+    evento = classificar_eventos_ignicao(df)
+    ignicoes = df[evento.isin(['GTIGN', 'IGN'])]
+    desligamentos = df[evento.isin(['GTIGF', 'IGF'])]
+
+    if 'Hodômetro Total' in df.columns:
+        hodometro = pd.to_numeric(df['Hodômetro Total'], errors='coerce')
+    else:
+        hodometro = pd.Series(0.0, index=df.index)
+
+    ign_times = ignicoes['Data/Hora Evento'].to_numpy()
+    igf_times = desligamentos['Data/Hora Evento'].to_numpy()
+
+    # Primeiro IGF estritamente depois de cada IGN, aceito só se vier antes da próxima IGN
+    pos_igf = np.searchsorted(igf_times, ign_times, side='right')
+    proxima_ign = np.append(ign_times[1:], np.datetime64(pd.Timestamp.max))
+    tem_igf = pos_igf < len(igf_times)
+    tem_igf[tem_igf] = igf_times[pos_igf[tem_igf]] < proxima_ign[tem_igf]
+
+    ign_odometro = hodometro.loc[ignicoes.index].to_numpy(dtype=float)[tem_igf]
+    igf_odometro = hodometro.loc[desligamentos.index].to_numpy(dtype=float)[pos_igf[tem_igf]]
+    viagens = pd.DataFrame({
+        'IGN': ign_times[tem_igf],
+        'IGF': igf_times[pos_igf[tem_igf]],
+        'Distancia_km': igf_odometro - ign_odometro,
+    })
+    # Só viagens com os dois hodômetros válidos
+    viagens = viagens[np.isfinite(ign_odometro) & np.isfinite(igf_odometro)]
+    viagens.insert(0, 'Dia', viagens['IGN'].dt.strftime('%d/%m/%Y'))
+    return viagens.reset_index(drop=True)
+
+
+def classificar(dist):
+    """Categoria de cada viagem pela distância (Series de km)."""
+    return pd.Series(
+        np.select([dist < 0, dist <= 2, dist <= 50], ['Ignorar', 'Curta', 'Media'], 'Longa'),
+        index=dist.index
+    )
+
+
+def totais_diarios(viagens_teste):
+    """Soma diária dos km de cada categoria, em ordem cronológica."""
+    if viagens_teste.empty:
+        return pd.DataFrame(columns=['Dia'] + CATEGORIAS)
+    data = viagens_teste['IGN'].dt.normalize()
+    totais = pd.pivot_table(
+        viagens_teste.assign(Data=data),
+        index='Data', columns='Categoria', values='Distancia_km', aggfunc='sum'
+    )
+    totais = totais.reindex(columns=CATEGORIAS).fillna(0.0).round(2).sort_index()
+    totais.columns.name = None
+    totais.index = totais.index.strftime('%d/%m/%Y')
+    return totais.rename_axis('Dia').reset_index()
+
 
 def viagens(caminho_csv, caminho_saida='hodometro/resultado_viagens.csv'):
     try:
-        codificacoes = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-        for encoding in codificacoes:
-            try:
-                df = pd.read_csv(caminho_csv, encoding=encoding, low_memory=False)
-                break
-            except UnicodeDecodeError:
-                continue
-        else:
+        df = carregar_log(caminho_csv)
+        if df is None:
             print("❌ Erro: Não foi possível ler o arquivo com as codificações testadas.")
             return
 
-        def get_evento(row):
-            motion_status = str(row.get('Motion Status', '')).strip()
-            if motion_status.startswith('1'):
-                return 'IGF'  # Ignição desligada
-            elif motion_status.startswith('2'):
-                return 'IGN'  # Ignição ligada
-            else:
-                # Fallback para o método anterior se Motion Status não estiver disponível
-                tipo = str(row.get('Tipo Mensagem', '')).strip().upper()
-                codigo = str(row.get('Event Code', '')).strip()
-                if tipo:
-                    return tipo
-                elif codigo:
-                    mapa = {'20': 'GTIGF', '21': 'GTIGN'}
-                    return mapa.get(codigo, '')
-            return ''
-
-        def extrair_viagens(df):
-            df = df.copy()
-            df.columns = [col.strip() for col in df.columns]
-            df['Data/Hora Evento'] = pd.to_datetime(df['Data/Hora Evento'], errors='coerce')
-            df = df.dropna(subset=['Data/Hora Evento'])
-            df = df.sort_values('Data/Hora Evento')
-            df['Dia'] = df['Data/Hora Evento'].dt.strftime('%d/%m/%Y')
-
-            ignicoes = df[df.apply(lambda row: get_evento(row) in ['GTIGN', 'IGN'], axis=1)].reset_index(drop=True)
-            desligamentos = df[df.apply(lambda row: get_evento(row) in ['GTIGF', 'IGF'], axis=1)].reset_index(drop=True)
-
-            viagens = []
-
-            for i, ign in ignicoes.iterrows():
-                ign_time = ign['Data/Hora Evento']
-                ign_odometro = pd.to_numeric(ign.get('Hodômetro Total', 0), errors='coerce')
-                dia_formatado = ign_time.strftime('%d/%m/%Y')
-
-                next_ign_time = ignicoes.iloc[i + 1]['Data/Hora Evento'] if i + 1 < len(ignicoes) else pd.Timestamp.max
-
-                igfs_possiveis = desligamentos[
-                    (desligamentos['Data/Hora Evento'] > ign_time) &
-                    (desligamentos['Data/Hora Evento'] < next_ign_time)
-                ]
-
-                if not igfs_possiveis.empty:
-                    igf = igfs_possiveis.iloc[0]
-                    igf_time = igf['Data/Hora Evento']
-                    igf_odometro = pd.to_numeric(igf.get('Hodômetro Total', 0), errors='coerce')
-
-                    # Verificar se ambos os valores são válidos (não NaN)
-                    ign_valid = bool(pd.notna(ign_odometro)) and ign_odometro is not None
-                    igf_valid = bool(pd.notna(igf_odometro)) and igf_odometro is not None
-                    
-                    if ign_valid and igf_valid:
-                        # Converter para float para garantir operação válida
-                        try:
-                            # Usar conversão direta com verificação de tipo
-                            ign_odometro_float = float(ign_odometro) if isinstance(ign_odometro, (int, float)) else 0.0
-                            igf_odometro_float = float(igf_odometro) if isinstance(igf_odometro, (int, float)) else 0.0
-                            
-                            km = igf_odometro_float - ign_odometro_float
-                            viagens.append({
-                                'Dia': dia_formatado,
-                                'IGN': ign_time,
-                                'IGF': igf_time,
-                                'Distancia_km': km
-                            })
-                        except (ValueError, TypeError):
-                            # Pular esta viagem se não conseguir converter os valores
-                            continue
-
-            return pd.DataFrame(viagens)
-
-        def classificar(dist):
-            if dist < 0:
-                return 'Ignorar'
-            elif dist <= 2:
-                return 'Curta'
-            elif dist <= 50:
-                return 'Media'
-            else:
-                return 'Longa'
-
         viagens_teste = extrair_viagens(df)
-        viagens_teste['Categoria'] = viagens_teste['Distancia_km'].apply(classificar)
-
-        dias_todos = sorted(
-            viagens_teste['Dia'].unique(),
-            key=lambda x: pd.to_datetime(x, dayfirst=True)
-        )
-
-        resultados = []
-        for dia in dias_todos:
-            linha = {'Dia': dia}
-            for categoria in ['Curta', 'Media', 'Longa']:
-                soma_teste = viagens_teste[
-                    (viagens_teste['Dia'] == dia) & (viagens_teste['Categoria'] == categoria)
-                ]['Distancia_km'].sum()
-                linha[categoria] = round(soma_teste, 2)
-            resultados.append(linha)
-
-        resultado_df = pd.DataFrame(resultados)
-        resultado_df['Dia'] = pd.to_datetime(resultado_df['Dia'], format='%d/%m/%Y')
-        resultado_df = resultado_df.sort_values(by='Dia')
-        resultado_df['Dia'] = resultado_df['Dia'].dt.strftime('%d/%m/%Y')
+        viagens_teste['Categoria'] = classificar(viagens_teste['Distancia_km'])
+        if viagens_teste.empty:
+            print("⚠️ Nenhuma viagem (IGN seguida de IGF) encontrada no log.")
+
+        resultado_df = totais_diarios(viagens_teste)
 
         # Salvando em CSV
         resultado_df.to_csv(caminho_saida, index=False, encoding='utf-8-sig')
@@ -1,12 +1,11 @@
 import pandas as pd
-import json
+import sys
 from pathlib import Path
 
-def gerar_bloco_hodometro_from_csv(csv_path, meta_km=12000, filename='bloco_hodometro.html'):
-    base_dir = Path(__file__).parent.parent / 'temp_blocos'
-    base_dir.mkdir(parents=True, exist_ok=True)
-    output_path = base_dir / filename
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from blocos_html import criar_bloco, salvar_bloco
 
+def gerar_bloco_hodometro_from_csv(csv_path='hodometro/resultado_viagens.csv', meta_km=12000, filename='bloco_hodometro.html', pasta_saida=None, salvar=True):
     # Lê o CSV e soma todas as distâncias
     df = pd.read_csv(csv_path)
     total_km = 0.0
@@ -24,7 +23,7 @@ def gerar_bloco_hodometro_from_csv(csv_path, meta_km=12000, filename='bloco_hodo
     # Formatação do valor
     valor_km_str = f"{total_km:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
-    # HTML/CSS/JS
+    # HTML
     html = f"""
 <div class="dashboard-bloco-analise" style="background: #fff; border-radius: 30px; box-shadow: 0 8px 25px rgba(102, 51, 153, 0.10); padding: 60px 200px 70px 200px; max-width: 2000px; margin: 0 auto 40px auto;">
     <span class="dashboard-title-analise" style="
@@ -55,8 +54,10 @@ def gerar_bloco_hodometro_from_csv(csv_path, meta_km=12000, filename='bloco_hodo
         </div>
     </div>
 </div>
-<script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-<script>
+"""
+
+    # JS do velocímetro (Chart.js)
+    js = f"""
 (function() {{
     const ctx = document.getElementById('hodometro_teste').getContext('2d');
     new Chart(ctx, {{
@@ -95,13 +96,13 @@ def gerar_bloco_hodometro_from_csv(csv_path, meta_km=12000, filename='bloco_hodo
         }}
     }});
 }})();
-</script>
 """
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
-
-    print(f"✅ Bloco de hodômetro salvo em: {output_path.resolve()}")
+    bloco = criar_bloco(filename, html, js=[js], scripts=['https://cdn.jsdelivr.net/npm/chart.js'])
+    if salvar:
+        output_path = salvar_bloco(bloco, pasta_saida)
+        print(f"✅ Bloco de hodômetro salvo em: {output_path.resolve()}")
+    return bloco
 
 if __name__ == "__main__":
     gerar_bloco_hodometro_from_csv('hodometro/resultado_viagens.csv')
@@ -1,116 +1,25 @@
 import os
-import re
+import base64
+import gzip
 from pathlib import Path
 import pandas as pd
 import json
+from leitura_logs import carregar_log
+from dispositivo import get_device_info
+from servidor_dados import gravar_registros
+from blocos_html import consolidar_blocos, ler_bloco
 
+# Campos exibidos no modal de detalhes do registro (e os respectivos rótulos)
+CAMPOS_MODAL = ['linha', 'Tipo Mensagem', 'Data/Hora Evento', 'Latitude', 'Longitude']
+ROTULOS_MODAL = ['Linha do CSV', 'Tipo Mensagem', 'Data/Hora Evento', 'Latitude', 'Longitude']
+
+# Scripts externos carregados no <head> do dashboard
+SCRIPTS_CABECALHO = [
+    'https://cdn.jsdelivr.net/npm/chart.js',
+    'https://cdn.jsdelivr.net/npm/chartjs-plugin-zoom@2.0.1/dist/chartjs-plugin-zoom.min.js',
+    'https://cdn.jsdelivr.net/npm/chartjs-plugin-datalabels@2.2.0/dist/chartjs-plugin-datalabels.min.js',
+]
 
-def extract_css_from_blocks(blocks):
-    inline_css = []
-    css_links = set()
-    cleaned_blocks = []
-
-    for block in blocks:
-        # Extract inline styles
-        styles = re.findall(r'<style.*?>(.*?)</style>', block, flags=re.DOTALL)
-        inline_css.extend(styles)
-
-        # Extract external stylesheets
-        links = re.findall(r'<link.*?rel=["\']stylesheet["\'].*?>', block, flags=re.DOTALL)
-        css_links.update(links)
-
-        # Remove CSS from block
-        clean_block = re.sub(r'<style.*?>.*?</style>', '', block, flags=re.DOTALL)
-        clean_block = re.sub(r'<link.*?rel=["\']stylesheet["\'].*?>', '', clean_block, flags=re.DOTALL)
-        cleaned_blocks.append(clean_block)
-
-    return inline_css, css_links, cleaned_blocks
-
-def extract_and_consolidate_scripts(blocks):
-    scripts = []
-    cleaned_blocks = []
-    global_vars_patterns = [
-        r'let\s+maximizedChartInstance\s*=\s*null\s*;',
-        r'window\.charts\s*=\s*\{\s*\}\s*;',
-        r'let\s+charts\s*=\s*window\.charts\s*;',
-        r'window\.chartStates\s*=\s*\{\s*\}\s*;',
-        r'let\s+chartStates\s*=\s*window\.chartStates\s*;',
-    ]
-
-    for block in blocks:
-        # Extract all scripts from block
-        found_scripts = re.findall(r'<script.*?>(.*?)</script>', block, flags=re.DOTALL)
-
-        for script in found_scripts:
-            # Remove duplicate global variables
-            clean_script = script
-            for pattern in global_vars_patterns:
-                clean_script = re.sub(pattern, '', clean_script, flags=re.MULTILINE)
-            scripts.append(clean_script.strip())
-
-        # Remove all scripts from original block
-        clean_block = re.sub(r'<script.*?>.*?</script>', '', block, flags=re.DOTALL)
-        cleaned_blocks.append(clean_block)
-
-    # Combine all remaining scripts into one
-    final_script_block = ""
-    if scripts:
-        final_script_block = "<script>\n" + "\n\n".join(scripts) + "\n</script>\n"
-
-    return final_script_block, cleaned_blocks
-
-def get_device_info(df):
-    """
-    Extrai informações do dispositivo do DataFrame
-    Args:
-        df: DataFrame com dados do dispositivo
-    Returns:
-        dict com informações do dispositivo
-    """
-    if df is None or df.empty:
-        return {
-            'tipo_dispositivo': 'N/A',
-            'imei': 'N/A',
-            'versao_firmware': 'N/A'
-        }
-    # Mapeamento de tipos de dispositivo
-    tipo_mapping = {
-        '802003': 'TM-10',
-        '385349': 'TM-08',
-        '83': 'TM-07'
-    }
-    # Extrair tipo de dispositivo
-    tipo_dispositivo = 'N/A'
-    if 'Tipo Dispositivo' in df.columns:
-        tipos_unicos = df['Tipo Dispositivo'].dropna().unique()
-        if len(tipos_unicos) > 0:
-            try:
-                tipo_int = int(float(tipos_unicos[0])) 
-                tipo_raw = str(tipo_int)
-            except:
-                tipo_raw = str(tipos_unicos[0])  # fallback
-            tipo_dispositivo = tipo_mapping.get(tipo_raw, f"Desconhecido ({tipo_raw})")
-    # Extrair IMEI
-    imei = 'N/A'
-    if 'IMEI' in df.columns:
-        imeis_unicos = df['IMEI'].dropna().unique()
-        if len(imeis_unicos) > 0:
-            imei = ', '.join([
-                str(int(float(i))) if isinstance(i, (str, float, int)) and str(i).replace('.', '', 1).isdigit()
-                else str(i)
-                for i in imeis_unicos
-            ])
-    # Extrair Versão Firmware
-    versao_firmware = 'N/A'
-    if 'Versão Firmware' in df.columns:
-        versoes_unicas = df['Versão Firmware'].dropna().unique()
-        if len(versoes_unicas) > 0:
-            versao_firmware = ', '.join([str(v) for v in versoes_unicas])
-    return {
-        'tipo_dispositivo': tipo_dispositivo,
-        'imei': imei,
-        'versao_firmware': versao_firmware
-    }
 
 def create_device_summary_html(df_raw):
     device = get_device_info(df_raw)
@@ -143,11 +52,114 @@ def create_device_summary_html(df_raw):
 
 
 
-def unir_blocos(df_raw):
+def dados_modal(df_raw):
+    """
+    Dados do modal em formato colunar, apenas com os campos exibidos
+    Args:
+        df_raw: DataFrame do log decodificado (linha do CSV = índice + 2)
+    Returns:
+        dict campo -> lista de valores (None onde não houver valor)
+    """
+    colunas = {'linha': [int(i) + 2 for i in df_raw.index]}
+    for campo in CAMPOS_MODAL[1:]:
+        if campo not in df_raw.columns:
+            colunas[campo] = [None] * len(df_raw)
+            continue
+        serie = df_raw[campo]
+        valores = serie.astype(str) if not pd.api.types.is_numeric_dtype(serie) else serie.astype(object)
+        colunas[campo] = valores.where(serie.notna(), None).tolist()
+    return colunas
+
+
+def payload_modal(df_raw, comprimir=False):
+    """
+    Expressão JavaScript (Promise) que resolve para os dados colunares do modal
+    Args:
+        df_raw: DataFrame do log decodificado
+        comprimir: embute o JSON em gzip + base64 (descompactado no navegador)
+    Returns:
+        string com o código JavaScript
+    """
+    data_json = json.dumps(dados_modal(df_raw), ensure_ascii=False, separators=(',', ':'))
+    if not comprimir:
+        return f"Promise.resolve({data_json})"
+    data_b64 = base64.b64encode(gzip.compress(data_json.encode('utf-8'))).decode('ascii')
+    return f"""(async () => {{
+        const bytes = Uint8Array.from(atob('{data_b64}'), c => c.charCodeAt(0));
+        const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+        return JSON.parse(await new Response(stream).text());
+    }})()"""
+
+
+def script_registro_modal(df_raw, comprimir=False, dados_externos=None):
+    """
+    Função JavaScript registroModal(linha), que devolve o registro exibido no modal
+    Args:
+        df_raw: DataFrame do log decodificado
+        comprimir: embute os dados compactados (gzip + base64)
+        dados_externos: arquivo SQLite ao lado do dashboard; se informado, os dados
+            não são embutidos e o modal busca cada registro no servidor_dados.py
+    """
+    if dados_externos:
+        gravar_registros(dados_modal(df_raw), dados_externos)
+        return """
+    async function registroModal(idx) {
+        const resposta = await fetch('api/registro?linha=' + Number(idx));
+        return resposta.ok ? await resposta.json() : null;
+    }"""
+    return f"""
+    const eventosPronto = {payload_modal(df_raw, comprimir)};
+    let indiceLinhas = null;
+    async function registroModal(idx) {{
+        const eventosColunas = await eventosPronto;
+        // Índice linha do CSV -> posição, montado uma única vez
+        if (indiceLinhas === null) {{
+            indiceLinhas = new Map(eventosColunas.linha.map((linha, pos) => [linha, pos]));
+        }}
+        const pos = indiceLinhas.get(Number(idx));
+        if (pos === undefined) return null;
+        const registro = {{}};
+        Object.keys(eventosColunas).forEach(campo => registro[campo] = eventosColunas[campo][pos]);
+        return registro;
+    }}"""
+
+
+def dados_dashboard(df_raw, comprimir_dados=False, dados_externos=None):
+    """
+    Partes do dashboard que dependem do log e não dos blocos
+    Args:
+        df_raw: DataFrame do log decodificado
+        comprimir_dados: embute os dados do modal compactados (gzip + base64)
+        dados_externos: arquivo SQLite para os dados do modal (modo sob demanda)
+    Returns:
+        dict com o HTML do resumo técnico ('resumo_html') e o JS do modal ('registro_js')
+    """
+    return {
+        'resumo_html': create_device_summary_html(df_raw),
+        # Dados do modal: embutidos em colunas ou buscados no servidor sob demanda
+        'registro_js': script_registro_modal(df_raw, comprimir_dados, dados_externos),
+    }
+
+
+def unir_blocos(df_raw, html_files=None, output_file=None, comprimir_dados=False, dados_externos=None, blocos=None, dados=None):
+    """
+    Monta o dashboard final a partir dos blocos
+    Args:
+        df_raw: DataFrame do log decodificado
+        html_files: lista ordenada de arquivos de blocos; se None (e sem blocos), usa todos de temp_blocos/
+        output_file: caminho do HTML final; se None, dashboard_final.html na raiz
+        comprimir_dados: embute os dados do modal compactados (gzip + base64)
+        dados_externos: arquivo SQLite para os dados do modal (modo sob demanda,
+            servido pelo servidor_dados.py); se None, os dados são embutidos
+        blocos: lista ordenada de blocos estruturados (blocos_html.criar_bloco)
+            devolvidos pelos gerar_bloco_*; dispensa a leitura dos arquivos
+        dados: partes já calculadas por dados_dashboard; se None, calculadas de df_raw
+    """
     blocks_dir = Path(__file__).parent / "temp_blocos"
-    output_file = Path(__file__).parent / "dashboard_final.html"
+    if output_file is None:
+        output_file = Path(__file__).parent / "dashboard_final.html"
     
-    if not os.path.exists(blocks_dir):
+    if blocos is None and html_files is None and not os.path.exists(blocks_dir):
         print(f"Error: Directory '{blocks_dir}' not found!")
         return
     
@@ -160,10 +172,21 @@ def unir_blocos(df_raw):
     #     str(blocks_dir / "bloco_satellite_estabilidade.html"),
     # ]
     
-    html_files = sorted([str(f) for f in blocks_dir.glob('*.html')])
+    if blocos is None:
+        if html_files is None:
+            html_files = sorted([str(f) for f in blocks_dir.glob('*.html')])
+        blocos = []
+        for file in html_files:
+            try:
+                bloco = ler_bloco(file)
+            except FileNotFoundError:
+                print(f"Warning: File '{file}' not found. Skipping...")
+                continue
+            if bloco is not None:
+                blocos.append(bloco)
 
-    if not html_files:
-        print(f"Error: No HTML files found in '{blocks_dir}'!")
+    if not blocos:
+        print("Error: No HTML blocks to assemble!")
         return
 
     # Global CSS - Adicionei os novos estilos para a logo e título
@@ -524,22 +547,16 @@ def unir_blocos(df_raw):
     </body>
     </html>"""
 
-    # Read and include blocks
-    blocks = []
-    for file in html_files:
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                content = f.read().strip()
-                if content:
-                    blocks.append(f"<!-- Block: {os.path.basename(file)} -->\n{content}\n")
-        except FileNotFoundError:
-            print(f"Warning: File '{file}' not found. Skipping...")
-
-    # Process blocks
-    inline_css, css_links, blocks_without_css = extract_css_from_blocks(blocks)
-    global_scripts, clean_blocks = extract_and_consolidate_scripts(blocks_without_css)
+    # CSS, JS e marcação dos blocos, sem trechos repetidos
+    partes = consolidar_blocos(blocos, SCRIPTS_CABECALHO)
+    clean_blocks = partes['html']
+    global_scripts = "".join(f'<script src="{url}"></script>\n' for url in partes['scripts'])
+    if partes['js']:
+        global_scripts += "<script>\n" + "\n\n".join(partes['js']) + "\n</script>\n"
+    scripts_cabecalho = "\n        ".join(f'<script src="{url}"></script>' for url in SCRIPTS_CABECALHO)
 
     PNG_FILE = Path(__file__).parent / "logo-golfleet-cor.png"
+    css_blocos = "\n".join(partes['css'])
 
         
     # HTML header
@@ -548,9 +565,7 @@ def unir_blocos(df_raw):
     <head>
         <meta charset="UTF-8">
         <title>Dashboard Individual</title>
-        <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-        <script src="https://cdn.jsdelivr.net/npm/chartjs-plugin-zoom@2.0.1/dist/chartjs-plugin-zoom.min.js"></script>
-        <script src="https://cdn.jsdelivr.net/npm/chartjs-plugin-datalabels@2.2.0/dist/chartjs-plugin-datalabels.min.js"></script>
+        {scripts_cabecalho}
         <link href="https://fonts.googleapis.com/css2?family=Saira:wght@600;700;800&display=swap" rel="stylesheet">
 
 
@@ -559,7 +574,7 @@ def unir_blocos(df_raw):
 
         <!-- Inline CSS from blocks -->
         <style>
-        {"\n".join(inline_css)}
+        {css_blocos}
         </style>
     </head>
     <body>
@@ -577,8 +592,10 @@ def unir_blocos(df_raw):
             
         """
 
-    # Criar HTML do resumo técnico do equipamento
-    device_summary_html = create_device_summary_html(df_raw)
+    # Resumo técnico do equipamento e dados do modal
+    if dados is None:
+        dados = dados_dashboard(df_raw, comprimir_dados, dados_externos)
+    device_summary_html = dados['resumo_html']
 
     # Combine all parts
     final_html = html_header
@@ -587,10 +604,7 @@ def unir_blocos(df_raw):
     final_html += "\n"
     final_html += global_scripts             # Consolidated scripts
     final_html += "\n"
-    # Embutir o DataFrame principal como JSON
-    df = df_raw.reset_index()  # 'index' vira coluna
-    df['linha'] = df['index'] + 2  # Agora bate com a linha do CSV original
-    data_json = json.dumps(df.to_dict(orient='records'), ensure_ascii=False)
+    registro_js = dados['registro_js']
     # Botão de teste para abrir o modal do primeiro registro
     botao_teste = '''<div style="text-align:center; margin-bottom:20px;">
         <button onclick="mostrarModal(0)" style="padding:10px 22px; font-size:1em; border-radius:12px; background:linear-gradient(90deg,#764ba2,#667eea); color:#fff; border:none; font-family:'Saira',sans-serif; font-weight:700; cursor:pointer; box-shadow:0 2px 8px rgba(102,51,153,0.07);">Ver detalhes do primeiro registro do CSV</button>
@@ -606,15 +620,15 @@ def unir_blocos(df_raw):
         </div>
     </div>
     <script>
-    const eventosData = {data_json};
-    function mostrarModal(idx) {{
-        // Busca o registro pelo valor da coluna 'linha'
-        const registro = eventosData.find(r => r.linha == idx);
+    {registro_js}
+    async function mostrarModal(idx) {{
+        const registro = await registroModal(idx);
         let html = '';
-        const cols = ['linha', 'Tipo Mensagem', 'Data/Hora Evento', 'Latitude', 'Longitude'];
-        const labels = ['Linha do CSV', 'Tipo Mensagem', 'Data/Hora Evento', 'Latitude', 'Longitude'];
-        for (let i = 0; i < cols.length; i++) {{           
-            html += `<tr><th>` + labels[i] + `</th><td>` + (registro && registro[cols[i]] !== undefined ? registro[cols[i]] : '') + `</td></tr>`;
+        const cols = {json.dumps(CAMPOS_MODAL, ensure_ascii=False)};
+        const labels = {json.dumps(ROTULOS_MODAL, ensure_ascii=False)};
+        for (let i = 0; i < cols.length; i++) {{
+            const valor = registro ? registro[cols[i]] : null;
+            html += `<tr><th>` + labels[i] + `</th><td>` + (valor !== null && valor !== undefined ? valor : '') + `</td></tr>`;
         }}
         document.getElementById('modalTable').innerHTML = html;
         document.getElementById('modalBg').classList.add('active');
@@ -703,14 +717,7 @@ def unir_blocos(df_raw):
 if __name__ == "__main__":
     # Exemplo de uso: você deve carregar o DataFrame df_raw antes de chamar unir_blocos
     try:
-        df = None
-        # Tenta ler o arquivo com diferentes codificações
-        for enc in ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']:
-            try:
-                df = pd.read_csv('logs/867488061317839_decoded.csv', encoding=enc, low_memory=False)
-                break
-            except Exception:
-                continue
+        df = carregar_log('logs/867488061317839_decoded.csv')
         if df is None:
             print("❌ Não foi possível ler o arquivo.")
             pass
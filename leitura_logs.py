@@ -0,0 +1,215 @@
+import codecs
+import glob
+import hashlib
+import io
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (necessário para o cache em Parquet)
+except ImportError:
+    pyarrow = None
+
+# Codificações testadas, na mesma ordem usada historicamente pelos scripts
+CODIFICACOES = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
+
+# Tipos explícitos das colunas conhecidas do *_decoded.csv
+COLUNAS_DATA = ['Data/Hora Inclusão', 'Data/Hora Evento', 'GNSS UTC Time']
+COLUNAS_INTEIRAS = ['Sequência', 'Position Report Type']
+COLUNAS_DECIMAIS = [
+    'Latitude', 'Longitude', 'Velocidade', 'Satélites', 'Precisão GNSS',
+    'Hodômetro Atual', 'Hodômetro Total'
+]
+COLUNAS_TEXTO = [
+    'IMEI', 'Tipo Mensagem', 'Tipo Dispositivo', 'Versão Firmware',
+    'Event Code', 'Motivo Power On'
+]
+# 'Motion Status' fica com o tipo inferido pelo read_csv (21 ou 21.0, conforme haja
+# linhas vazias), o mesmo que os scripts sempre gravaram nos CSVs de saída
+
+# Versão do esquema produzido por tipar_colunas; incrementar sempre que a
+# tipagem mudar para invalidar os caches em Parquet já gravados
+VERSAO_ESQUEMA = 2
+
+# Leitura em blocos (streaming): número de linhas por bloco e tamanho de
+# arquivo a partir do qual as análises deixam de carregar o log inteiro
+TAMANHO_BLOCO = 100_000
+LIMITE_STREAMING = 256 * 1024 * 1024
+
+# Cache em memória: (caminho absoluto, mtime, tamanho) -> DataFrame tipado
+_logs_carregados = {}
+
+
+def detectar_encoding(conteudo):
+    """
+    Descobre a primeira codificação da lista capaz de decodificar o arquivo
+    Args:
+        conteudo: bytes do arquivo
+    Returns:
+        tupla (encoding, texto decodificado) ou (None, None)
+    """
+    for enc in CODIFICACOES:
+        try:
+            return enc, conteudo.decode(enc)
+        except UnicodeDecodeError:
+            continue
+    return None, None
+
+
+def detectar_encoding_arquivo(caminho, tamanho_leitura=1024 * 1024):
+    """Mesma regra de detectar_encoding, decodificando o arquivo aos poucos."""
+    for enc in CODIFICACOES:
+        decodificador = codecs.getincrementaldecoder(enc)()
+        try:
+            with open(caminho, 'rb') as f:
+                for trecho in iter(lambda: f.read(tamanho_leitura), b''):
+                    decodificador.decode(trecho)
+            decodificador.decode(b'', final=True)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def tipar_colunas(df):
+    """Converte as colunas conhecidas para os tipos esperados pelas análises."""
+    df.columns = [col.strip() for col in df.columns]
+    for col in COLUNAS_DATA:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    for col in COLUNAS_INTEIRAS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+    for col in COLUNAS_DECIMAIS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    for col in COLUNAS_TEXTO:
+        if col in df.columns:
+            df[col] = df[col].str.strip()
+    return df
+
+
+def caminho_cache(caminho, hash_conteudo):
+    """Arquivo Parquet oculto ao lado do CSV, identificado pelo hash e pela versão do esquema."""
+    pasta, nome = os.path.split(caminho)
+    return os.path.join(pasta, f".{nome}.{hash_conteudo[:16]}.v{VERSAO_ESQUEMA}.parquet")
+
+
+def _ler_cache(arquivo):
+    df = pd.read_parquet(arquivo)
+    # O Parquet devolve None nas colunas de texto; os scripts esperam NaN
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+
+def _gravar_cache(df, caminho, arquivo):
+    pasta, nome = os.path.split(caminho)
+    for antigo in glob.glob(os.path.join(pasta, glob.escape(f".{nome}.") + '*.parquet')):
+        if antigo != arquivo:
+            os.remove(antigo)
+    df.to_parquet(arquivo)
+
+
+def _ler_log(caminho, usar_cache=True):
+    with open(caminho, 'rb') as f:
+        conteudo = f.read()
+
+    usar_cache = usar_cache and pyarrow is not None
+    if usar_cache:
+        arquivo_cache = caminho_cache(caminho, hashlib.sha256(conteudo).hexdigest())
+        if os.path.exists(arquivo_cache):
+            try:
+                return _ler_cache(arquivo_cache)
+            except Exception as e:
+                print(f"⚠️ Cache inválido, relendo o CSV: {e}")
+
+    enc, texto = detectar_encoding(conteudo)
+    if texto is None:
+        return None
+    df = pd.read_csv(
+        io.StringIO(texto),
+        dtype={col: str for col in COLUNAS_TEXTO},
+        low_memory=False
+    )
+    df = tipar_colunas(df)
+
+    if usar_cache:
+        try:
+            _gravar_cache(df, caminho, arquivo_cache)
+        except (OSError, ValueError, TypeError) as e:
+            print(f"⚠️ Não foi possível gravar o cache: {e}")
+    return df
+
+
+def carregar_log(fonte, usar_cache=True):
+    """
+    Lê um log decodificado uma única vez e devolve uma cópia tipada
+    Args:
+        fonte: caminho do *_decoded.csv ou DataFrame já carregado
+        usar_cache: reaproveita/grava o cache em Parquet ao lado do CSV (requer pyarrow)
+    Returns:
+        DataFrame tipado (índice 0..n-1, linha do CSV = índice + 2) ou None
+    """
+    if isinstance(fonte, pd.DataFrame):
+        return fonte.copy()
+
+    caminho = os.path.abspath(fonte)
+    if not os.path.exists(caminho):
+        return None
+    info = os.stat(caminho)
+    chave = (caminho, info.st_mtime_ns, info.st_size)
+
+    if chave not in _logs_carregados:
+        df = _ler_log(caminho, usar_cache)
+        if df is None:
+            return None
+        _logs_carregados.clear()
+        _logs_carregados[chave] = df
+    return _logs_carregados[chave].copy()
+
+
+def tamanho_bloco_streaming(fonte, tamanho_bloco=None):
+    """
+    Decide se uma análise deve ler o log em blocos
+    Args:
+        fonte: caminho do *_decoded.csv ou DataFrame já carregado
+        tamanho_bloco: linhas por bloco pedidas explicitamente (None = automático)
+    Returns:
+        número de linhas por bloco ou None para carregar o log inteiro
+    """
+    if isinstance(fonte, pd.DataFrame):
+        return None
+    if tamanho_bloco:
+        return tamanho_bloco
+    if os.path.exists(fonte) and os.path.getsize(fonte) > LIMITE_STREAMING:
+        return TAMANHO_BLOCO
+    return None
+
+
+def ler_log_em_blocos(caminho, colunas=None, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê o log em blocos de tamanho fixo, sem carregar o arquivo inteiro
+    Args:
+        caminho: caminho do *_decoded.csv
+        colunas: colunas necessárias (None = todas); reduz a memória por bloco
+        tamanho_bloco: número de linhas por bloco
+    Returns:
+        gerador de DataFrames tipados; o índice continua entre os blocos
+        (linha do CSV = índice + 2, como em carregar_log)
+    """
+    enc = detectar_encoding_arquivo(caminho)
+    if enc is None:
+        raise ValueError(f"Não foi possível decodificar o arquivo: {caminho}")
+    usecols = None if colunas is None else (lambda col: col.strip() in colunas)
+    leitor = pd.read_csv(
+        caminho,
+        encoding=enc,
+        dtype={col: str for col in COLUNAS_TEXTO},
+        usecols=usecols,
+        chunksize=tamanho_bloco
+    )
+    with leitor:
+        for bloco in leitor:
+            yield tipar_colunas(bloco)
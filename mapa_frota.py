@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import folium
+import numpy as np
+import pandas as pd
+from branca.element import MacroElement
+from jinja2 import Template
+
+from leitura_logs import carregar_log
+from deteccao_deriva import blocos_efeito_estrela, detectar_deriva
+from paleta_cores import PALETA_BLOCOS, cores_ciclicas
+
+# Níveis de zoom pré-agregados; o navegador usa o maior nível que não passa do zoom atual
+NIVEIS_ZOOM = [4, 7, 10, 13, 16]
+
+# Lado (px, na projeção Web Mercator) das células de agregação em cada nível
+TAMANHO_CELULA_PX = 48
+
+# Cor de cada IMEI, em ordem (paleta dos blocos sem os vermelhos); células com deriva ficam em COR_DERIVA
+COR_DERIVA = '#FF0000'
+CORES_IMEI = [cor for cor in PALETA_BLOCOS if cor not in (COR_DERIVA, '#FF3333')]
+
+
+def celulas_grade(lat, lon, zoom, tamanho_px=TAMANHO_CELULA_PX):
+    """
+    Célula da grade de agregação de cada ponto num nível de zoom (Web Mercator)
+    Returns:
+        (coluna, linha) como np.ndarray int64
+    """
+    lat = np.clip(np.asarray(lat, dtype=float), -85.0511, 85.0511)
+    lon = np.asarray(lon, dtype=float)
+    escala = 256 * 2 ** zoom / tamanho_px
+    x = (lon + 180.0) / 360.0 * escala
+    seno = np.sin(np.radians(lat))
+    y = (0.5 - np.log((1 + seno) / (1 - seno)) / (4 * np.pi)) * escala
+    return np.floor(x).astype(np.int64), np.floor(y).astype(np.int64)
+
+
+def agregar_log(caminho_log, niveis_zoom=NIVEIS_ZOOM):
+    """
+    Agrega os pontos do efeito estrela de um log em células por nível de zoom
+    Args:
+        caminho_log: log decodificado
+        niveis_zoom: níveis de zoom pré-agregados
+    Returns:
+        dict com 'imei', 'pontos', 'paradas_deriva', 'distancia_fantasma_m' e 'niveis'
+        (zoom -> lista [lat, lon, pontos, pontos em deriva] por célula), ou None
+    """
+    df = carregar_log(caminho_log)
+    if df is None:
+        return None
+    imei = Path(caminho_log).name[:-len('_decoded.csv')]
+    blocos = blocos_efeito_estrela(df)
+    deriva = detectar_deriva(blocos)
+    pontos = pd.concat([bloco for bloco in blocos if not bloco.empty] or [pd.DataFrame(columns=['linha', 'Latitude', 'Longitude'])])
+    lat = pontos['Latitude'].to_numpy(dtype=float)
+    lon = pontos['Longitude'].to_numpy(dtype=float)
+
+    # Pontos dentro de alguma parada com deriva (intervalos de linhas disjuntos)
+    linhas = pontos['linha'].to_numpy(dtype=np.int64)
+    intervalos = deriva[['linha_inicial', 'linha_final']].sort_values('linha_inicial').to_numpy(dtype=np.int64)
+    posicao = np.searchsorted(intervalos[:, 0], linhas, side='right') - 1
+    em_deriva = (posicao >= 0) & (linhas <= intervalos[np.maximum(posicao, 0), 1]) if len(intervalos) else np.zeros(len(linhas), dtype=bool)
+
+    niveis = {}
+    for zoom in niveis_zoom:
+        coluna, linha = celulas_grade(lat, lon, zoom)
+        celulas = pd.DataFrame({'coluna': coluna, 'linha': linha, 'lat': lat, 'lon': lon, 'deriva': em_deriva})
+        grupos = celulas.groupby(['coluna', 'linha'], sort=False)
+        resumo = pd.DataFrame({
+            'lat': grupos['lat'].mean().round(5),
+            'lon': grupos['lon'].mean().round(5),
+            'pontos': grupos.size(),
+            'deriva': grupos['deriva'].sum(),
+        })
+        niveis[str(zoom)] = [[la, lo, int(n), int(d)] for la, lo, n, d in resumo.itertuples(index=False)]
+    return {
+        'imei': imei,
+        'pontos': len(pontos),
+        'paradas_deriva': len(deriva),
+        'distancia_fantasma_m': round(float(deriva['distancia_fantasma_m'].sum()), 1),
+        'niveis': niveis,
+    }
+
+
+class CamadaGradeFrota(MacroElement):
+    """Células pré-agregadas de um IMEI, redesenhadas no nível de zoom mais próximo."""
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var grupo = {{ this._parent.get_name() }};
+            var mapa = {{ this.mapa }};
+            var niveis = {{ this.niveis }};
+            var zooms = Object.keys(niveis).map(Number).sort(function(a, b) { return a - b; });
+            function desenhar() {
+                var nivel = zooms[0];
+                zooms.forEach(function(z) { if (z <= mapa.getZoom()) nivel = z; });
+                grupo.clearLayers();
+                niveis[nivel].forEach(function(c) {
+                    var cor = c[3] > 0 ? '{{ this.cor_deriva }}' : '{{ this.cor }}';
+                    L.circleMarker([c[0], c[1]], {
+                        radius: 4 + 2 * Math.log(c[2]), color: cor, weight: 1, fillColor: cor, fillOpacity: 0.55
+                    }).bindTooltip('{{ this.imei }}: ' + c[2] + ' pontos' + (c[3] > 0 ? ' (' + c[3] + ' em deriva)' : '')).addTo(grupo);
+                });
+            }
+            mapa.on('zoomend', desenhar);
+            desenhar();
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, mapa, imei, niveis, cor):
+        super().__init__()
+        self._name = 'CamadaGradeFrota'
+        self.mapa = mapa.get_name()
+        self.imei = imei
+        self.niveis = json.dumps(niveis, separators=(',', ':'))
+        self.cor = cor
+        self.cor_deriva = COR_DERIVA
+
+
+def criar_mapa_frota(agregados):
+    """
+    Mapa da frota com uma camada por IMEI (ligável no controle de camadas)
+    Args:
+        agregados: lista de resultados de agregar_log
+    Returns:
+        folium.Map
+    """
+    centro = [0.0, 0.0]
+    if agregados:
+        maior_nivel = str(max(int(z) for z in agregados[0]['niveis']))
+        celulas = np.array([c for agregado in agregados for c in agregado['niveis'][maior_nivel]] or [[0, 0, 1, 0]])
+        centro = np.average(celulas[:, :2], axis=0, weights=celulas[:, 2]).tolist()
+    mapa = folium.Map(location=centro, zoom_start=NIVEIS_ZOOM[0], tiles='OpenStreetMap', prefer_canvas=True)
+
+    agregados = sorted(agregados, key=lambda a: -a['distancia_fantasma_m'])
+    for agregado, cor in zip(agregados, cores_ciclicas(CORES_IMEI, len(agregados))):
+        nome = f"{agregado['imei']} ({agregado['paradas_deriva']} paradas com deriva, {agregado['distancia_fantasma_m']:.0f} m)"
+        grupo = folium.FeatureGroup(name=nome).add_to(mapa)
+        grupo.add_child(CamadaGradeFrota(mapa, agregado['imei'], agregado['niveis'], cor))
+    folium.LayerControl(collapsed=False).add_to(mapa)
+
+    legenda_html = f"""
+    <div style="position: fixed; bottom: 20px; left: 10px; z-index: 9999; background: white; border: 2px solid #333;
+                border-radius: 10px; padding: 10px 14px; font-family: Arial, sans-serif; font-size: 12px;">
+        <b>🚗 Frota: {len(agregados)} equipamentos</b><br>
+        Círculos = pontos agregados por célula (tamanho cresce com a quantidade)<br>
+        <span style="color: {COR_DERIVA};">●</span> Célula com pontos em parada com deriva de GPS
+    </div>
+    """
+    mapa.get_root().html.add_child(folium.Element(legenda_html))
+    return mapa
+
+
+def gerar_mapa_frota(pasta_logs, caminho_saida='frota/mapa_frota.html', max_workers=None):
+    """
+    Gera o mapa da frota a partir de todos os <IMEI>_decoded.csv de uma pasta
+    Args:
+        pasta_logs: pasta com os logs decodificados
+        caminho_saida: arquivo HTML do mapa
+        max_workers: número de processos (None = número de CPUs)
+    Returns:
+        lista de resultados de agregar_log
+    """
+    logs = sorted(Path(pasta_logs).resolve().glob('*_decoded.csv'))
+    if not logs:
+        print(f"❌ Nenhum arquivo *_decoded.csv encontrado em: {pasta_logs}")
+        return []
+
+    agregados = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futuros = {pool.submit(agregar_log, str(caminho)): caminho for caminho in logs}
+        for futuro in as_completed(futuros):
+            try:
+                agregado = futuro.result()
+            except Exception as e:
+                print(f"❌ Erro ao agregar {futuros[futuro].name}: {e}")
+                continue
+            if agregado is not None:
+                agregados.append(agregado)
+                print(f"✅ {agregado['imei']}: {agregado['pontos']} pontos ({len(agregados)}/{len(logs)})")
+
+    Path(caminho_saida).parent.mkdir(parents=True, exist_ok=True)
+    criar_mapa_frota(agregados).save(caminho_saida)
+    print(f"✅ Mapa da frota salvo em: {Path(caminho_saida).resolve()}")
+    return agregados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Gera o mapa de deriva de GPS de todos os logs de uma pasta.')
+    parser.add_argument('pasta_logs', nargs='?', default='logs')
+    parser.add_argument('--saida', default=str(Path('frota') / 'mapa_frota.html'), help='Arquivo HTML do mapa')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Número de processos em paralelo')
+    args = parser.parse_args()
+    gerar_mapa_frota(args.pasta_logs, args.saida, args.workers)
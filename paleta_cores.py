@@ -0,0 +1,114 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Cores distintas dos blocos de ignição (mapa do efeito estrela) e dos equipamentos (mapa da frota)
+PALETA_BLOCOS = (
+    '#FF0000',  # Vermelho
+    '#0066FF',  # Azul
+    '#FF6600',  # Laranja
+    '#9900FF',  # Roxo
+    '#00CC00',  # Verde
+    '#FF0099',  # Rosa
+    '#00CCCC',  # Ciano
+    '#FFCC00',  # Amarelo
+    '#CC0066',  # Magenta escuro
+    '#6600CC',  # Violeta
+    '#FF3333',  # Vermelho claro
+    '#3366FF',  # Azul royal
+    '#FF9900',  # Laranja dourado
+    '#CC00CC',  # Magenta
+    '#00FF66',  # Verde limão
+)
+
+# Cores dos tipos de evento nos gráficos do Chart.js (bloco_eventos)
+PALETA_EVENTOS = (
+    "#0e0561", "#3ae8ff", "#3b08b3", "#4ff9ff", "#3c04d6",
+    "#00bfff", "#2519CC", "#48d8f1", "#9370db", "#000000",
+)
+
+# Degradê do trajeto: (posição de 0 a 1, cor), interpolado linearmente entre as paradas
+DEGRADE_AZUL_ROXO_VERMELHO = ((0.0, '#00f6ff'), (0.5, '#8000ff'), (1.0, '#ff0000'))
+
+# Tamanho máximo das tabelas de cores; progressos mais finos que isto caem no nível mais próximo
+NIVEIS_TABELA = 256
+
+
+def cores_ciclicas(paleta, quantidade):
+    """
+    Uma cor por item, repetindo a paleta quando há mais itens que cores
+    Returns:
+        lista com `quantidade` cores
+    """
+    return [paleta[i % len(paleta)] for i in range(quantidade)]
+
+
+def _rgb(cor):
+    cor = cor.lstrip('#')
+    return [int(cor[i:i + 2], 16) for i in (0, 2, 4)]
+
+
+def paradas_escurecimento(cor_base):
+    """
+    Paradas do degradê de uma cor, do quase preto (10%) à cor cheia, escurecendo mais o início
+    (aproxima a antiga curva por trechos: até 5 unidades de diferença por canal)
+    Returns:
+        tupla de (posição, cor) para tabela_degrade/cores_degrade
+    """
+    r, g, b = _rgb(cor_base)
+    return tuple(
+        (posicao, '#{:02x}{:02x}{:02x}'.format(*(min(255, int(canal * fator)) for canal in (r, g, b))))
+        for posicao, fator in ((0.0, 0.1), (0.3, 0.5), (0.7, 0.8), (1.0, 1.0))
+    )
+
+
+@lru_cache(maxsize=None)
+def tabela_degrade(paradas=DEGRADE_AZUL_ROXO_VERMELHO, niveis=NIVEIS_TABELA):
+    """
+    Tabela de cores de um degradê, calculada uma vez por (paradas, niveis)
+    Args:
+        paradas: tupla de (posição de 0 a 1, cor '#rrggbb'), em ordem de posição
+        niveis: quantidade de cores da tabela
+    Returns:
+        np.ndarray (somente leitura) com `niveis` cores '#rrggbb'; o nível i é a posição i/(niveis-1)
+    """
+    posicoes = np.array([posicao for posicao, _ in paradas], dtype=float)
+    rgb = np.array([_rgb(cor) for _, cor in paradas], dtype=float)
+    t = np.arange(niveis) / (niveis - 1) if niveis > 1 else np.zeros(1)
+
+    # Trecho entre as paradas k e k+1; na posição exata de uma parada vale o trecho seguinte
+    k = np.clip(np.searchsorted(posicoes, t, side='right') - 1, 0, len(posicoes) - 2)
+    razao = (t - posicoes[k]) / (posicoes[k + 1] - posicoes[k])
+    canais = (rgb[k] + (rgb[k + 1] - rgb[k]) * razao[:, None]).astype(int)
+
+    hexa = np.array([f'{v:02x}' for v in range(256)], dtype=object)
+    tabela = '#' + hexa[canais[:, 0]] + hexa[canais[:, 1]] + hexa[canais[:, 2]]
+    tabela.flags.writeable = False
+    return tabela
+
+
+def cores_degrade(progresso, paradas=DEGRADE_AZUL_ROXO_VERMELHO, niveis=NIVEIS_TABELA):
+    """
+    Cor de cada ponto a partir do progresso normalizado, por consulta à tabela em cache
+    Args:
+        progresso: valores de 0 a 1 (fora disso são limitados)
+        paradas: paradas do degradê (tabela_degrade)
+        niveis: tamanho da tabela
+    Returns:
+        np.ndarray com uma cor '#rrggbb' por valor
+    """
+    progresso = np.clip(np.asarray(progresso, dtype=float), 0.0, 1.0)
+    return tabela_degrade(paradas, niveis)[np.rint(progresso * (niveis - 1)).astype(np.int64)]
+
+
+def degrade_pontos(num_pontos, paradas=DEGRADE_AZUL_ROXO_VERMELHO):
+    """
+    Degradê com uma cor por ponto de um trajeto, do primeiro (0) ao último (1)
+    Até NIVEIS_TABELA pontos cada ponto tem a cor exata; acima disso a tabela é compartilhada
+    e cada canal pode diferir em até 2 unidades da cor exata (DEGRADE_AZUL_ROXO_VERMELHO).
+    Returns:
+        lista com `num_pontos` cores (no mínimo uma)
+    """
+    num_pontos = max(num_pontos, 1)
+    niveis = min(num_pontos, NIVEIS_TABELA)
+    return cores_degrade(np.linspace(0.0, 1.0, num_pontos), paradas, niveis).tolist()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from dispositivo import get_device_info
+
+# Intervalo esperado entre GTERI (s) e desvio aceito, por tipo de dispositivo e firmware.
+# A chave é (tipo, firmware) como em dispositivo.get_device_info; firmware None vale para todas as
+# versões do tipo. Ex.: ('TM-10', '0x0a14'): {...} sobrepõe ('TM-10', None) só nessa versão.
+PERFIS_INTERVALO = {
+    ('TM-10', None): {'intervalo_on': 180, 'intervalo_off': 3600, 'tolerancia': 5},
+}
+
+# Perfil usado quando o dispositivo não está cadastrado
+PERFIL_PADRAO = {'intervalo_on': 180, 'intervalo_off': 3600, 'tolerancia': 5}
+
+# Limites (s) das faixas de desvio do histograma, além da tolerância
+LIMITES_DESVIO = [10, 60, 300, 900]
+
+# Exemplos de linhas guardados por faixa
+EXEMPLOS_POR_FAIXA = 5
+
+
+def perfil_intervalo(df):
+    """
+    Perfil de intervalo do dispositivo do log
+    Args:
+        df: DataFrame com as colunas 'Tipo Dispositivo' e 'Versão Firmware'
+    Returns:
+        dict com intervalo_on, intervalo_off e tolerancia (s)
+    """
+    device = get_device_info(df)
+    tipo, firmware = device['tipo_dispositivo'], device['versao_firmware']
+    return PERFIS_INTERVALO.get((tipo, firmware)) or PERFIS_INTERVALO.get((tipo, None)) or PERFIL_PADRAO
+
+
+def _rotulo_faixa(inicio, fim, sinal):
+    if np.isinf(fim):
+        return f"{sinal}{inicio:g} s ou mais"
+    if sinal == '-':
+        return f"-{fim:g} a -{inicio:g} s"
+    return f"+{inicio:g} a +{fim:g} s"
+
+
+def classificar_desvios(tempos, linhas, esperado, tolerancia, limites=LIMITES_DESVIO):
+    """
+    Agrupa em faixas os intervalos que fogem do esperado
+    Args:
+        tempos: array de intervalos em segundos (NaN quando não há intervalo anterior)
+        linhas: array com a linha do CSV de cada intervalo
+        esperado: intervalo esperado, em segundos
+        tolerancia: desvio aceito, em segundos, para mais ou para menos
+        limites: limites das faixas de desvio (s); os que não passam da tolerância são ignorados
+    Returns:
+        (total de anomalias, DataFrame com 'faixa', 'quantidade' e 'exemplos' das faixas não vazias,
+        de adiantadas a atrasadas e por último as sem intervalo anterior)
+    """
+    tempos = np.asarray(tempos, dtype=float)
+    linhas = np.asarray(linhas)
+    desvio = tempos - esperado
+    bordas = np.array([tolerancia] + [limite for limite in limites if limite > tolerancia] + [np.inf], dtype=float)
+    n = len(bordas) - 1
+
+    # Faixa k cobre |desvio| em (bordas[k], bordas[k+1]]: adiantadas 0..n-1 (da maior para a menor),
+    # atrasadas n..2n-1, sem intervalo anterior 2n
+    posicao = np.searchsorted(bordas, np.abs(desvio), side='left') - 1
+    codigo = np.where(desvio < 0, n - 1 - posicao, n + posicao)
+    codigo = np.where(np.isnan(desvio), 2 * n, codigo)
+    anomalia = np.isnan(desvio) | (np.abs(desvio) > tolerancia)
+
+    rotulos = [_rotulo_faixa(bordas[k], bordas[k + 1], '-') for k in reversed(range(n))]
+    rotulos += [_rotulo_faixa(bordas[k], bordas[k + 1], '+') for k in range(n)]
+    rotulos.append('Sem intervalo anterior')
+
+    anomalias = pd.DataFrame({'codigo': codigo[anomalia], 'linha': linhas[anomalia]})
+    grupos = anomalias.groupby('codigo', sort=True)['linha']
+    faixas = pd.DataFrame({
+        'quantidade': grupos.size(),
+        'exemplos': grupos.agg(lambda serie: serie.head(EXEMPLOS_POR_FAIXA).tolist()),
+    })
+    faixas.insert(0, 'faixa', [rotulos[codigo] for codigo in faixas.index])
+    return int(anomalia.sum()), faixas.reset_index(drop=True)
@@ -0,0 +1,510 @@
+import argparse
+import importlib.util
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+from leitura_logs import carregar_log, tamanho_bloco_streaming
+from html_final import unir_blocos, dados_dashboard
+from dispositivo import get_device_info
+from servidor_dados import ARQUIVO_DADOS
+from base_frota import gravar_execucao
+from cache_relatorio import (
+    hash_arquivo, hash_valores, hash_codigo_comum, ler_manifesto, gravar_manifesto,
+    em_dia, registrar, conteudo_guardado, descartar
+)
+
+RAIZ = Path(__file__).resolve().parent
+
+# Grafo do relatório: cada etapa declara o script, a função e as dependências.
+# Etapas com 'usa_log' recebem o DataFrame do log; as demais leem os CSVs
+# intermediários gerados pelas análises das quais dependem.
+# Etapas com 'streaming' recebem o caminho do log quando o arquivo passa de
+# LIMITE_STREAMING (leitura_logs) e o leem em blocos, sem o DataFrame inteiro.
+# Etapas com 'bloco' devolvem o bloco estruturado (blocos_html.criar_bloco),
+# montado no dashboard sem passar pelo disco; a ordem delas é a ordem dos blocos.
+# Etapas com 'sob_demanda' gravam as tabelas longas no SQLite do dashboard
+# quando o relatório é gerado com sob_demanda=True.
+# 'resultados' liga parâmetros ao retorno de uma dependência executada nesta
+# rodada; se ela foi reaproveitada do cache, a etapa lê os CSVs de 'arquivos'.
+# 'saidas' lista os arquivos gerados pela análise (vigiados no modo incremental).
+ETAPAS = {
+    'eventos': {
+        'arquivo': 'Analise de eventos/Eventos_gerais.py',
+        'funcao': 'eventos',
+        'arquivos': {'caminho_saida': 'quantidade_tipos_mensagem.csv'},
+        'saidas': ['quantidade_tipos_mensagem.csv', 'quantidade_tipos_mensagem_por_dia.csv'],
+        'usa_log': True,
+        'streaming': True,
+        'depende': [],
+    },
+    'gerar_bloco_eventos': {
+        'arquivo': 'Analise de eventos/bloco_eventos.py',
+        'funcao': 'gerar_bloco_eventos',
+        'arquivos': {'csv_totais': 'quantidade_tipos_mensagem.csv', 'csv_diario': 'quantidade_tipos_mensagem_por_dia.csv'},
+        'depende': ['eventos'],
+        'bloco': 'bloco_eventos_diarios.html',
+    },
+    'viagens': {
+        'arquivo': 'hodometro/Hodometro.py',
+        'funcao': 'viagens',
+        'arquivos': {'caminho_saida': 'resultado_viagens.csv'},
+        'saidas': ['resultado_viagens.csv'],
+        'usa_log': True,
+        'depende': [],
+    },
+    'gerar_bloco_hodometro': {
+        'arquivo': 'hodometro/html_hodometro.py',
+        'funcao': 'gerar_bloco_hodometro_from_csv',
+        'arquivos': {'csv_path': 'resultado_viagens.csv'},
+        'depende': ['viagens'],
+        'bloco': 'bloco_hodometro.html',
+    },
+    'ignicao': {
+        'arquivo': 'Tempo ignicao/time_ignicao.py',
+        'funcao': 'time_ign_por_viagem',
+        'arquivos': {'caminho_saida': 'tempo_ignicao_viagens.csv'},
+        'saidas': ['tempo_ignicao_viagens.csv'],
+        'usa_log': True,
+        'depende': [],
+    },
+    'gerar_bloco_ignicao': {
+        'arquivo': 'Tempo ignicao/ignicao_html.py',
+        'funcao': 'gerar_bloco_ignicao',
+        'arquivos': {'csv_path': 'tempo_ignicao_viagens.csv'},
+        'resultados': {'ciclos': 'ignicao'},
+        'depende': ['ignicao'],
+        'bloco': 'bloco_ignicao.html',
+    },
+    'reboot': {
+        'arquivo': 'Reboot/reboot.py',
+        'funcao': 'reboot',
+        'arquivos': {'caminho_saida': 'reboot_eventos.csv'},
+        'saidas': ['reboot_eventos.csv'],
+        'usa_log': True,
+        'depende': [],
+    },
+    'gerar_bloco_reboot': {
+        'arquivo': 'Reboot/reboot_html.py',
+        'funcao': 'gerar_bloco_reboot',
+        'arquivos': {'csv_path': 'reboot_eventos.csv'},
+        'depende': ['reboot'],
+        'bloco': 'bloco_reboot.html',
+        'sob_demanda': True,
+    },
+    'satelites': {
+        'arquivo': 'Satelites/satelites.py',
+        'funcao': 'analise_medias',
+        'arquivos': {'pasta_saida': '.'},
+        'saidas': ['estatisticas_gps_todos.csv', 'estatisticas_gps_validos.csv', 'estatisticas_gps_resumo.csv'],
+        'usa_log': True,
+        'streaming': True,
+        'depende': [],
+    },
+    'gerar_bloco_satelites': {
+        'arquivo': 'Satelites/html_satelites.py',
+        'funcao': 'gerar_bloco_satelites',
+        'arquivos': {'csv_todos': 'estatisticas_gps_todos.csv', 'csv_validos': 'estatisticas_gps_validos.csv', 'csv_resumo': 'estatisticas_gps_resumo.csv'},
+        'depende': ['satelites'],
+        'bloco': 'bloco_satelites.html',
+    },
+    'temporizadas': {
+        'arquivo': 'Tempo de posicoes/tempo_ERI.py',
+        'funcao': 'temporizadas_entre_si_com_ign',
+        'arquivos': {'caminho_saida': 'temporizadas_final.csv'},
+        'saidas': ['temporizadas_final.csv'],
+        'usa_log': True,
+        'depende': [],
+    },
+    'gerar_bloco_temporizadas': {
+        'arquivo': 'Tempo de posicoes/temporizadas_html.py',
+        'funcao': 'gerar_bloco_temporizadas',
+        'arquivos': {'csv_path': 'temporizadas_final.csv'},
+        'depende': ['temporizadas'],
+        'bloco': 'bloco_temporizadas.html',
+    },
+    'logs': {
+        'arquivo': 'Log/mensagens_log.py',
+        'funcao': 'logs',
+        'arquivos': {'caminho_saida': 'logs.csv'},
+        'saidas': ['logs.csv'],
+        'usa_log': True,
+        'streaming': True,
+        'depende': [],
+    },
+    'time_fix': {
+        'arquivo': 'Time fix/Analise de TTFF.py',
+        'funcao': 'calcular_time_fix',
+        'arquivos': {'caminho_saida': 'time_fix_resultado.csv'},
+        'saidas': ['time_fix_resultado.csv'],
+        'usa_log': True,
+        'streaming': True,
+        'depende': [],
+    },
+    'velocidade': {
+        'arquivo': 'Velocidade/velocidade.py',
+        'funcao': 'velocidade',
+        'arquivos': {'caminho_saida': 'velocidade_analisada.csv'},
+        'saidas': ['velocidade_analisada.csv'],
+        'usa_log': True,
+        'depende': [],
+    },
+    'sequencia': {
+        'arquivo': 'sequence number/sequenceNumber.py',
+        'funcao': 'verificar_sequencia',
+        'arquivos': {'caminho_saida': 'problemas_ordenando_sequencia.csv'},
+        'saidas': ['problemas_ordenando_sequencia.csv'],
+        'usa_log': True,
+        'depende': [],
+    },
+    'deriva_gps': {
+        'arquivo': 'efeito estrela/deriva_gps.py',
+        'funcao': 'deriva_gps',
+        'arquivos': {'caminho_saida': 'deriva_gps.csv'},
+        'saidas': ['deriva_gps.csv'],
+        'usa_log': True,
+        'depende': [],
+    },
+}
+
+# Estado de cada processo do pool
+_df_log = None
+_caminho_streaming = None
+_modulos = {}
+
+
+def arquivos_resultado():
+    """CSVs de resultado das análises, relativos à pasta do relatório."""
+    return [arquivo for etapa in ETAPAS.values() for arquivo in etapa.get('saidas', [])]
+
+
+def _inicializar_worker(df, caminho_streaming=None):
+    global _df_log, _caminho_streaming
+    os.chdir(RAIZ)
+    _df_log = df
+    _caminho_streaming = caminho_streaming
+
+
+def _le_em_blocos(etapa, caminho_streaming):
+    """A etapa recebe o caminho do log (leitura em blocos) em vez do DataFrame."""
+    return caminho_streaming is not None and etapa.get('streaming', False)
+
+
+def _carregar_modulo(arquivo):
+    if arquivo not in _modulos:
+        nome = 'etapa_' + Path(arquivo).stem.replace(' ', '_')
+        spec = importlib.util.spec_from_file_location(nome, RAIZ / arquivo)
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        _modulos[arquivo] = modulo
+    return _modulos[arquivo]
+
+
+def _argumentos_etapa(etapa, pasta_saida, dados_externos=None):
+    """Sem pasta de saída, cada script usa os caminhos padrão do repositório."""
+    kwargs = {}
+    if pasta_saida is not None:
+        pasta = Path(pasta_saida)
+        kwargs = {param: str(pasta / nome) for param, nome in etapa.get('arquivos', {}).items()}
+    if 'bloco' in etapa:
+        kwargs['salvar'] = False
+    if dados_externos and etapa.get('sob_demanda'):
+        kwargs['dados_externos'] = str(dados_externos)
+    return kwargs
+
+
+def _entradas_etapa(etapa, resultados):
+    """Retornos das dependências declaradas em 'resultados' que estão disponíveis."""
+    return {
+        param: resultados[dep] for param, dep in etapa.get('resultados', {}).items()
+        if resultados.get(dep) is not None
+    }
+
+
+def _guardar_resultado(nome, resultado, resultados):
+    """Guarda só os retornos que alguma etapa recebe por 'resultados'."""
+    if any(nome in etapa.get('resultados', {}).values() for etapa in ETAPAS.values()):
+        resultados[nome] = resultado
+
+
+def _executar_etapa(nome, pasta_saida=None, dados_externos=None, entradas=None):
+    etapa = ETAPAS[nome]
+    funcao = getattr(_carregar_modulo(etapa['arquivo']), etapa['funcao'])
+    args = []
+    if etapa.get('usa_log'):
+        args = [_caminho_streaming if _le_em_blocos(etapa, _caminho_streaming) else _df_log]
+    return funcao(*args, **_argumentos_etapa(etapa, pasta_saida, dados_externos), **(entradas or {}))
+
+
+def _chave_etapa(nome, pasta_saida, dados_externos, cache):
+    """Hash de tudo o que determina o resultado da etapa: código, parâmetros, log e CSVs de entrada."""
+    etapa = ETAPAS[nome]
+    entradas = {}
+    if 'bloco' in etapa:
+        entradas = {arquivo: hash_arquivo(Path(pasta_saida) / arquivo) for arquivo in etapa['arquivos'].values()}
+    return hash_valores({
+        'etapa': nome,
+        'script': hash_arquivo(RAIZ / etapa['arquivo']),
+        'codigo_comum': cache['codigo_comum'],
+        'parametros': _argumentos_etapa(etapa, pasta_saida, dados_externos),
+        'log': cache['hash_log'] if etapa.get('usa_log') else None,
+        'entradas': entradas,
+    })
+
+
+def _consultar_cache(nome, pasta_saida, dados_externos, cache):
+    """
+    Consulta o manifesto antes de executar a etapa (modo incremental)
+    Returns:
+        tupla (reaproveitada, chave das entradas, resultado guardado)
+    """
+    if cache is None:
+        return False, None, None
+    chave = _chave_etapa(nome, pasta_saida, dados_externos, cache)
+    if not em_dia(cache['manifesto'], nome, chave, pasta_saida):
+        return False, chave, None
+    resultado = conteudo_guardado(pasta_saida, nome) if 'bloco' in ETAPAS[nome] else None
+    return True, chave, resultado
+
+
+def _guardar_cache(nome, chave, resultado, pasta_saida, cache):
+    if cache is None:
+        return
+    etapa = ETAPAS[nome]
+    registrar(
+        cache['manifesto'], nome, chave, pasta_saida,
+        etapa.get('saidas', []), resultado if 'bloco' in etapa else None
+    )
+
+
+def _executar_sequencial(df, pasta_saida, dados_externos=None, cache=None, caminho_streaming=None):
+    """Executa as etapas no próprio processo, na ordem declarada em ETAPAS."""
+    _inicializar_worker(df, caminho_streaming)
+    concluidas = set()
+    falhas = set()
+    blocos = {}
+    resultados = {}
+    for nome, etapa in ETAPAS.items():
+        if not all(dep in concluidas for dep in etapa['depende']):
+            print(f"⚠️ Etapa '{nome}' ignorada: dependência com falha.")
+            falhas.add(nome)
+            continue
+        try:
+            reaproveitada, chave, resultado = _consultar_cache(nome, pasta_saida, dados_externos, cache)
+            if reaproveitada:
+                print(f"♻️ Etapa '{nome}' reaproveitada: entradas sem alteração.")
+            else:
+                resultado = _executar_etapa(nome, pasta_saida, dados_externos, _entradas_etapa(etapa, resultados))
+                _guardar_cache(nome, chave, resultado, pasta_saida, cache)
+                _guardar_resultado(nome, resultado, resultados)
+            concluidas.add(nome)
+            if 'bloco' in etapa:
+                blocos[nome] = resultado
+        except Exception as e:
+            print(f"❌ Erro na etapa '{nome}': {e}")
+            falhas.add(nome)
+    return concluidas, falhas, blocos
+
+
+def executar_etapas(df, max_workers=None, pasta_saida=None, dados_externos=None, cache=None, caminho_streaming=None):
+    """
+    Executa o grafo de etapas, rodando em paralelo as que já têm as dependências prontas
+    Args:
+        df: DataFrame do log, compartilhado com todos os processos
+        max_workers: número de processos (None = número de CPUs, 1 = sem pool)
+        pasta_saida: pasta para CSVs e blocos; se None, usa os caminhos padrão
+        dados_externos: SQLite onde as etapas 'sob_demanda' gravam as tabelas longas
+        cache: manifesto e hashes do modo incremental; etapas com entradas
+            inalteradas são reaproveitadas em vez de executadas
+        caminho_streaming: caminho do log passado às etapas com 'streaming' no lugar
+            do DataFrame (None = todas recebem o DataFrame)
+    Returns:
+        tupla (etapas concluídas, etapas com falha, dict etapa -> bloco gerado)
+    """
+    if max_workers == 1:
+        return _executar_sequencial(df, pasta_saida, dados_externos, cache, caminho_streaming)
+
+    pendentes = dict(ETAPAS)
+    concluidas = set()
+    falhas = set()
+    blocos = {}
+    resultados = {}
+    em_execucao = {}
+    chaves = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializar_worker, initargs=(df, caminho_streaming)) as pool:
+        while pendentes or em_execucao:
+            liberadas = True
+            while liberadas:
+                # Etapas reaproveitadas do cache liberam as dependentes na mesma rodada
+                liberadas = False
+                for nome, etapa in list(pendentes.items()):
+                    if any(dep in falhas for dep in etapa['depende']):
+                        print(f"⚠️ Etapa '{nome}' ignorada: dependência com falha.")
+                        falhas.add(nome)
+                        del pendentes[nome]
+                    elif all(dep in concluidas for dep in etapa['depende']):
+                        del pendentes[nome]
+                        reaproveitada, chaves[nome], resultado = _consultar_cache(nome, pasta_saida, dados_externos, cache)
+                        if reaproveitada:
+                            print(f"♻️ Etapa '{nome}' reaproveitada: entradas sem alteração.")
+                            concluidas.add(nome)
+                            if 'bloco' in etapa:
+                                blocos[nome] = resultado
+                            liberadas = True
+                        else:
+                            futuro = pool.submit(
+                                _executar_etapa, nome, pasta_saida, dados_externos, _entradas_etapa(etapa, resultados)
+                            )
+                            em_execucao[futuro] = nome
+
+            if not em_execucao:
+                if not pendentes:
+                    break
+                # Nada rodando e nada liberado: dependências não resolvidas
+                for nome in pendentes:
+                    print(f"⚠️ Etapa '{nome}' ignorada: dependência não resolvida.")
+                    falhas.add(nome)
+                break
+
+            prontas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in prontas:
+                nome = em_execucao.pop(futuro)
+                try:
+                    resultado = futuro.result()
+                    _guardar_cache(nome, chaves[nome], resultado, pasta_saida, cache)
+                    _guardar_resultado(nome, resultado, resultados)
+                    concluidas.add(nome)
+                    if 'bloco' in ETAPAS[nome]:
+                        blocos[nome] = resultado
+                except Exception as e:
+                    print(f"❌ Erro na etapa '{nome}': {e}")
+                    falhas.add(nome)
+
+    return concluidas, falhas, blocos
+
+
+def executar_relatorio(caminho_log, max_workers=None, pasta_saida=None, comprimir_dados=False, sob_demanda=False,
+                       incremental=False, base_resultados=None):
+    """
+    Roda todas as análises do log e monta o dashboard final
+    Args:
+        caminho_log: caminho do *_decoded.csv
+        max_workers: número de processos para as etapas (1 = sequencial)
+        pasta_saida: pasta própria do relatório (CSVs e dashboard_final.html);
+            se None, grava nos caminhos padrão do repositório
+        comprimir_dados: embute os dados do modal compactados (gzip + base64)
+        sob_demanda: grava os registros e as tabelas longas num SQLite ao lado do
+            dashboard, servidos pelo servidor_dados.py, em vez de embuti-los no HTML
+        incremental: reaproveita as etapas cujas entradas (log, código, parâmetros e
+            CSVs intermediários) não mudaram desde a última execução, conforme o
+            manifesto em <pasta_saida>/cache_relatorio/; exige pasta_saida
+        base_resultados: arquivo SQLite da base da frota (base_frota.py) onde a
+            execução e os CSVs de resultado são gravados; exige pasta_saida
+    Returns:
+        dict com o resumo da execução ou None se o log não puder ser lido
+    """
+    caminho_log = os.path.abspath(caminho_log)
+    if pasta_saida is not None:
+        pasta_saida = Path(pasta_saida).resolve()
+        pasta_saida.mkdir(parents=True, exist_ok=True)
+    os.chdir(RAIZ)
+
+    cache = None
+    if incremental and pasta_saida is None:
+        print("⚠️ O modo incremental precisa de uma pasta de saída; todas as etapas serão executadas.")
+    elif incremental:
+        cache = {
+            'manifesto': ler_manifesto(pasta_saida),
+            'hash_log': hash_arquivo(caminho_log),
+            'codigo_comum': hash_codigo_comum(),
+        }
+
+    dados_externos = None
+    if sob_demanda:
+        dados_externos = (pasta_saida or RAIZ) / ARQUIVO_DADOS
+        if cache is None and dados_externos.exists():
+            dados_externos.unlink()
+        elif cache is not None and not dados_externos.exists():
+            # Sem o SQLite, as tabelas e os registros precisam ser gravados de novo
+            descartar(cache['manifesto'], [nome for nome, etapa in ETAPAS.items() if etapa.get('sob_demanda')])
+            descartar(cache['manifesto'], ['dados_dashboard'])
+
+    # Resumo técnico e dados do modal: dependem só do log e das opções do dashboard
+    chave_dados = dados_em_dia = None
+    if cache is not None:
+        chave_dados = hash_valores({
+            'log': cache['hash_log'],
+            'codigo': hash_arquivo(RAIZ / 'html_final.py'),
+            'comprimir_dados': comprimir_dados,
+            'dados_externos': str(dados_externos),
+        })
+        dados_em_dia = em_dia(cache['manifesto'], 'dados_dashboard', chave_dados, pasta_saida)
+
+    # Logs acima de LIMITE_STREAMING: as etapas com 'streaming' leem o arquivo em blocos
+    caminho_streaming = caminho_log if tamanho_bloco_streaming(caminho_log) else None
+
+    # O log só é carregado se alguma análise que usa o DataFrame ou os dados do
+    # dashboard estiverem desatualizados
+    precisa_log = not dados_em_dia or any(
+        etapa.get('usa_log') and not _le_em_blocos(etapa, caminho_streaming)
+        and not _consultar_cache(nome, pasta_saida, dados_externos, cache)[0]
+        for nome, etapa in ETAPAS.items()
+    )
+    df = None
+    if precisa_log:
+        df = carregar_log(caminho_log)
+        if df is None:
+            print(f"❌ Não foi possível ler o arquivo: {caminho_log}")
+            return None
+
+    concluidas, falhas, blocos = executar_etapas(df, max_workers, pasta_saida, dados_externos, cache, caminho_streaming)
+
+    if dados_em_dia:
+        guardado = conteudo_guardado(pasta_saida, 'dados_dashboard')
+    else:
+        guardado = {
+            'dados': dados_dashboard(df, comprimir_dados, dados_externos),
+            'linhas': len(df),
+            'device': get_device_info(df),
+        }
+        if cache is not None:
+            registrar(cache['manifesto'], 'dados_dashboard', chave_dados, pasta_saida, conteudo=guardado)
+
+    dashboard = pasta_saida / 'dashboard_final.html' if pasta_saida else None
+    unir_blocos(
+        df, output_file=dashboard, comprimir_dados=comprimir_dados, dados_externos=dados_externos,
+        blocos=[blocos[nome] for nome in ETAPAS if nome in blocos], dados=guardado['dados']
+    )
+    if cache is not None:
+        gravar_manifesto(pasta_saida, cache['manifesto'])
+
+    print(f"✅ Etapas concluídas: {len(concluidas)} | com falha: {len(falhas)}")
+    resumo = {
+        'log': caminho_log,
+        'linhas': guardado['linhas'],
+        'device': guardado['device'],
+        'concluidas': sorted(concluidas),
+        'falhas': sorted(falhas),
+    }
+    if base_resultados and pasta_saida is None:
+        print("⚠️ A base de resultados precisa de uma pasta de saída; execução não gravada.")
+    elif base_resultados:
+        execucao_id = gravar_execucao(base_resultados, resumo, pasta_saida, arquivos_resultado())
+        print(f"✅ Execução {execucao_id} gravada em: {base_resultados}")
+    return resumo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Gera o dashboard individual completo de um log decodificado.')
+    parser.add_argument('caminho_log', nargs='?', default='logs/867488061317839_decoded.csv')
+    parser.add_argument('--workers', type=int, default=None, help='Número de processos em paralelo')
+    parser.add_argument('--saida', default=None, help='Pasta própria para os arquivos deste relatório')
+    parser.add_argument('--comprimir', action='store_true', help='Compacta os dados do modal embutidos no dashboard')
+    parser.add_argument('--sob-demanda', action='store_true', help='Serve registros e tabelas longas pelo servidor_dados.py')
+    parser.add_argument('--incremental', action='store_true', help='Refaz só as etapas cujas entradas mudaram (exige --saida)')
+    parser.add_argument('--base', default=None, help='Base SQLite da frota onde gravar os resultados (exige --saida)')
+    args = parser.parse_args()
+    executar_relatorio(
+        args.caminho_log, args.workers, args.saida, args.comprimir, args.sob_demanda, args.incremental, args.base
+    )
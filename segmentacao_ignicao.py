@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# Estados de ignição derivados do primeiro dígito do 'Motion Status'
+# ('1x' = ignição desligada / IGF, '2x' = ignição ligada / IGN)
+IGNICAO_INDEFINIDA = -1
+IGNICAO_DESLIGADA = 0
+IGNICAO_LIGADA = 1
+
+
+def prefixo_motion(motion_status):
+    """Primeiro caractere de cada 'Motion Status' ('' quando vazio)."""
+    serie = pd.Series(motion_status).astype(object)
+    return serie.where(serie.notna(), '').astype(str).str[:1].to_numpy()
+
+
+def estado_ignicao(motion_status):
+    """
+    Estado da ignição em cada linha, mantido até o próximo IGN/IGF
+    Args:
+        motion_status: coluna 'Motion Status' (na ordem de processamento)
+    Returns:
+        np.ndarray int8 com IGNICAO_LIGADA, IGNICAO_DESLIGADA ou
+        IGNICAO_INDEFINIDA (linhas antes do primeiro IGN/IGF)
+    """
+    prefixo = prefixo_motion(motion_status)
+    marcas = np.full(len(prefixo), IGNICAO_INDEFINIDA, dtype=np.int8)
+    marcas[prefixo == '2'] = IGNICAO_LIGADA
+    marcas[prefixo == '1'] = IGNICAO_DESLIGADA
+
+    # Forward-fill: cada linha herda a última marca IGN/IGF vista
+    ultima_marca = np.where(marcas != IGNICAO_INDEFINIDA, np.arange(len(marcas)), 0)
+    np.maximum.accumulate(ultima_marca, out=ultima_marca)
+    return marcas[ultima_marca] if len(marcas) else marcas
+
+
+def ids_blocos_ignicao(motion_status):
+    """Número do bloco de ignição (1, 2, ...) de cada linha; 0 fora de bloco."""
+    ligada = estado_ignicao(motion_status) == IGNICAO_LIGADA
+    inicio = ligada & ~np.concatenate(([False], ligada[:-1]))
+    return np.where(ligada, np.cumsum(inicio), 0)
+
+
+def limites_blocos_ignicao(motion_status):
+    """
+    Limites posicionais dos blocos de ignição ligada
+    Returns:
+        lista de tuplas (inicio, fim), com fim exclusivo, prontas para iloc
+    """
+    ligada = (estado_ignicao(motion_status) == IGNICAO_LIGADA).astype(np.int8)
+    bordas = np.diff(np.concatenate(([0], ligada, [0])))
+    inicios = np.flatnonzero(bordas == 1)
+    fins = np.flatnonzero(bordas == -1)
+    return list(zip(inicios.tolist(), fins.tolist()))
+
+
+def identificar_blocos_ignicao(df):
+    """
+    Separa o log em blocos de ignição ligada: cada bloco começa no primeiro IGN
+    após um IGF e vai até o próximo IGF, contendo apenas as linhas com IGN
+    Args:
+        df: DataFrame já ordenado por 'Data/Hora Evento'
+    Returns:
+        lista de DataFrames (um por bloco), com o índice original preservado
+    """
+    prefixo = prefixo_motion(df['Motion Status'])
+    blocos = []
+    for inicio, fim in limites_blocos_ignicao(df['Motion Status']):
+        bloco = df.iloc[inicio:fim]
+        blocos.append(bloco[prefixo[inicio:fim] == '2'])
+    return blocos
+
+
+def _coluna_texto(df, coluna):
+    """Coluna como texto sem espaços ('' se a coluna não existir, 'nan' onde estiver vazia)."""
+    if coluna not in df.columns:
+        return pd.Series('', index=df.index)
+    return df[coluna].astype(str).str.strip()
+
+
+def classificar_eventos_ignicao(df):
+    """
+    Classifica cada linha como IGN/IGF a partir do 'Motion Status'
+    Args:
+        df: DataFrame do log
+    Returns:
+        Series com 'IGF', 'IGN' ou, na falta do Motion Status, o 'Tipo Mensagem'
+        (ou o evento equivalente ao 'Event Code')
+    """
+    prefixo = _coluna_texto(df, 'Motion Status').str[:1]
+    tipo = _coluna_texto(df, 'Tipo Mensagem').str.upper()
+    # Fallback para o método anterior se Motion Status não estiver disponível
+    codigo = _coluna_texto(df, 'Event Code').map({'20': 'GTIGF', '21': 'GTIGN'}).fillna('')
+    evento = tipo.where(tipo != '', codigo)
+    evento = evento.mask(prefixo == '2', 'IGN')
+    return evento.mask(prefixo == '1', 'IGF')
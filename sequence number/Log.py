@@ -1,14 +1,13 @@
 import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log
 
 def logs(caminho_arquivo, caminho_saida='Log/logs.csv'):
     try:
-        df = None
-        for enc in ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']:
-            try:
-                df = pd.read_csv(caminho_arquivo, encoding=enc, low_memory=False)
-                break
-            except Exception:
-                continue
+        df = carregar_log(caminho_arquivo)
         if df is None:
             print("❌ Não foi possível ler o arquivo.")
             return
@@ -1,16 +1,78 @@
+import numpy as np
 import pandas as pd
 import os
-from collections import Counter
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from leitura_logs import carregar_log
+
+# Tipos de problema, na ordem de prioridade da classificação
+TIPOS_PROBLEMA = [
+    'reset_de_contagem',
+    'valor_repetido',
+    'salto_na_sequencia',
+    'ordem_incorreta_temporal',
+]
+
+# Queda mínima na sequência para ser considerada reset do contador
+LIMITE_RESET = 60000
+
+
+def detectar_problemas_sequencia(df):
+    """
+    Compara cada mensagem com a seguinte (ordenadas por data e sequência)
+    Args:
+        df: DataFrame do log com colunas em minúsculas e 'linha_arquivo'
+    Returns:
+        tupla (DataFrame de problemas, dict tipo_problema -> quantidade)
+    """
+    df['data/hora evento'] = pd.to_datetime(df['data/hora evento'], errors='coerce')
+    df['sequência'] = pd.to_numeric(df['sequência'], errors='coerce')
+    df['sequência'] = df['sequência'].astype('Int64')
+    df = df.dropna(subset=['data/hora evento', 'sequência']).copy()
+    df = df.sort_values(by=['data/hora evento', 'sequência']).reset_index(drop=True)
+
+    seq = df['sequência'].to_numpy(dtype=np.int64)
+    datas = df['data/hora evento'].to_numpy()
+    s1, s2 = seq[:-1], seq[1:]
+    diferenca = np.diff(seq)
+
+    tipo = np.select(
+        [
+            (s2 < s1) & (np.abs(diferenca) > LIMITE_RESET),
+            diferenca == 0,
+            diferenca != 1,
+            datas[1:] < datas[:-1],
+        ],
+        TIPOS_PROBLEMA,
+        default=''
+    )
+    problema = np.flatnonzero(tipo != '')
+
+    if 'tipo mensagem' in df.columns:
+        tipos_mensagem = df['tipo mensagem'].to_numpy(dtype=object)
+    else:
+        tipos_mensagem = np.full(len(df), 'N/D', dtype=object)
+
+    dfp = pd.DataFrame({
+        'linha': df['linha_arquivo'].to_numpy(dtype=np.int64)[problema],
+        'sequencia_anterior': pd.array(s1[problema], dtype='Int64'),
+        'sequencia_atual': pd.array(s2[problema], dtype='Int64'),
+        'data_anterior': datas[:-1][problema],
+        'data_atual': datas[1:][problema],
+        'tipo_mensagem_anterior': tipos_mensagem[:-1][problema],
+        'tipo_mensagem_atual': tipos_mensagem[1:][problema],
+        'tipo_problema': pd.Categorical(tipo[problema], categories=TIPOS_PROBLEMA),
+        'Diferenca': pd.array(diferenca[problema], dtype='Int64'),
+    })
+    contagem = dfp['tipo_problema'].value_counts(sort=False).to_dict()
+    return dfp, contagem
+
 
 def verificar_sequencia(caminho_arquivo, caminho_saida = 'sequence number/problemas_ordenando_sequencia.csv'):
     try:
-        df = None
-        for enc in ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']:
-            try:
-                df = pd.read_csv(caminho_arquivo, encoding=enc, low_memory=False)
-                break
-            except Exception:
-                continue
+        df = carregar_log(caminho_arquivo)
         if df is None:
             print("❌ Não foi possível ler o arquivo.")
             return
@@ -24,67 +86,59 @@ def verificar_sequencia(caminho_arquivo, caminho_saida = 'sequence number/proble
             print("❌ As colunas obrigatórias 'Data/Hora Evento' e 'Sequência' não foram encontradas.")
             return
 
-        df['data/hora evento'] = pd.to_datetime(df['data/hora evento'], errors='coerce')
-        df['sequência'] = pd.to_numeric(df['sequência'], errors='coerce')
-        df['sequência'] = df['sequência'].astype('Int64')
-        df = df.dropna(subset=['data/hora evento', 'sequência']).copy()
-        df = df.sort_values(by=['data/hora evento', 'sequência']).reset_index(drop=True)
-
-        problemas = []
-        for i in range(len(df) - 1):
-            atual = df.iloc[i]
-            proximo = df.iloc[i + 1]
-
-            s1 = atual['sequência']
-            s2 = proximo['sequência']
-            t1 = atual['data/hora evento']
-            t2 = proximo['data/hora evento']
-            tipo1 = atual.get('tipo mensagem', 'N/D')
-            tipo2 = proximo.get('tipo mensagem', 'N/D')
-
-            diferenca = s2 - s1
-
-            # Detecta reset de contagem
-            if s2 < s1 and abs(s2 - s1) > 60000:
-                tipo = 'reset_de_contagem'
-            elif s1 == s2:
-                tipo = 'valor_repetido'
-            elif s2 != s1 + 1:
-                tipo = 'salto_na_sequencia'
-            elif t2 < t1:
-                tipo = 'ordem_incorreta_temporal'
-            else:
-                continue
-
-            problemas.append({
-                'linha': int(atual['linha_arquivo']),
-                'sequencia_anterior': s1,
-                'sequencia_atual': s2,
-                'data_anterior': t1,
-                'data_atual': t2,
-                'tipo_mensagem_anterior': tipo1,
-                'tipo_mensagem_atual': tipo2,
-                'tipo_problema': tipo,
-                'Diferenca': diferenca
-            })
-
-        if problemas:
-            dfp = pd.DataFrame(problemas)
+        dfp, contagem = detectar_problemas_sequencia(df)
+
+        if not dfp.empty:
             dfp.to_csv(caminho_saida, index=False, encoding='utf-8-sig')
             # print(f"⚠️ Problemas detectados e salvos em: {out}")
 
             # Contagem por tipo
-            tipos = [p['tipo_problema'] for p in problemas]
-            contagem = Counter(tipos)
             print("\n📊 Resumo dos problemas encontrados:")
             for tipo, qtd in contagem.items():
-                print(f"  - {tipo}: {qtd}")
+                if qtd:
+                    print(f"  - {tipo}: {qtd}")
 
         else:
             print("✅ Nenhum problema encontrado após ordenação por sequência.")
 
+        return dfp, contagem
+
     except Exception as e:
         print(f"❌ Erro inesperado: {str(e)}")
 
+
+def verificar_sequencia_frota(caminhos_logs, caminho_saida='sequence number/resumo_sequencia_frota.csv'):
+    """
+    Conta os problemas de sequência de vários logs numa única tabela
+    Args:
+        caminhos_logs: lista de caminhos de *_decoded.csv
+        caminho_saida: CSV com uma linha por log e uma coluna por tipo de problema
+    Returns:
+        DataFrame com o resumo da frota
+    """
+    resumo = []
+    for caminho in caminhos_logs:
+        try:
+            df = carregar_log(caminho)
+        except Exception as e:
+            print(f"❌ Erro ao ler {caminho}: {e}")
+            continue
+        if df is None:
+            print(f"❌ Não foi possível ler o arquivo: {caminho}")
+            continue
+        df['linha_arquivo'] = df.index + 2
+        df.columns = df.columns.str.strip().str.lower()
+        if 'data/hora evento' not in df.columns or 'sequência' not in df.columns:
+            print(f"❌ Colunas 'Data/Hora Evento' e 'Sequência' ausentes em: {caminho}")
+            continue
+        _, contagem = detectar_problemas_sequencia(df)
+        resumo.append({'log': os.path.basename(caminho), 'linhas': len(df), **contagem})
+
+    df_resumo = pd.DataFrame(resumo, columns=['log', 'linhas'] + TIPOS_PROBLEMA)
+    df_resumo.to_csv(caminho_saida, index=False, encoding='utf-8-sig')
+    print(f"✅ Resumo da frota salvo em: {caminho_saida}")
+    return df_resumo
+
+
 if __name__ == "__main__":
     verificar_sequencia('logs/867488061438379_decoded.csv')
@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import sqlite3
+from contextlib import closing
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+# Arquivo de dados gravado ao lado do dashboard_final.html no modo sob demanda
+ARQUIVO_DADOS = 'dados_dashboard.sqlite'
+
+# Linhas por página servidas para as tabelas longas
+TAMANHO_PAGINA = 200
+LIMITE_PAGINA = 5000
+
+
+def _conectar(caminho_db):
+    return sqlite3.connect(caminho_db, timeout=30)
+
+
+def gravar_registros(colunas, caminho_db):
+    """
+    Grava os registros do modal, endereçáveis pela linha do CSV
+    Args:
+        colunas: dict campo -> lista de valores (html_final.dados_modal)
+        caminho_db: arquivo SQLite do dashboard
+    """
+    df = pd.DataFrame(colunas)
+    with closing(_conectar(caminho_db)) as con, con:
+        con.execute('DROP TABLE IF EXISTS registros')
+        campos = ', '.join(f'"{campo}"' for campo in df.columns if campo != 'linha')
+        con.execute(f'CREATE TABLE registros (linha INTEGER PRIMARY KEY, {campos})')
+        df.to_sql('registros', con, if_exists='append', index=False)
+
+
+def gravar_tabela(caminho_db, nome, linhas):
+    """
+    Grava as linhas já formatadas de uma tabela longa de um bloco
+    Args:
+        caminho_db: arquivo SQLite do dashboard
+        nome: identificador da tabela (usado na URL api/tabela/<nome>)
+        linhas: DataFrame com 'linha' na primeira coluna e as demais células como texto
+    """
+    tabela = linhas.reset_index(drop=True).astype(str)
+    tabela.columns = ['linha'] + [f'c{i}' for i in range(1, len(tabela.columns))]
+    with closing(_conectar(caminho_db)) as con, con:
+        tabela.to_sql(f'tabela_{nome}', con, if_exists='replace', index_label='ordem')
+
+
+def ler_registro(caminho_db, linha):
+    """Registro do modal de uma linha do CSV (None se não existir)."""
+    with closing(_conectar(caminho_db)) as con, con:
+        con.row_factory = sqlite3.Row
+        row = con.execute('SELECT * FROM registros WHERE linha = ?', (linha,)).fetchone()
+    return dict(row) if row is not None else None
+
+
+def ler_pagina(caminho_db, nome, inicio, quantidade):
+    """
+    Uma página de uma tabela longa
+    Returns:
+        dict com o total de linhas e a lista de linhas (listas de células)
+    """
+    tabela = f'tabela_{nome}'
+    with closing(_conectar(caminho_db)) as con, con:
+        existe = con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)).fetchone()
+        if existe is None:
+            return None
+        total = con.execute(f'SELECT COUNT(*) FROM "{tabela}"').fetchone()[0]
+        cursor = con.execute(
+            f'SELECT * FROM "{tabela}" WHERE ordem >= ? ORDER BY ordem LIMIT ?', (inicio, quantidade)
+        )
+        linhas = [list(row[1:]) for row in cursor]
+    return {'total': total, 'inicio': inicio, 'linhas': linhas}
+
+
+def script_tabela_sob_demanda():
+    """JavaScript que busca páginas das tabelas longas no servidor e as acrescenta ao <tbody>."""
+    return f"""
+    async function carregarMaisLinhas(nome, tableId) {{
+        var table = document.getElementById(tableId);
+        var tbody = table.querySelector('tbody');
+        var btn = document.getElementById('btn-' + tableId);
+        var inicio = parseInt(table.dataset.carregadas || '0');
+        var resposta = await fetch('api/tabela/' + nome + '?inicio=' + inicio + '&quantidade={TAMANHO_PAGINA}');
+        if (!resposta.ok) {{
+            btn.textContent = 'Dados indisponíveis (inicie o servidor_dados.py)';
+            return;
+        }}
+        var pagina = await resposta.json();
+        var html = '';
+        pagina.linhas.forEach(function(celulas) {{
+            html += '<tr><td><a href="#" class="Linha-link" onclick="mostrarModal(' + celulas[0] + '); return false;">' + celulas[0] + '</a></td>';
+            for (var i = 1; i < celulas.length; i++) {{
+                var td = document.createElement('td');
+                td.textContent = celulas[i];
+                html += td.outerHTML;
+            }}
+            html += '</tr>';
+        }});
+        tbody.insertAdjacentHTML('beforeend', html);
+        var carregadas = inicio + pagina.linhas.length;
+        table.dataset.carregadas = carregadas;
+        if (carregadas >= pagina.total) {{
+            btn.style.display = 'none';
+        }} else {{
+            btn.textContent = 'Carregar mais (' + carregadas + ' de ' + pagina.total + ')';
+        }}
+    }}
+    """
+
+
+class ManipuladorDados(SimpleHTTPRequestHandler):
+    """
+    Serve os arquivos da pasta dos dashboards e a API de dados:
+        <pasta do dashboard>/api/registro?linha=N
+        <pasta do dashboard>/api/tabela/<nome>?inicio=0&quantidade=200
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if '/api/' not in url.path:
+            return super().do_GET()
+
+        prefixo, rota = url.path.split('/api/', 1)
+        raiz = Path(self.directory).resolve()
+        caminho_db = (raiz / prefixo.strip('/') / ARQUIVO_DADOS).resolve()
+        if raiz not in caminho_db.parents or not caminho_db.is_file():
+            return self._responder_json(404, {'erro': 'dados do dashboard não encontrados'})
+
+        params = parse_qs(url.query)
+        try:
+            if rota == 'registro':
+                resposta = ler_registro(caminho_db, int(params['linha'][0]))
+            elif rota.startswith('tabela/'):
+                inicio = max(int(params.get('inicio', ['0'])[0]), 0)
+                quantidade = min(int(params.get('quantidade', [str(TAMANHO_PAGINA)])[0]), LIMITE_PAGINA)
+                resposta = ler_pagina(caminho_db, rota[len('tabela/'):], inicio, quantidade)
+            else:
+                return self._responder_json(404, {'erro': 'rota desconhecida'})
+        except (KeyError, ValueError):
+            return self._responder_json(400, {'erro': 'parâmetros inválidos'})
+
+        if resposta is None:
+            return self._responder_json(404, {'erro': 'não encontrado'})
+        self._responder_json(200, resposta)
+
+    def _responder_json(self, status, dados):
+        corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+def servir(pasta='.', porta=8765):
+    """
+    Sobe o servidor local dos dashboards gerados no modo sob demanda
+    Args:
+        pasta: pasta com o dashboard_final.html (ou a pasta da frota)
+        porta: porta HTTP local
+    """
+    pasta = os.path.abspath(pasta)
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), partial(ManipuladorDados, directory=pasta))
+    print(f"✅ Servindo {pasta} em http://127.0.0.1:{porta}/ (Ctrl+C para encerrar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Servidor local dos dados dos dashboards gerados com --sob-demanda.')
+    parser.add_argument('pasta', nargs='?', default='.')
+    parser.add_argument('--porta', type=int, default=8765)
+    args = parser.parse_args()
+    servir(args.pasta, args.porta)
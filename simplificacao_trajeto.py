@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from distancias import RAIO_MEDIO_TERRA_KM
+
+# Desvio máximo (m) de um ponto descartado em relação ao trajeto simplificado
+TOLERANCIA_SIMPLIFICACAO_M = 5.0
+
+# Pontos consecutivos a até esta distância (m) do primeiro do grupo contam como veículo parado
+RAIO_PARADO_M = 15.0
+
+# Pontos comparados de cada vez com o primeiro do grupo em agrupar_parados
+JANELA_AGRUPAMENTO = 256
+
+
+def projetar_metros(lat, lon):
+    """
+    Projeção equiretangular local, em metros, centrada na latitude média
+    Returns:
+        (x, y) como np.ndarray; boa aproximação para as distâncias curtas de um bloco
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    raio_m = RAIO_MEDIO_TERRA_KM * 1000
+    lat0 = np.radians(lat.mean()) if len(lat) else 0.0
+    return raio_m * np.radians(lon) * np.cos(lat0), raio_m * np.radians(lat)
+
+
+def agrupar_parados(x, y, raio_m=RAIO_PARADO_M, quebras=None):
+    """
+    Agrupa pontos consecutivos que ficam a até raio_m do primeiro ponto do grupo
+    Args:
+        x, y: coordenadas projetadas em metros (projetar_metros), na ordem do trajeto
+        raio_m: raio do agrupamento
+        quebras: array booleano opcional, True onde um novo grupo deve começar
+    Returns:
+        np.ndarray com o número do grupo (0, 1, ...) de cada ponto
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    grupo = np.zeros(n, dtype=np.int64)
+    limites = np.flatnonzero(quebras) if quebras is not None else np.array([], dtype=np.int64)
+    inicio, numero = 0, 0
+    while inicio < n:
+        proxima = np.searchsorted(limites, inicio, side='right')
+        limite = int(limites[proxima]) if proxima < len(limites) else n
+        # Avança em janelas até o primeiro ponto fora do raio
+        fim = inicio + 1
+        while fim < limite:
+            fim_janela = min(limite, fim + JANELA_AGRUPAMENTO)
+            fora = np.flatnonzero(np.hypot(x[fim:fim_janela] - x[inicio], y[fim:fim_janela] - y[inicio]) > raio_m)
+            if len(fora):
+                fim += int(fora[0])
+                break
+            fim = fim_janela
+        grupo[inicio:fim] = numero
+        numero += 1
+        inicio = fim
+    return grupo
+
+
+def douglas_peucker(x, y, tolerancia_m=TOLERANCIA_SIMPLIFICACAO_M):
+    """
+    Simplificação de Douglas-Peucker, sem recursão
+    Args:
+        x, y: coordenadas projetadas em metros, na ordem do trajeto
+        tolerancia_m: maior distância aceita entre um ponto descartado e o trajeto simplificado
+    Returns:
+        np.ndarray booleano com os pontos mantidos (primeiro e último sempre)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    manter = np.zeros(n, dtype=bool)
+    if n == 0:
+        return manter
+    manter[[0, n - 1]] = True
+    pilha = [(0, n - 1)]
+    while pilha:
+        inicio, fim = pilha.pop()
+        if fim - inicio < 2:
+            continue
+        dx, dy = x[fim] - x[inicio], y[fim] - y[inicio]
+        px, py = x[inicio + 1:fim] - x[inicio], y[inicio + 1:fim] - y[inicio]
+        comprimento = np.hypot(dx, dy)
+        if comprimento == 0:
+            distancia = np.hypot(px, py)
+        else:
+            distancia = np.abs(dx * py - dy * px) / comprimento
+        k = int(np.argmax(distancia))
+        if distancia[k] > tolerancia_m:
+            meio = inicio + 1 + k
+            manter[meio] = True
+            pilha.extend([(inicio, meio), (meio, fim)])
+    return manter
+
+
+def simplificar_bloco(bloco, tolerancia_m=TOLERANCIA_SIMPLIFICACAO_M, raio_parado_m=RAIO_PARADO_M):
+    """
+    Reduz os pontos de um bloco: cada grupo de pontos parados (jitter) vira um ponto
+    representativo e o trajeto restante é simplificado por Douglas-Peucker
+    Args:
+        bloco: DataFrame com 'Latitude' e 'Longitude', na ordem do trajeto
+        tolerancia_m: tolerância de Douglas-Peucker, em metros
+        raio_parado_m: raio do agrupamento de pontos parados, em metros
+    Returns:
+        DataFrame com a primeira linha de cada ponto mantido, Latitude/Longitude no centro
+        do grupo e as colunas 'pontos_agrupados' e 'raio_agrupamento_m' (maior distância
+        de um ponto do grupo ao centro); grupos com mais de um ponto são sempre mantidos
+    """
+    if bloco.empty:
+        return bloco.assign(pontos_agrupados=pd.Series(dtype='int64'), raio_agrupamento_m=pd.Series(dtype=float))
+    lat = bloco['Latitude'].to_numpy(dtype=float)
+    lon = bloco['Longitude'].to_numpy(dtype=float)
+    x, y = projetar_metros(lat, lon)
+
+    # Um grupo nunca junta Motion Status diferentes
+    quebras = None
+    if 'Motion Status' in bloco.columns:
+        quebras = bloco['Motion Status'].ne(bloco['Motion Status'].shift()).to_numpy()
+    grupo = agrupar_parados(x, y, raio_parado_m, quebras)
+
+    contagem = np.bincount(grupo)
+    centro_x = np.bincount(grupo, weights=x) / contagem
+    centro_y = np.bincount(grupo, weights=y) / contagem
+    inicios = np.flatnonzero(np.r_[True, grupo[1:] != grupo[:-1]])
+    raio = np.maximum.reduceat(np.hypot(x - centro_x[grupo], y - centro_y[grupo]), inicios)
+
+    representantes = bloco.iloc[inicios].copy()
+    representantes['Latitude'] = np.bincount(grupo, weights=lat) / contagem
+    representantes['Longitude'] = np.bincount(grupo, weights=lon) / contagem
+    representantes['pontos_agrupados'] = contagem
+    representantes['raio_agrupamento_m'] = np.round(raio, 1)
+
+    manter = douglas_peucker(centro_x, centro_y, tolerancia_m) | (contagem > 1)
+    return representantes[manter]
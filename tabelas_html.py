@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+
+def separar_data_hora(serie, formato_data='%d/%m/%Y', formato_hora='%H:%M:%S'):
+    """
+    Converte a coluna de data/hora uma única vez e separa data e hora em texto
+    Args:
+        serie: coluna com a data/hora (texto ou datetime)
+    Returns:
+        tupla (datas, horas) de Series de texto; datas inválidas viram ''
+    """
+    datahora = pd.to_datetime(serie, errors='coerce', format='mixed')
+    return datahora.dt.strftime(formato_data).fillna(''), datahora.dt.strftime(formato_hora).fillna('')
+
+
+def formatar_inteiros(serie):
+    """Valores numéricos truncados para inteiro, como int(); ausentes viram ''."""
+    valores = pd.to_numeric(serie, errors='coerce')
+    inteiros = pd.Series(np.trunc(valores), index=valores.index).astype('Int64').astype(str)
+    return inteiros.where(valores.notna(), '')
+
+
+def renderizar_linhas(template, *colunas):
+    """
+    Monta as linhas <tr> de uma tabela a partir de um template com campos posicionais
+    Args:
+        template: texto de uma linha com {0}, {1}, ... (uma posição por coluna)
+        colunas: sequências já formatadas, todas do mesmo tamanho
+    Returns:
+        HTML das linhas concatenado com join (tempo linear no número de linhas)
+    """
+    return ''.join(map(template.format, *colunas))
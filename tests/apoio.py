@@ -0,0 +1,16 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+
+def importar_script(caminho_relativo):
+    """Importa um script pelo caminho (as pastas das análises têm espaços no nome)."""
+    caminho = RAIZ / caminho_relativo
+    spec = importlib.util.spec_from_file_location(caminho.stem.replace(' ', '_'), caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from apoio import importar_script
+
+deteccao_deriva = importar_script('deteccao_deriva.py')
+
+# ~1 m em graus de latitude
+METRO = 1 / 111_195
+
+
+def _bloco(deslocamentos_m, hodometro, linha_inicial=2):
+    """Pontos ao redor de (-23.5, -46.6), deslocados para o norte pelos metros dados."""
+    n = len(deslocamentos_m)
+    return pd.DataFrame({
+        'linha': np.arange(n) + linha_inicial,
+        'Latitude': -23.5 + np.asarray(deslocamentos_m, dtype=float) * METRO,
+        'Longitude': np.full(n, -46.6),
+        'Hodômetro Total': hodometro,
+        'Data/Hora Evento': pd.date_range('2025-07-01 10:00', periods=n, freq='min'),
+    })
+
+
+def test_detectar_deriva_sem_pontos():
+    vazio = deteccao_deriva.detectar_deriva([])
+    assert vazio.empty
+    assert 'distancia_fantasma_m' in vazio.columns
+    assert deteccao_deriva.detectar_deriva([_bloco([], [])]).empty
+    sem_hodometro = _bloco([0, 80, 0], [1.0] * 3).drop(columns='Hodômetro Total')
+    assert deteccao_deriva.detectar_deriva([sem_hodometro]).empty
+
+
+def test_detectar_deriva_parada_com_pontos_espalhados():
+    deriva = deteccao_deriva.detectar_deriva([_bloco([0, 2, 1, 80, 3], [500.0] * 5)])
+    assert len(deriva) == 1
+    parada = deriva.iloc[0]
+    assert (parada['bloco'], parada['linha_inicial'], parada['linha_final']) == (1, 2, 6)
+    assert parada['pontos'] == 5
+    assert parada['pontos_fora_do_nucleo'] == 1
+    assert 75 < parada['raio_m'] < 80
+    assert 155 < parada['distancia_fantasma_m'] < 160
+
+
+def test_detectar_deriva_ignora_parada_concentrada_e_movimento():
+    assert deteccao_deriva.detectar_deriva([_bloco([0, 2, 1, 3], [500.0] * 4)]).empty
+    # O hodômetro muda a cada ponto: não há parada
+    assert deteccao_deriva.detectar_deriva([_bloco([0, 80, 0, 80], [1.0, 2.0, 3.0, 4.0])]).empty
+
+
+def test_detectar_deriva_hodometro_vazio():
+    # Sem hodômetro não há como saber se o veículo estava parado
+    assert deteccao_deriva.detectar_deriva([_bloco([0, 2, 1, 80, 3], [np.nan] * 5)]).empty
+
+
+def test_detectar_deriva_parada_nao_atravessa_blocos():
+    primeiro = _bloco([0, 80], [500.0] * 2)
+    segundo = _bloco([0, 80, 1], [500.0] * 3, linha_inicial=10)
+    deriva = deteccao_deriva.detectar_deriva([primeiro, _bloco([], []), segundo])
+    assert deriva['bloco'].tolist() == [3]
+    assert deriva['linha_inicial'].tolist() == [10]
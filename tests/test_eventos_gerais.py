@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from apoio import importar_script
+
+eventos_gerais = importar_script('Analise de eventos/Eventos_gerais.py')
+
+
+def _log_tm10(caminho):
+    """Log do TM-10 em que só a terceira mensagem traz o 'Tipo Dispositivo'."""
+    pd.DataFrame({
+        'Sequência': [1, 2, 3, 4],
+        'Tipo Mensagem': ['GTERI', 'GTERI', 'GTSTT', 'GTIGN'],
+        'Motion Status': ['11', '21', '22', '21'],
+        'Tipo Dispositivo': [np.nan, np.nan, '802003', np.nan],
+        'Data/Hora Evento': ['2025-07-01 10:00:00', '2025-07-01 10:01:00', '2025-07-01 10:02:00', '2025-07-01 10:03:00'],
+    }).to_csv(caminho, index=False)
+    return caminho
+
+
+def test_tipo_dispositivo_ignora_linhas_sem_valor():
+    df = pd.DataFrame({'Tipo Dispositivo': [np.nan, None, '802003', '385349']})
+    assert eventos_gerais.tipo_dispositivo(df) == '802003'
+
+
+def test_tipo_dispositivo_coluna_vazia_ou_ausente():
+    assert eventos_gerais.tipo_dispositivo(pd.DataFrame({'Tipo Dispositivo': [np.nan, np.nan]})) == ''
+    assert eventos_gerais.tipo_dispositivo(pd.DataFrame({'Tipo Dispositivo': []})) == ''
+    assert eventos_gerais.tipo_dispositivo(pd.DataFrame({'Outra': [1]})) == ''
+
+
+def test_regras_do_dispositivo_com_primeira_linha_sem_tipo(tmp_path):
+    log = _log_tm10(tmp_path / 'log_decoded.csv')
+    for tamanho_bloco in (None, 1):
+        saida = tmp_path / f'quantidade_{tamanho_bloco}.csv'
+        eventos_gerais.eventos(str(log), str(saida), tamanho_bloco=tamanho_bloco)
+        contagem = dict(pd.read_csv(saida).itertuples(index=False))
+        assert contagem == {'Modo Econômico': 1, 'Posicionamento por tempo em movimento': 1, 'GTSTT': 1, 'GTIGN': 1}
@@ -0,0 +1,31 @@
+import numpy as np
+
+from apoio import importar_script
+
+mapa_frota = importar_script('mapa_frota.py')
+
+
+def test_celulas_grade_sem_pontos():
+    coluna, linha = mapa_frota.celulas_grade([], [], 10)
+    assert coluna.dtype == np.int64 and linha.dtype == np.int64
+    assert len(coluna) == len(linha) == 0
+
+
+def test_celulas_grade_limites_do_mapa():
+    # Zoom 0 com células de 48 px: o mundo (256 px) tem 5 células e um terço de lado
+    coluna, linha = mapa_frota.celulas_grade([0.0, 85.0511, 90.0, -90.0], [-180.0, 0.0, 0.0, 180.0], 0)
+    assert coluna.tolist() == [0, 2, 2, 5]
+    # Latitudes além do limite do Web Mercator caem na primeira/última linha
+    assert linha.tolist() == [2, 0, 0, 5]
+
+
+def test_celulas_grade_pontos_proximos_e_zoom():
+    lat = np.array([-23.50000, -23.50001, -23.60000])
+    lon = np.array([-46.60000, -46.60001, -46.60000])
+    coluna, linha = mapa_frota.celulas_grade(lat, lon, 13)
+    assert (coluna[0], linha[0]) == (coluna[1], linha[1])
+    assert linha[2] > linha[0]
+    # Cada nível de zoom divide a célula em quatro
+    coluna_14, linha_14 = mapa_frota.celulas_grade(lat, lon, 14)
+    assert (coluna_14 // 2).tolist() == coluna.tolist()
+    assert (linha_14 // 2).tolist() == linha.tolist()
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from apoio import importar_script
+
+paleta_cores = importar_script('paleta_cores.py')
+
+
+def test_tabela_degrade_nas_paradas():
+    tabela = paleta_cores.tabela_degrade(paleta_cores.DEGRADE_AZUL_ROXO_VERMELHO, 5)
+    assert tabela.tolist() == ['#00f6ff', '#407bff', '#8000ff', '#bf007f', '#ff0000']
+
+    # Paradas fora das extremidades (0.3 e 0.7) caem exatamente em níveis da tabela
+    paradas = paleta_cores.paradas_escurecimento('#FF0000')
+    assert paradas == ((0.0, '#190000'), (0.3, '#7f0000'), (0.7, '#cc0000'), (1.0, '#ff0000'))
+    tabela = paleta_cores.tabela_degrade(paradas, 11)
+    assert [tabela[i] for i in (0, 3, 7, 10)] == [cor for _, cor in paradas]
+
+
+def test_tabela_degrade_um_nivel_e_cache():
+    assert paleta_cores.tabela_degrade(paleta_cores.DEGRADE_AZUL_ROXO_VERMELHO, 1).tolist() == ['#00f6ff']
+    tabela = paleta_cores.tabela_degrade()
+    assert len(tabela) == paleta_cores.NIVEIS_TABELA
+    assert paleta_cores.tabela_degrade() is tabela
+    with pytest.raises(ValueError):
+        tabela[0] = '#000000'
+
+
+def test_cores_degrade_limita_o_progresso():
+    cores = paleta_cores.cores_degrade([0.0, 1.0, -0.5, 1.5], niveis=3)
+    assert cores.tolist() == ['#00f6ff', '#ff0000', '#00f6ff', '#ff0000']
+    assert paleta_cores.cores_degrade([]).tolist() == []
+    # Com 256 níveis a posição 0.5 fica entre dois níveis e usa o mais próximo
+    assert paleta_cores.cores_degrade([0.5]).tolist() == ['#8000fe']
+
+
+def test_degrade_pontos():
+    assert paleta_cores.degrade_pontos(0) == ['#00f6ff']
+    assert paleta_cores.degrade_pontos(1) == ['#00f6ff']
+    assert paleta_cores.degrade_pontos(3) == ['#00f6ff', '#8000ff', '#ff0000']
+    cores = paleta_cores.degrade_pontos(1000)
+    assert len(cores) == 1000
+    assert (cores[0], cores[-1]) == ('#00f6ff', '#ff0000')
+    assert set(cores) <= set(paleta_cores.tabela_degrade().tolist())
+
+
+def test_cores_ciclicas():
+    assert paleta_cores.cores_ciclicas(('#a', '#b'), 5) == ['#a', '#b', '#a', '#b', '#a']
+    assert paleta_cores.cores_ciclicas(paleta_cores.PALETA_BLOCOS, 0) == []
+    assert np.unique(paleta_cores.cores_ciclicas(paleta_cores.PALETA_BLOCOS, 15)).size == 15
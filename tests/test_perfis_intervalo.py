@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from apoio import importar_script
+
+perfis_intervalo = importar_script('perfis_intervalo.py')
+
+
+def test_classificar_desvios_por_faixa():
+    tempos = [np.nan, 180, 185, 186, 170, 200, 400, 5000, 100]
+    total, faixas = perfis_intervalo.classificar_desvios(tempos, list(range(2, 11)), 180, 5)
+    # 180 e 185 (exatamente na tolerância) não são anomalias
+    assert total == 7
+    assert faixas['faixa'].tolist() == [
+        '-300 a -60 s', '-10 a -5 s', '+5 a +10 s', '+10 a +60 s', '+60 a +300 s', '+900 s ou mais',
+        'Sem intervalo anterior',
+    ]
+    assert faixas['exemplos'].tolist() == [[10], [6], [5], [7], [8], [9], [2]]
+
+
+def test_classificar_desvios_sem_intervalos():
+    total, faixas = perfis_intervalo.classificar_desvios([], [], 180, 5)
+    assert total == 0
+    assert faixas.empty
+    assert faixas.columns.tolist() == ['faixa', 'quantidade', 'exemplos']
+
+
+def test_classificar_desvios_guarda_poucos_exemplos():
+    tempos = np.full(20, 240.0)
+    total, faixas = perfis_intervalo.classificar_desvios(tempos, np.arange(20), 180, 5)
+    assert total == 20
+    assert faixas['quantidade'].tolist() == [20]
+    assert faixas['exemplos'].iloc[0] == list(range(perfis_intervalo.EXEMPLOS_POR_FAIXA))
+
+
+def test_perfil_intervalo_por_tipo_e_firmware(monkeypatch):
+    especifico = {'intervalo_on': 60, 'intervalo_off': 600, 'tolerancia': 2}
+    monkeypatch.setitem(perfis_intervalo.PERFIS_INTERVALO, ('TM-10', '0x0a14'), especifico)
+
+    def log(tipo, firmware):
+        return pd.DataFrame({'Tipo Dispositivo': [np.nan, tipo], 'Versão Firmware': [firmware, firmware]})
+
+    assert perfis_intervalo.perfil_intervalo(log('802003', '0x0a14')) == especifico
+    assert perfis_intervalo.perfil_intervalo(log('802003', '0x0a15')) is perfis_intervalo.PERFIS_INTERVALO[('TM-10', None)]
+    assert perfis_intervalo.perfil_intervalo(log('999', '1')) is perfis_intervalo.PERFIL_PADRAO
+    assert perfis_intervalo.perfil_intervalo(pd.DataFrame()) is perfis_intervalo.PERFIL_PADRAO
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from apoio import importar_script
+
+simplificacao = importar_script('simplificacao_trajeto.py')
+
+
+def test_douglas_peucker_vazio_e_um_ponto():
+    assert simplificacao.douglas_peucker([], []).tolist() == []
+    assert simplificacao.douglas_peucker([10.0], [20.0]).tolist() == [True]
+    assert simplificacao.douglas_peucker([0.0, 5.0], [0.0, 5.0]).tolist() == [True, True]
+
+
+def test_douglas_peucker_descarta_pontos_alinhados():
+    x = np.arange(0.0, 100.0, 10.0)
+    y = np.array([0, 1, -1, 2, 0, 30, 0, 1, 0, 0], dtype=float)
+    manter = simplificacao.douglas_peucker(x, y, tolerancia_m=5.0)
+    assert np.flatnonzero(manter).tolist() == [0, 4, 5, 6, 9]
+
+
+def test_douglas_peucker_trajeto_fechado():
+    # Início e fim no mesmo lugar: a distância passa a ser até o ponto inicial
+    x = np.array([0.0, 50.0, 0.0, 0.0])
+    y = np.array([0.0, 0.0, 2.0, 0.0])
+    assert simplificacao.douglas_peucker(x, y, tolerancia_m=5.0).tolist() == [True, True, False, True]
+
+
+def _bloco(lat, lon, motion=None):
+    bloco = pd.DataFrame({'Latitude': lat, 'Longitude': lon}, index=np.arange(len(lat)) + 10)
+    if motion is not None:
+        bloco['Motion Status'] = motion
+    return bloco
+
+
+def test_simplificar_bloco_vazio_e_um_ponto():
+    vazio = simplificacao.simplificar_bloco(_bloco([], []))
+    assert vazio.empty
+    assert {'pontos_agrupados', 'raio_agrupamento_m'} <= set(vazio.columns)
+
+    um = simplificacao.simplificar_bloco(_bloco([-23.5], [-46.6]))
+    assert um.index.tolist() == [10]
+    assert um['pontos_agrupados'].tolist() == [1]
+    assert um['raio_agrupamento_m'].tolist() == [0.0]
+
+
+def test_simplificar_bloco_agrupa_pontos_parados():
+    # Três leituras a poucos metros uma da outra e depois um deslocamento de ~1 km
+    lat = [-23.50000, -23.50003, -23.49998, -23.49100]
+    bloco = simplificacao.simplificar_bloco(_bloco(lat, [-46.6] * 4))
+    assert bloco.index.tolist() == [10, 13]
+    assert bloco['pontos_agrupados'].tolist() == [3, 1]
+    assert bloco['Latitude'].iloc[0] == np.mean(lat[:3])
+    assert 0 < bloco['raio_agrupamento_m'].iloc[0] < simplificacao.RAIO_PARADO_M
+
+
+def test_simplificar_bloco_nao_junta_motion_status_diferentes():
+    bloco = simplificacao.simplificar_bloco(_bloco([-23.5] * 3, [-46.6] * 3, motion=['21', '21', '22']))
+    assert bloco.index.tolist() == [10, 12]
+    assert bloco['pontos_agrupados'].tolist() == [2, 1]
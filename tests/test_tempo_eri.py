@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from apoio import importar_script
+
+tempo_eri = importar_script('Tempo de posicoes/tempo_ERI.py')
+
+
+def _log(caminho, motion_hbd):
+    pd.DataFrame({
+        'Tipo Mensagem': ['GTIGN', 'GTERI', 'HBD', 'GTERI', 'GTIGF', 'GTERI'],
+        'Motion Status': ['21', '21', motion_hbd, '21', '11', '11'],
+        'Position Report Type': [np.nan, 10, np.nan, 10, np.nan, 10],
+        'Data/Hora Evento': ['2025-07-01 10:00:00', '2025-07-01 10:03:00', '2025-07-01 10:04:00',
+                             '2025-07-01 10:06:00', '2025-07-01 11:00:00', '2025-07-01 12:00:00'],
+        'Tipo Dispositivo': '802003',
+        'Versão Firmware': '1.0',
+    }).to_csv(caminho, index=False)
+    return caminho
+
+
+def test_intervalos_entre_gteri(tmp_path):
+    saida = tmp_path / 'temporizadas.csv'
+    tempo_eri.temporizadas_entre_si_com_ign(str(_log(tmp_path / 'log_decoded.csv', '21')), str(saida))
+    resultado = pd.read_csv(saida)
+    gteri = resultado[resultado['Tipo Mensagem'] == 'GTERI']
+    assert gteri['linha'].tolist() == [3, 5, 7]
+    assert gteri['Diferença entre GTERI (IGN)'].tolist()[:2] == [180.0, 180.0]
+    assert gteri['Diferença entre GTERI (IGF)'].tolist()[2] == 3600.0
+
+
+def test_motion_status_mantem_formato_do_log(tmp_path):
+    # Com células vazias no log o read_csv lê a coluna como float: os scripts sempre gravaram '21.0'
+    for motion_hbd, esperado in (('', '21.0'), ('21', '21')):
+        saida = tmp_path / 'temporizadas.csv'
+        tempo_eri.temporizadas_entre_si_com_ign(str(_log(tmp_path / 'log_decoded.csv', motion_hbd)), str(saida))
+        resultado = pd.read_csv(saida, dtype=str)
+        assert resultado.loc[resultado['Tipo Mensagem'] == 'GTERI', 'Motion Status'].iloc[0] == esperado
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from apoio import importar_script
+
+time_ignicao = importar_script('Tempo ignicao/time_ignicao.py')
+ignicao_html = importar_script('Tempo ignicao/ignicao_html.py')
+
+
+def _log(eventos):
+    """Log com (Motion Status, Data/Hora Evento) por linha; índice 0..n-1 como em carregar_log."""
+    return pd.DataFrame(eventos, columns=['Motion Status', 'Data/Hora Evento'])
+
+
+def test_ciclos_ignicao_encadeia_ign_igf():
+    df = _log([
+        ('21', '2025-07-01 10:00:00'),
+        ('22', '2025-07-01 10:05:00'),  # IGN repetido: o ciclo continua no primeiro
+        ('11', '2025-07-01 11:00:00'),
+        ('12', '2025-07-01 11:10:00'),  # IGF repetido: o próximo ciclo começa no IGN seguinte
+        ('21', '2025-07-02 08:00:00'),
+        ('11', '2025-07-02 09:30:00'),
+    ])
+    ciclos = time_ignicao.ciclos_ignicao(df)
+    assert ciclos['Linha_IGN'].tolist() == [2, 6]
+    assert ciclos['Linha_IGF'].tolist() == [4, 7]
+    assert ciclos['Dia_IGN'].tolist() == ['01/07/2025', '02/07/2025']
+    assert ciclos['ign on (s)'].tolist() == [3600.0, 5400.0]
+    assert ciclos['ign off (s)'][0] == 21 * 3600.0
+    # Último ciclo sem IGN seguinte
+    assert np.isnan(ciclos['ign off (s)'][1])
+
+
+def test_ciclos_ignicao_ordena_por_data_e_ignora_data_invalida():
+    df = _log([
+        ('11', '2025-07-01 11:00:00'),
+        ('21', 'sem data'),
+        ('21', '2025-07-01 10:00:00'),
+    ])
+    ciclos = time_ignicao.ciclos_ignicao(df)
+    assert ciclos['Linha_IGN'].tolist() == [4]
+    assert ciclos['Linha_IGF'].tolist() == [2]
+
+
+def test_ciclos_ignicao_sem_ciclos():
+    for df in (_log([]), _log([('21', '2025-07-01 10:00:00'), ('22', '2025-07-01 10:05:00')]),
+               _log([('11', '2025-07-01 10:00:00'), ('21', '2025-07-01 10:05:00')])):
+        ciclos = time_ignicao.ciclos_ignicao(df)
+        assert all(len(valores) == 0 for valores in ciclos.values())
+        assert list(ciclos) == ['Linha_IGN', 'Dia_IGN', 'ign on (s)', 'Linha_IGF', 'Dia_IGF', 'ign off (s)']
+
+
+def test_bloco_ignicao_sem_ciclos():
+    ciclos = time_ignicao.ciclos_ignicao(_log([('21', '2025-07-01 10:00:00')]))
+    bloco = ignicao_html.gerar_bloco_ignicao(ciclos=ciclos, salvar=False)
+    assert bloco['nome'] == 'bloco_ignicao.html'
+    assert 'Linha-link' not in bloco['html']